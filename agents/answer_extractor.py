@@ -0,0 +1,148 @@
+"""
+Answer Extractor - Turns onboarding replies into structured builder fields.
+
+Obvious answers take a rule-based fast path; ambiguous ones are queued and
+extracted by the LLM in batches so a chat turn never waits on the model.
+The batch queue lives in the shared state store, so answers received by
+different server workers still end up in the same batch.
+"""
+import json
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from llm.gemini_llm import GeminiLLM
+from memory import memory_manager as mem
+from memory.shared_state import get_shared_state
+
+# Extra fields the LLM may derive from a question's answer
+RELATED_FIELDS = {
+    "problem": ["industry", "keywords"],
+    "services": ["keywords"],
+    "brand_name": [],
+}
+
+PRICING_MODELS = [
+    (r"\bfreemium\b", "Freemium"),
+    (r"\b(subscription|monthly|yearly|annual|per month|/mo)\b", "Subscription"),
+    (r"\b(one[- ]time|one off|single purchase|pay once)\b", "One-time purchase"),
+    (r"\b(commission|marketplace fee|take rate)\b", "Commission"),
+    (r"\b(ads|advertising|sponsor\w*)\b", "Advertising"),
+    (r"\b(per hour|hourly|consulting|retainer)\b", "Service fees"),
+    (r"\b(per unit|per item|per product|sell (?:products|items))\b", "Product sales"),
+]
+
+BRAND_PREFIX_RE = re.compile(
+    r"^(?:(?:our|my|the)\s+(?:brand|business|company)(?:\s+name)?\s+(?:is|will be)|"
+    r"(?:it'?s|it is|we'?re|we are)\s+called|called|named|brand(?:\s+name)?\s*:)\s*",
+    re.I,
+)
+LEAD_IN_RE = re.compile(r"^(?:well|so|um+|uh+|ok(?:ay)?|sure|i think|basically)[,\s]+", re.I)
+
+FAST_PATH_MAX_WORDS = 15
+BATCH_SIZE = 3
+PENDING_NAMESPACE = "extractor"
+
+
+class AnswerExtractor:
+    """Extracts structured fields from onboarding answers."""
+
+    def __init__(self, llm: GeminiLLM, on_update: Optional[Callable] = None):
+        self.llm = llm
+        self.on_update = on_update
+
+    def extract(self, field: str, question: str, answer: str) -> Dict:
+        """
+        Extract fields for one answer.
+
+        Args:
+            field: Builder field the question fills
+            question: The question that was asked
+            answer: The raw user answer
+
+        Returns:
+            Dict of builder fields to store now. Ambiguous answers are stored
+            cleaned and queued for LLM refinement.
+        """
+        cleaned = LEAD_IN_RE.sub("", answer.strip()).strip()
+        fast = self._fast_path(field, cleaned)
+        if fast is not None:
+            return fast
+
+        if getattr(self.llm, "ready", False):
+            item = {"field": field, "question": question, "answer": cleaned}
+            pending = get_shared_state().update(PENDING_NAMESPACE, "pending", lambda queue: queue + [item], [])
+            if len(pending) >= BATCH_SIZE:
+                self.flush()
+        return {field: cleaned}
+
+    def _fast_path(self, field: str, answer: str) -> Optional[Dict]:
+        """Rule-based extraction; returns None when the answer is ambiguous."""
+        words = answer.split()
+
+        if field == "brand_name":
+            name = BRAND_PREFIX_RE.sub("", answer).strip(" .!\"'")
+            return {field: name} if 0 < len(name.split()) <= 5 else None
+
+        if field == "pricing_model":
+            found = [label for pattern, label in PRICING_MODELS if re.search(pattern, answer, re.I)]
+            if len(found) == 1 and len(words) <= FAST_PATH_MAX_WORDS:
+                return {field: found[0]}
+            return None
+
+        # Short, single-clause answers are taken verbatim
+        if len(words) <= FAST_PATH_MAX_WORDS and field not in RELATED_FIELDS:
+            return {field: answer.rstrip(".")}
+        return None
+
+    def flush(self, wait: bool = False):
+        """Send all queued answers to the LLM in a single batched call."""
+        with get_shared_state().transaction() as txn:
+            batch = txn.get(PENDING_NAMESPACE, "pending", [])
+            txn.set(PENDING_NAMESPACE, "pending", [])
+        if not batch:
+            return
+        worker = threading.Thread(target=self._extract_batch, args=(batch,), daemon=True)
+        worker.start()
+        if wait:
+            worker.join()
+
+    def _extract_batch(self, batch: List[Dict]):
+        items = []
+        for i, item in enumerate(batch, 1):
+            fields = [item["field"]] + RELATED_FIELDS.get(item["field"], [])
+            items.append(
+                f'[{i}] Question: {item["question"]}\n'
+                f'Fields: {", ".join(fields)}\n'
+                f'Answer: {item["answer"]}'
+            )
+
+        prompt = f"""Extract concise structured business fields from these onboarding answers.
+Rewrite each field as a short phrase (under 20 words). "industry" is a 1-3 word niche;
+"keywords" is 3 comma-separated search keywords.
+
+{chr(10).join(items)}
+
+Return ONLY valid JSON mapping each number to its fields:
+{{"1": {{"field_name": "value"}}}}"""
+
+        try:
+            response = self.llm.call(prompt, max_tokens=600, temperature=0.2).strip()
+            if "```" in response:
+                response = response.split("```")[1].replace("json", "", 1).strip()
+            result = json.loads(response)
+        except Exception as e:
+            print(f"[Extractor] Batch extraction failed: {e}")
+            return
+
+        for i, item in enumerate(batch, 1):
+            fields = result.get(str(i))
+            if not isinstance(fields, dict):
+                continue
+            allowed = [item["field"]] + RELATED_FIELDS.get(item["field"], [])
+            updates = {k: str(v).strip() for k, v in fields.items() if k in allowed and v}
+            # Don't clobber an answer the user has since changed
+            mem.update_builder(updates, only_if={item["field"]: item["answer"]})
+        print(f"[Extractor] Extracted {len(batch)} answer(s) in one call")
+        if self.on_update:
+            self.on_update()
@@ -1,17 +1,52 @@
 """Builder API - Website generation endpoints."""
 import json
 import threading
+import time
 from pathlib import Path
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, Optional
 from memory import memory_manager as mem
+from memory.shared_state import get_shared_state
 from agents.pipeline_orchestrator import trigger_pipeline
+from agents.speculative_pipeline import prefetcher
+from agents.site_history import get_site_history
+from tools.page_cache import page_cache
 
 router = APIRouter(prefix="/api/builder", tags=["builder"])
 
-PIPELINE_STATUS = {"status": "idle", "message": "", "step": ""}
+# Pipeline job status lives in the shared store so any worker can report it
+JOBS_NAMESPACE = "jobs"
+PIPELINE_KEY = "pipeline"
+EDIT_KEY = "site_edit"  # A /regenerate or rollback rewriting pipeline_outputs/
+IDLE_STATUS = {"status": "idle", "message": "", "step": ""}
+STALE_SECONDS = 900  # A "running" job with no progress for this long lost its worker
+
+def _is_running(status: Dict) -> bool:
+    return status.get("status") == "running" and time.time() - status.get("updated_at", 0) < STALE_SECONDS
+
+def pipeline_status() -> Dict:
+    status = get_shared_state().get(JOBS_NAMESPACE, PIPELINE_KEY, IDLE_STATUS)
+    if status.get("status") == "running" and not _is_running(status):
+        return {"status": "error", "message": "Pipeline worker stopped responding", "step": "error"}
+    return {k: v for k, v in status.items() if k != "updated_at"}
+
+def _claim_edit(txn) -> bool:
+    """Claim the site for a regenerate/rollback inside `txn`; False if something else is writing it."""
+    if _is_running(txn.get(JOBS_NAMESPACE, PIPELINE_KEY, IDLE_STATUS)) or \
+            _is_running(txn.get(JOBS_NAMESPACE, EDIT_KEY, IDLE_STATUS)):
+        return False
+    txn.set(JOBS_NAMESPACE, EDIT_KEY, {"status": "running", "updated_at": time.time()})
+    return True
+
+def _release_edit():
+    get_shared_state().delete(JOBS_NAMESPACE, EDIT_KEY)
+
+def _set_pipeline_status(**fields):
+    get_shared_state().update(JOBS_NAMESPACE, PIPELINE_KEY,
+                              lambda status: {**status, **fields, "updated_at": time.time()}, IDLE_STATUS)
 
 class GenerateRequest(BaseModel):
     user_answers: Optional[Dict] = None
@@ -24,7 +59,11 @@ class GenerateResponse(BaseModel):
 
 @router.get("/status")
 async def get_status():
-    return PIPELINE_STATUS
+    return pipeline_status()
+
+@router.get("/prefetch")
+async def get_prefetch_status():
+    return {"stages": prefetcher.status()}
 
 @router.get("/answers")
 async def get_answers():
@@ -33,18 +72,16 @@ async def get_answers():
 
 @router.post("/answers")
 async def save_answers(payload: dict):
-    answers = payload.get("answers", {})
-    builder = mem.load_builder()
-    builder.update(answers)
-    mem.save_builder(builder)
+    builder = mem.update_builder(payload.get("answers", {}))
+    prefetcher.update(builder)
     return {"status": "success"}
 
 @router.get("/preview", response_class=HTMLResponse)
-async def get_preview():
+async def get_preview(request: Request):
     html_path = Path(__file__).parent.parent / "pipeline_outputs" / "index.html"
-    if html_path.exists():
-        return html_path.read_text(encoding="utf-8")
-    return JSONResponse({"error": "No website yet"}, status_code=404)
+    # Reloaded (read + recompressed, off the event loop) when the pipeline rewrites the file
+    response = await run_in_threadpool(page_cache.response, request, html_path)
+    return response or JSONResponse({"error": "No website yet"}, status_code=404)
 
 @router.get("/download")
 async def download_site():
@@ -55,35 +92,35 @@ async def download_site():
 
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_website(request: GenerateRequest):
-    global PIPELINE_STATUS
-    
-    if PIPELINE_STATUS["status"] == "running":
+    if _is_running(get_shared_state().get(JOBS_NAMESPACE, PIPELINE_KEY, IDLE_STATUS)):
         return GenerateResponse(status="running", message="Already generating")
     
-    builder = mem.load_builder()
-    if request.user_answers:
-        builder.update(request.user_answers)
-        mem.save_builder(builder)
+    builder = mem.update_builder(request.user_answers) if request.user_answers else mem.load_builder()
     
     required = ["problem", "services"]
     missing = [f for f in required if not builder.get(f)]
     if missing:
         return GenerateResponse(status="error", message=f"Missing: {', '.join(missing)}")
     
-    PIPELINE_STATUS = {"status": "running", "message": "Starting...", "step": "init"}
+    # Check-and-claim in one transaction so two workers can't both start a build
+    with get_shared_state().transaction() as txn:
+        if _is_running(txn.get(JOBS_NAMESPACE, PIPELINE_KEY, IDLE_STATUS)):
+            return GenerateResponse(status="running", message="Already generating")
+        if _is_running(txn.get(JOBS_NAMESPACE, EDIT_KEY, IDLE_STATUS)):
+            return GenerateResponse(status="running", message="A regenerate or rollback is in progress")
+        txn.set(JOBS_NAMESPACE, PIPELINE_KEY, {"status": "running", "message": "Starting...", "step": "init",
+                                               "updated_at": time.time()})
     
     def run():
-        global PIPELINE_STATUS
         try:
             def callback(step, msg):
-                PIPELINE_STATUS["step"] = step
-                PIPELINE_STATUS["message"] = msg
+                _set_pipeline_status(step=step, message=msg)
             
             result = trigger_pipeline(builder, status_callback=callback)
-            PIPELINE_STATUS["status"] = "completed" if result["status"] == "completed" else "error"
-            PIPELINE_STATUS["message"] = result.get("error", "Done!")
+            _set_pipeline_status(status="completed" if result["status"] == "completed" else "error",
+                                 message=result.get("error", "Done!"))
         except Exception as e:
-            PIPELINE_STATUS = {"status": "error", "message": str(e), "step": "error"}
+            _set_pipeline_status(status="error", message=str(e), step="error")
     
     threading.Thread(target=run, daemon=True).start()
     return GenerateResponse(status="running", message="Started")
@@ -100,6 +137,10 @@ async def regenerate_website(request: GenerateRequest):
     if not blueprint_path.exists() or not content_path.exists():
         return GenerateResponse(status="error", message="Generate website first")
     
+    with get_shared_state().transaction() as txn:
+        if not _claim_edit(txn):
+            return GenerateResponse(status="running", message="The site is being rebuilt; try again when it finishes")
+    
     try:
         blueprint = json.loads(blueprint_path.read_text())
         content = json.loads(content_path.read_text())
@@ -116,8 +157,52 @@ async def regenerate_website(request: GenerateRequest):
         
         llm = GeminiLLM()
         frontend = FrontendDevAgent(llm)
-        html_path = frontend.execute(blueprint_path, content_path, tweaks=tweaks)
+        html_path = await run_in_threadpool(frontend.execute, blueprint_path, content_path, tweaks=tweaks)
+        await run_in_threadpool(get_site_history().snapshot, "regenerate", mem.load_builder().get("brand_name"))
         
         return GenerateResponse(status="success", message="Regenerated!", html=html_path.read_text())
     except Exception as e:
         return GenerateResponse(status="error", message=str(e))
+    finally:
+        _release_edit()
+
+@router.get("/versions")
+async def list_versions(limit: int = 50):
+    """Generated site versions, newest first (the live one has current=true)."""
+    return {"versions": await run_in_threadpool(get_site_history().list, limit)}
+
+@router.get("/versions/diff")
+async def diff_versions(a: str, b: str):
+    """Per-file unified diff between two versions."""
+    result = await run_in_threadpool(get_site_history().diff, a, b)
+    if result is None:
+        return JSONResponse({"error": "Unknown version"}, status_code=404)
+    return result
+
+@router.get("/versions/{version_id}/preview", response_class=HTMLResponse)
+async def preview_version(version_id: str, request: Request):
+    version = get_site_history().get(version_id)
+    if not version:
+        return JSONResponse({"error": "Unknown version"}, status_code=404)
+    # Versions never change, so the blob hash is a permanent validator
+    etag = f'"{version["files"]["index.html"]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    html = await run_in_threadpool(get_site_history().read, version_id)
+    return HTMLResponse(html, headers=headers)
+
+@router.post("/versions/{version_id}/rollback")
+async def rollback_version(version_id: str):
+    """Make an earlier version live again (no LLM call)."""
+    with get_shared_state().transaction() as txn:
+        if not _claim_edit(txn):
+            return JSONResponse({"error": "A build or regenerate is running; roll back after it finishes"},
+                                status_code=409)
+    try:
+        version = await run_in_threadpool(get_site_history().rollback, version_id)
+    finally:
+        _release_edit()
+    if not version:
+        return JSONResponse({"error": "Unknown version"}, status_code=404)
+    return {"status": "success", "version": version}
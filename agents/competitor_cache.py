@@ -0,0 +1,176 @@
+"""
+Competitor Cache - Shared competitor intelligence across tenants.
+
+Market scans and research reports depend on the niche, not on who asks, so
+results are cached by normalized industry and keywords. Word order, case,
+punctuation, stopwords and plurals are ignored. Entries live in a SQLite file
+so every worker process shares them. An entry past REFRESH_AHEAD of its TTL is
+still served while one background refresh runs. An expired entry is recomputed
+once (concurrent callers wait for that one result) and is served stale if the
+recompute fails.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DB_PATH = Path(__file__).parent.parent / "pipeline_outputs" / "competitor_cache.db"
+TTL_SECONDS = float(os.getenv("COMPETITOR_CACHE_TTL_HOURS", "72")) * 3600
+REFRESH_AHEAD = 0.8  # Refresh in the background once 80% of the TTL has passed
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "in", "on", "to", "with", "by", "at", "or",
+    "my", "our", "your", "best", "top", "business", "company", "industry", "market",
+}
+
+
+def normalize_terms(text: str) -> list:
+    words = []
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return sorted(set(words))
+
+
+def cache_key(kind: str, industry: str, keywords: str = "") -> str:
+    """'Healthy Snacks' + 'millet, Kids' == 'snack healthy' + 'kid millet'."""
+    basis = f"{kind}|{' '.join(normalize_terms(industry))}|{' '.join(normalize_terms(keywords))}"
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()[:32]
+
+
+class CompetitorCache:
+    """TTL cache with refresh-ahead and single-flight recompute."""
+
+    def __init__(self, path: Path = DB_PATH, ttl: float = TTL_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._flights: Dict[str, list] = {}  # key -> [lock, holders + waiters]
+        self._refreshing = set()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS competitor_cache ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, label TEXT, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)")
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "stale_served": 0}
+
+    def _read(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM competitor_cache WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def _write(self, key: str, kind: str, label: str, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO competitor_cache (key, kind, label, value, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, label, json.dumps(value, ensure_ascii=False), time.time()))
+
+    def _count_hit(self, key: str):
+        with self._lock:
+            self.stats["hits"] += 1
+            self._conn.execute("UPDATE competitor_cache SET hits = hits + 1 WHERE key = ?", (key,))
+
+    def _compute(self, key: str, kind: str, label: str, compute: Callable, validate: Callable):
+        value = compute()
+        if validate(value):
+            self._write(key, kind, label, value)
+        return value
+
+    def _refresh(self, key: str, kind: str, label: str, compute: Callable, validate: Callable):
+        try:
+            self._compute(key, kind, label, compute, validate)
+            print(f"[CompetitorCache] Refreshed {kind}: {label}")
+        except Exception as e:
+            print(f"[CompetitorCache] Background refresh failed for {label}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_compute(self, kind: str, industry: str, keywords: str, compute: Callable,
+                       validate: Callable = bool):
+        """
+        Cached value for (kind, industry, keywords), computing it if needed.
+
+        Args:
+            kind: Result family ("scan", "research")
+            compute: Zero-arg function producing a JSON-serializable value
+            validate: Only values passing this are cached or served from the cache
+                (e.g. skip placeholders and LLM error replies)
+        """
+        if not normalize_terms(industry) and not normalize_terms(keywords):
+            return compute()  # Nothing to key on; don't lump unrelated tenants together
+        key = cache_key(kind, industry, keywords)
+        label = f"{industry} / {keywords}".strip(" /")
+        value, created_at = self._read(key)
+        if value is not None and not validate(value):
+            value = None  # Cached before the validator caught it; recompute
+        now = time.time()
+
+        if value is not None and now - created_at < self.ttl:
+            self._count_hit(key)
+            if now - created_at > self.ttl * REFRESH_AHEAD:
+                with self._lock:
+                    start = key not in self._refreshing
+                    if start:
+                        self._refreshing.add(key)
+                        self.stats["refreshes"] += 1
+                if start:
+                    threading.Thread(target=self._refresh, args=(key, kind, label, compute, validate),
+                                     name="competitor-refresh", daemon=True).start()
+            print(f"[CompetitorCache] Hit for {kind}: {label}")
+            return value
+
+        with self._lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                # Someone else may have just filled it
+                fresh, fresh_at = self._read(key)
+                if fresh is not None and time.time() - fresh_at < self.ttl and validate(fresh):
+                    self._count_hit(key)
+                    return fresh
+                with self._lock:
+                    self.stats["misses"] += 1
+                try:
+                    return self._compute(key, kind, label, compute, validate)
+                except Exception:
+                    if value is not None:
+                        with self._lock:
+                            self.stats["stale_served"] += 1
+                        print(f"[CompetitorCache] Serving stale {kind} for {label}")
+                        return value
+                    raise
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+    def invalidate(self, kind: str, industry: str, keywords: str = ""):
+        with self._lock:
+            self._conn.execute("DELETE FROM competitor_cache WHERE key = ?", (cache_key(kind, industry, keywords),))
+
+
+_cache: Optional[CompetitorCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_competitor_cache() -> CompetitorCache:
+    """Process-wide cache (opened on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompetitorCache()
+        return _cache
@@ -0,0 +1,237 @@
+"""
+Competitor Index - Structured, queryable store of known competitors.
+
+Research reports (competitor_analysis_report.md) and market scans are parsed
+into one row per competitor: name, URL, tagline, features, pricing, tone,
+design, strength and weakness. Rows are deduped by domain, or by name when
+there is no URL. An inverted term index over industry and feature words
+answers "who in <industry> offers <feature>?" locally. StrategyAgent and
+MarketingAgent can then ground their prompts in known competitors without
+another research call.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from agents.competitor_cache import normalize_terms
+
+DB_PATH = Path(__file__).parent.parent / "pipeline_outputs" / "competitor_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS competitors (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT,
+    industry TEXT,
+    tagline TEXT,
+    features TEXT,
+    pricing TEXT,
+    tone TEXT,
+    design TEXT,
+    strength TEXT,
+    weakness TEXT,
+    source TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS competitor_terms (
+    term TEXT NOT NULL,
+    field TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES competitors (key) ON DELETE CASCADE,
+    PRIMARY KEY (term, field, key)
+);
+"""
+
+FIELDS = ("name", "url", "industry", "tagline", "features", "pricing", "tone", "design", "strength", "weakness")
+
+# "- **Pricing Model:** ..." labels in the report -> fields
+REPORT_LABELS = {
+    "website": "url", "url": "url", "tagline/value proposition": "tagline", "tagline": "tagline",
+    "value proposition": "tagline", "key features": "features", "pricing model": "pricing",
+    "pricing": "pricing", "brand tone": "tone", "design style": "design",
+}
+
+# Filler the report writes when a detail is missing; never indexed as a value
+PLACEHOLDERS = {"n/a", "na", "none", "unknown", "-", "not publicly listed", "tbd"}
+
+
+def _is_placeholder(value) -> bool:
+    return isinstance(value, str) and value.strip().strip(".").lower() in PLACEHOLDERS
+
+
+def normalize_domain(url: str) -> str:
+    """'https://www.Example.com/pricing?x=1' -> 'example.com'."""
+    netloc = urlparse(url if "//" in url else f"//{url}").netloc.lower().split("@")[-1].split(":")[0]
+    for prefix in ("www.", "m.", "amp."):
+        if netloc.startswith(prefix):
+            netloc = netloc[len(prefix):]
+    return netloc
+
+
+def _competitor_key(name: str, url: str = "") -> str:
+    # Same normalization as the scanner's dedupe, so a scanned site and a report row share one key
+    domain = normalize_domain(url) if url else ""
+    return domain or "name:" + " ".join(normalize_terms(name))
+
+
+def parse_report(markdown: str) -> List[Dict]:
+    """Parse the '### N. Name' sections of a competitor report into dicts."""
+    competitors, current, field = [], None, None
+    for line in markdown.splitlines():
+        heading = re.match(r"^###\s+(?:\d+[.)]\s*)?(.+?)\s*$", line)
+        if heading:
+            current = {"name": heading.group(1).strip("*[] "), "features": []}
+            competitors.append(current)
+            field = None
+            continue
+        if line.startswith("## "):
+            current, field = None, None
+            continue
+        if current is None:
+            continue
+        labeled = re.match(r"^\s*[-*]\s+\*\*(.+?):?\*\*:?\s*(.*)$", line)
+        if labeled:
+            field = REPORT_LABELS.get(labeled.group(1).strip().rstrip(":").lower())
+            value = labeled.group(2).strip()
+            if field == "features":
+                if value:
+                    current["features"].extend(v.strip() for v in value.split(",") if v.strip())
+            elif field and value:
+                current[field] = value
+            continue
+        item = re.match(r"^\s{2,}[-*]\s+(.+)$", line)
+        if item and field == "features":
+            current["features"].append(item.group(1).strip())
+    return [c for c in competitors if c["name"] and not c["name"].lower().startswith("[competitor")]
+
+
+class CompetitorIndex:
+    """SQLite-backed competitor rows plus a term index for lookups."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def upsert(self, competitors: List[Dict], industry: str = "", source: str = "") -> int:
+        """Merge competitors in; non-empty new values win over stored ones (except the name)."""
+        count = 0
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for comp in competitors:
+                name = (comp.get("name") or "").strip()
+                if not name:
+                    continue
+                key = _competitor_key(name, comp.get("url", ""))
+                row = self._conn.execute("SELECT * FROM competitors WHERE key = ?", (key,)).fetchone()
+                merged = dict(row) if row else {}
+                if merged.get("features"):
+                    merged["features"] = json.loads(merged["features"])
+                for field in FIELDS:
+                    value = comp.get(field)
+                    if _is_placeholder(value):
+                        continue
+                    # Keep the first name seen (reports give "Acme Foods", scans "Acme | Home")
+                    if value and not (field == "name" and merged.get("name")):
+                        merged[field] = value
+                merged["industry"] = merged.get("industry") or industry
+                features = merged.get("features") or []
+                if isinstance(features, str):
+                    features = [f.strip() for f in features.split(",") if f.strip()]
+                features = [f for f in features if not _is_placeholder(f)]
+                merged["features"] = features
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO competitors (key, name, url, industry, tagline, features, pricing,"
+                    " tone, design, strength, weakness, source, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, merged.get("name", name), merged.get("url"), merged.get("industry"),
+                     merged.get("tagline"), json.dumps(features, ensure_ascii=False), merged.get("pricing"),
+                     merged.get("tone"), merged.get("design"), merged.get("strength"), merged.get("weakness"),
+                     source or merged.get("source"), time.time()))
+
+                self._conn.execute("DELETE FROM competitor_terms WHERE key = ?", (key,))
+                terms = {(t, "industry") for t in normalize_terms(merged.get("industry", ""))}
+                described = " ".join([merged.get("name", ""), merged.get("tagline") or "", " ".join(features),
+                                      merged.get("strength") or ""])
+                terms |= {(t, "feature") for t in normalize_terms(described)}
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO competitor_terms (term, field, key) VALUES (?, ?, ?)",
+                    [(term, field, key) for term, field in terms])
+                count += 1
+        return count
+
+    def index_report(self, markdown: str, industry: str = "") -> int:
+        competitors = parse_report(markdown)
+        count = self.upsert(competitors, industry, source="research")
+        print(f"[CompetitorIndex] Indexed {count} competitors from research report")
+        return count
+
+    def index_scan(self, result: Dict, industry: str = "") -> int:
+        return self.upsert(result.get("competitors", []), industry, source="scan")
+
+    def search(self, industry: str = "", features: str = "", limit: int = 5) -> List[Dict]:
+        """
+        Competitors ranked by matching terms; industry matches are required
+        when an industry is given, feature terms add to the score.
+        """
+        industry_terms = normalize_terms(industry)
+        feature_terms = normalize_terms(features)
+        if not industry_terms and not feature_terms:
+            return []
+        clauses, params = [], []
+        if industry_terms:
+            clauses.append(f"(field = 'industry' AND term IN ({','.join('?' * len(industry_terms))}))")
+            params += industry_terms
+        if feature_terms:
+            clauses.append(f"(field = 'feature' AND term IN ({','.join('?' * len(feature_terms))}))")
+            params += feature_terms
+        having = "HAVING SUM(field = 'industry') > 0" if industry_terms else ""
+        sql = (f"SELECT c.*, SUM(t.field = 'industry') * 2 + SUM(t.field = 'feature') AS score"
+               f" FROM competitor_terms t JOIN competitors c ON c.key = t.key"
+               f" WHERE {' OR '.join(clauses)} GROUP BY c.key {having}"
+               f" ORDER BY score DESC, c.updated_at DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        results = []
+        for row in rows:
+            item = {k: row[k] for k in FIELDS}
+            item["features"] = json.loads(row["features"] or "[]")
+            item["score"] = row["score"]
+            results.append(item)
+        return results
+
+    def positioning_facts(self, industry: str = "", features: str = "", limit: int = 3) -> str:
+        """Compact competitor lines for prompts ('' when nothing is known)."""
+        lines = []
+        for c in self.search(industry, features, limit):
+            details = [d for d in (
+                ", ".join(c["features"][:3]) if c["features"] else "",
+                f"pricing: {c['pricing']}" if c.get("pricing") else "",
+                f"tone: {c['tone']}" if c.get("tone") else "",
+                f"weakness: {c['weakness']}" if c.get("weakness") else "",
+            ) if d]
+            lines.append(f"- {c['name']}" + (f" ({'; '.join(details)})" if details else ""))
+        return "\n".join(lines)
+
+
+_index: Optional[CompetitorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_competitor_index() -> CompetitorIndex:
+    """Process-wide index (opened on first use)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CompetitorIndex()
+        return _index
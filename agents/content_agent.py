@@ -1,5 +1,7 @@
 """Content Agent - Generates website copy."""
 import json
+import os
+import uuid
 from pathlib import Path
 from llm.gemini_llm import GeminiLLM
 
@@ -8,9 +10,11 @@ class ContentAgent:
         self.llm = llm
         self.output_dir = Path(__file__).parent.parent / "pipeline_outputs"
         self.output_dir.mkdir(exist_ok=True)
+        self.used_fallback = False
     
     def execute(self, blueprint_path: Path, context: dict) -> Path:
         print("[Content] Generating copy...")
+        self.used_fallback = False
         
         blueprint = json.loads(blueprint_path.read_text()) if blueprint_path.exists() else {}
         
@@ -36,6 +40,7 @@ Return ONLY valid JSON:
                 response = response.split("```")[1].replace("json", "").strip()
             content = json.loads(response)
         except:
+            self.used_fallback = True
             cta = context.get('primary_cta', 'Get Started')
             content = {
                 "hero": {
@@ -57,7 +62,10 @@ Return ONLY valid JSON:
                 "cta": {"title": "Ready to start?", "button": cta}
             }
         
+        # Written aside and renamed, so readers never see a half-written file
         output = self.output_dir / "content_copy.json"
-        output.write_text(json.dumps(content, indent=2))
+        tmp = self.output_dir / f".tmp_{uuid.uuid4().hex}_{output.name}"
+        tmp.write_text(json.dumps(content, indent=2))
+        os.replace(tmp, output)
         print(f"[Content] Saved: {output}")
         return output
@@ -1,7 +1,20 @@
-import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 from llm.gemini_llm import GeminiLLM
+from llm.json_reply import parse_json
+from llm.scheduler import BACKGROUND
+from agents.competitor_cache import get_competitor_cache
+from agents.competitor_index import get_competitor_index
+
+MAX_COMPETITORS = 10
+PROFILE_WORKERS = int(os.getenv("RESEARCH_PROFILE_WORKERS", "5"))
+# Below this share of real profiles the report is mostly placeholders
+MIN_PROFILED_SHARE = 0.5
+PLACEHOLDER_PROFILE = {"features": [], "pricing": "Not publicly listed", "tone": "Unknown", "design": "Unknown"}
 
 
 class DeepResearchAgent:
@@ -24,6 +37,43 @@ class DeepResearchAgent:
         """
         print("[Deep_Research_Agent] Starting competitor research...")
         
+        try:
+            # Reports for the same niche are shared across tenants
+            industry = user_context.get('industry', '') or ''
+            keywords = user_context.get('keywords') or user_context.get('offer', '') or ''
+            research_results = get_competitor_cache().get_or_compute(
+                "research", industry, keywords,
+                lambda: self._research(user_context),
+                validate=is_valid_report,
+            )
+            
+            # Save to markdown file
+            output_file = self.output_dir / "competitor_analysis_report.md"
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(research_results)
+            
+            # Make the report queryable by the other agents
+            try:
+                get_competitor_index().index_report(research_results, industry)
+            except Exception as e:
+                print(f"[Deep_Research_Agent] Could not index report: {e}")
+            
+            # Verify file was created
+            if output_file.exists() and output_file.stat().st_size > 0:
+                print(f"[Deep_Research_Agent] ✅ Report saved successfully to {output_file}")
+                print(f"[Deep_Research_Agent] File size: {output_file.stat().st_size} bytes")
+                return output_file
+            else:
+                raise FileNotFoundError(f"Failed to create report file at {output_file}")
+                
+        except Exception as e:
+            print(f"[Deep_Research_Agent] ❌ ERROR during execution: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+    
+    def _research_single_call(self, user_context: Dict) -> str:
+        """Whole report in one prompt (fallback when the landscape step fails)."""
         # Build research prompt
         research_prompt = f"""You are a market research expert. Your task is to find and analyze competitors for a new business.
 
@@ -78,30 +128,187 @@ Create a markdown report with the following structure:
         
         # Get research results from LLM
         print("[Deep_Research_Agent] Querying LLM for competitor analysis...")
+        research_results = self.llm.call(research_prompt, max_tokens=4096, priority=BACKGROUND)
+        
+        # Validate response (GeminiLLM returns "⚠️ ..." text instead of raising)
+        if not is_valid_report(research_results):
+            raise ValueError(f"LLM returned no usable report: {(research_results or '').strip()[:80]!r}")
+        
+        print(f"[Deep_Research_Agent] Received {len(research_results)} characters from LLM")
+        return research_results
+    
+    def _research(self, user_context: Dict) -> str:
+        """
+        Map-reduce research; returns the markdown report.
+        
+        1. Landscape: one short call listing the top competitors
+        2. Map: one small profile call per competitor, in parallel
+        3. Reduce: assemble the report locally, with one small summary call
+        
+        Every call is short, so none of them hit the token limit and the slowest
+        profile (not a 10-competitor essay) sets the latency.
+        """
         try:
-            research_results = self.llm.call(research_prompt)
-            
-            # Validate response
-            if not research_results or len(research_results.strip()) < 50:
-                raise ValueError(f"LLM returned insufficient content: {len(research_results) if research_results else 0} characters")
-            
-            print(f"[Deep_Research_Agent] Received {len(research_results)} characters from LLM")
-            
-            # Save to markdown file
-            output_file = self.output_dir / "competitor_analysis_report.md"
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(research_results)
-            
-            # Verify file was created
-            if output_file.exists() and output_file.stat().st_size > 0:
-                print(f"[Deep_Research_Agent] ✅ Report saved successfully to {output_file}")
-                print(f"[Deep_Research_Agent] File size: {output_file.stat().st_size} bytes")
-                return output_file
-            else:
-                raise FileNotFoundError(f"Failed to create report file at {output_file}")
-                
+            landscape = self._landscape(user_context)
         except Exception as e:
-            print(f"[Deep_Research_Agent] ❌ ERROR during execution: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+            print(f"[Deep_Research_Agent] Landscape step failed ({e}), using single-call research")
+            return self._research_single_call(user_context)
+        
+        competitors = landscape["competitors"]
+        print(f"[Deep_Research_Agent] Profiling {len(competitors)} competitors in parallel...")
+        with ThreadPoolExecutor(max_workers=PROFILE_WORKERS, thread_name_prefix="research") as pool:
+            profiles = list(pool.map(lambda c: self._profile(c, user_context), competitors))
+        
+        # A report of placeholders would pass is_valid_report and be cached for every tenant
+        profiled = sum(not _is_placeholder(p) for p in profiles)
+        if profiled < MIN_PROFILED_SHARE * len(profiles):
+            print(f"[Deep_Research_Agent] Only {profiled}/{len(profiles)} profiles came back, using single-call research")
+            return self._research_single_call(user_context)
+        
+        summary = self._summary(user_context, profiles)
+        return _assemble_report(landscape.get("overview", ""), profiles, summary)
+    
+    def _context_block(self, user_context: Dict) -> str:
+        return f"""BUSINESS CONTEXT:
+- Problem: {user_context.get('problem', 'N/A')}
+- Target Users: {user_context.get('target_users', 'N/A')}
+- Value Proposition: {user_context.get('value_proposition', 'N/A')}
+- Offer: {user_context.get('offer', 'N/A')}
+- Industry: {user_context.get('industry', 'N/A')}"""
+    
+    def _landscape(self, user_context: Dict) -> Dict:
+        prompt = f"""You are a market research expert. List the TOP {MAX_COMPETITORS} real competitors for this new business.
+
+{self._context_block(user_context)}
+
+Focus on direct competitors (solving similar problems for similar audiences).
+
+Return ONLY valid JSON:
+{{
+  "overview": "2-3 sentence overview of the competitive landscape",
+  "competitors": [
+    {{ "name": "Company Name", "url": "https://example.com", "tagline": "Their tagline or value proposition" }}
+  ]
+}}"""
+        result = parse_json(self.llm.call(prompt, max_tokens=1200, priority=BACKGROUND))
+        competitors = [c for c in result.get("competitors", []) if isinstance(c, dict) and c.get("name")]
+        if not competitors:
+            raise ValueError("no competitors listed")
+        result["competitors"] = competitors[:MAX_COMPETITORS]
+        return result
+    
+    def _profile(self, competitor: Dict, user_context: Dict) -> Dict:
+        """Profile one competitor; falls back to what the landscape already said."""
+        profile = {"name": competitor["name"], "url": competitor.get("url", ""),
+                   "tagline": competitor.get("tagline", ""), **PLACEHOLDER_PROFILE, "features": []}
+        prompt = f"""You are a market research expert. Profile this competitor of a business in {user_context.get('industry', 'N/A')}:
+
+{competitor['name']} ({competitor.get('url') or 'URL unknown'}) - {competitor.get('tagline', '')}
+
+If you don't know specific details, make reasonable inferences based on the business type.
+
+Return ONLY valid JSON:
+{{
+  "tagline": "Their tagline / value proposition",
+  "features": ["3-5 key features"],
+  "pricing": "Pricing model",
+  "tone": "Brand tone (friendly, professional, technical, ...)",
+  "design": "Design style (modern, minimalist, bold, ...)"
+}}"""
+        try:
+            details = parse_json(self.llm.call(prompt, max_tokens=500, priority=BACKGROUND))
+            profile.update({k: v for k, v in details.items() if v and k in profile})
+            profile["features"] = _as_list(profile["features"])
+        except Exception as e:
+            print(f"[Deep_Research_Agent] Profile for {competitor['name']} incomplete: {e}")
+        return profile
+    
+    def _summary(self, user_context: Dict, profiles: List[Dict]) -> str:
+        """Short landscape summary from the compact profiles (local fallback)."""
+        digest = "\n".join(
+            f"- {p['name']}: {', '.join(p['features'][:3])}; pricing: {p['pricing']}; tone: {p['tone']}"
+            for p in profiles
+        )
+        prompt = f"""You are a market research expert. Given these competitor profiles for a business in {user_context.get('industry', 'N/A')} solving "{user_context.get('problem', 'N/A')}":
+
+{digest}
+
+Write a short Competitive Landscape Summary (4-6 bullet points in markdown): common patterns, gaps and opportunities for the new business. Return only the bullets."""
+        try:
+            summary = self.llm.call(prompt, max_tokens=600, priority=BACKGROUND).strip()
+            if len(summary) >= 40 and not summary.startswith("⚠️"):
+                return summary
+        except Exception as e:
+            print(f"[Deep_Research_Agent] Summary call failed: {e}")
+        return _local_summary(profiles)
+
+
+def is_valid_report(text) -> bool:
+    """A real report: long enough, not an LLM error reply, with per-competitor sections."""
+    if not isinstance(text, str):
+        return False
+    text = text.strip()
+    return len(text) >= 50 and not text.startswith("⚠️") and "### " in text
+
+
+def _as_text(value) -> str:
+    return ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+
+
+def _is_placeholder(profile: Dict) -> bool:
+    """True when the profile call added nothing to what the landscape said."""
+    return all(profile[k] == v for k, v in PLACEHOLDER_PROFILE.items())
+
+
+def _as_list(value) -> List[str]:
+    """Features as a list of strings, whatever shape the LLM returned them in."""
+    if isinstance(value, str):
+        value = re.split(r"[\n;,]", value)
+    elif isinstance(value, dict):
+        value = list(value.values())
+    elif not isinstance(value, list):
+        return []
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("feature") or next(
+                (v for v in item.values() if isinstance(v, str)), "")
+        item = str(item).strip(" -*\t")
+        if item:
+            items.append(item)
+    return items
+
+
+def _assemble_report(overview: str, profiles: List[Dict], summary: str) -> str:
+    """Reduce step: the same markdown layout the single-call prompt asks for."""
+    lines = ["# Competitor Analysis Report", "", "## Overview", overview or "N/A", "",
+             f"## Top {len(profiles)} Competitors", ""]
+    for i, p in enumerate(profiles, 1):
+        lines.append(f"### {i}. {p['name']}")
+        if p.get("url"):
+            lines.append(f"- **Website:** {p['url']}")
+        lines.append(f"- **Tagline/Value Proposition:** {_as_text(p['tagline']) or 'N/A'}")
+        lines.append("- **Key Features:**")
+        lines.extend(f"  - {f}" for f in p["features"][:5] or ["N/A"])
+        lines.append(f"- **Pricing Model:** {_as_text(p['pricing'])}")
+        lines.append(f"- **Brand Tone:** {_as_text(p['tone'])}")
+        lines.append(f"- **Design Style:** {_as_text(p['design'])}")
+        lines.append("")
+    lines += ["## Competitive Landscape Summary", summary, ""]
+    return "\n".join(lines)
+
+
+def _local_summary(profiles: List[Dict]) -> str:
+    """Summary without an LLM: recurring features, pricing and tone."""
+    features = Counter(f.lower() for p in profiles for f in p["features"])
+    pricing = Counter(_as_text(p["pricing"]).split(" ")[0].strip(",.").lower() for p in profiles)
+    tones = Counter(_as_text(p["tone"]).split(",")[0].strip().lower() for p in profiles)
+    common = [f for f, n in features.most_common(5) if n > 1]
+    bullets = [
+        f"- {len(profiles)} direct competitors profiled.",
+        f"- Common features: {', '.join(common)}." if common else "- Features vary widely; there is no dominant standard.",
+        f"- Most common pricing: {pricing.most_common(1)[0][0]}." if pricing else "",
+        f"- Prevailing brand tone: {tones.most_common(1)[0][0]}." if tones else "",
+        "- Opportunity: differentiate on what few competitors offer, and on a clearer, more personal tone.",
+    ]
+    return "\n".join(b for b in bullets if b)
@@ -1,17 +1,22 @@
 """Frontend Agent - Generates HTML website."""
 import json
+import os
+import uuid
 from pathlib import Path
 from typing import Dict, Optional
 from llm.gemini_llm import GeminiLLM
+from agents.site_css import compile_page
 
 class FrontendDevAgent:
     def __init__(self, llm: GeminiLLM):
         self.llm = llm
         self.output_dir = Path(__file__).parent.parent / "pipeline_outputs"
         self.output_dir.mkdir(exist_ok=True)
+        self.used_fallback = False
     
     def execute(self, blueprint_path: Path, content_path: Path, tweaks: Optional[Dict] = None) -> Path:
         print("[Frontend] Building HTML...")
+        self.used_fallback = False
         
         blueprint = json.loads(blueprint_path.read_text()) if blueprint_path.exists() else {}
         content = json.loads(content_path.read_text()) if content_path.exists() else {}
@@ -30,7 +35,8 @@ CONTENT: {json.dumps(content)}
 {tweak_text}
 
 Requirements:
-- Use <script src="https://cdn.tailwindcss.com"></script>
+- Use standard Tailwind utility class names, but do NOT include the Tailwind CDN script or a tailwind.config block (the CSS is compiled at build time)
+- Use bg-primary/text-primary, secondary and accent for the brand colors
 - Responsive design
 - Smooth scroll (scroll-smooth on html)
 - Navigation with anchor links
@@ -50,17 +56,26 @@ Return ONLY the complete HTML code."""
             if not html.startswith("<!DOCTYPE") and not html.startswith("<html"):
                 raise ValueError("Invalid HTML")
         except:
+            self.used_fallback = True
             html = self._fallback_html(blueprint, content)
         
+        palette = dict(blueprint.get("color_palette") or {})
+        if tweaks and "color" in tweaks:
+            palette["primary"] = tweaks["color"]
+        palette.setdefault("primary", "#4F46E5")
+        html = compile_page(html, palette)
+        
+        # Written aside and renamed, so the preview never serves a half-written page
         output = self.output_dir / "index.html"
-        output.write_text(html, encoding="utf-8")
+        tmp = self.output_dir / f".tmp_{uuid.uuid4().hex}_{output.name}"
+        tmp.write_text(html, encoding="utf-8")
+        os.replace(tmp, output)
         print(f"[Frontend] Saved: {output}")
         return output
     
     def _fallback_html(self, blueprint: dict, content: dict) -> str:
         hero = content.get("hero", {})
         features = content.get("features", [])
-        color = blueprint.get("color_palette", {}).get("primary", "#4F46E5")
         
         features_html = "".join([
             f'<div class="bg-white p-6 rounded-lg shadow"><h3 class="text-xl font-bold mb-2">{f.get("title","")}</h3><p class="text-gray-600">{f.get("description","")}</p></div>'
@@ -72,8 +87,6 @@ Return ONLY the complete HTML code."""
 <head>
 <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
 <title>{hero.get("h1","Website")}</title>
-<script src="https://cdn.tailwindcss.com"></script>
-<script>tailwind.config={{theme:{{extend:{{colors:{{primary:"{color}"}}}}}}}}</script>
 </head>
 <body class="bg-gray-50">
 <nav class="fixed w-full bg-white shadow z-50"><div class="max-w-7xl mx-auto px-4 py-4 flex justify-between">
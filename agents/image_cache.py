@@ -0,0 +1,191 @@
+"""
+Image Cache - Content-addressed store for generated marketing images.
+
+Blobs are named by the SHA-256 of their bytes (img_<hash>.<ext>) so identical
+images are stored once and concurrent writers can never overwrite each other.
+A prompt index maps normalized prompt hashes to blobs, so a repeat prompt is
+served from disk instantly. The directory is kept under a size budget by
+evicting least-recently-used blobs; a blob's recorded size includes its
+derived variants and resizes (same stem). The index is a SQLite file next to the
+blobs, so every server worker sees the same prompts and LRU order.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from memory.shared_state import SharedState
+
+MAX_CACHE_BYTES = int(float(os.getenv("MARKETING_IMAGE_CACHE_MB", "500")) * 1024 * 1024)
+BLOB_PREFIX = "img_"
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", (prompt or "").lower()).strip(" .,!")
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+def sniff_extension(head: bytes) -> str:
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return ".png"
+
+
+class ImageCache:
+    """Content-addressed, prompt-indexed, size-bounded image directory."""
+
+    def __init__(self, directory: Path, max_bytes: int = MAX_CACHE_BYTES):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.dir / "image_index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._flights: Dict[str, list] = {}  # prompt key -> [lock, holders + waiters]
+        # SQLite index shared by every server worker (the old JSON index is imported once)
+        self._index = SharedState(self.dir / "image_index.db")
+        self._import_legacy_index()
+
+    def _import_legacy_index(self):
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        with self._index.transaction() as txn:
+            for name, blob in data.get("blobs", {}).items():
+                txn.set("blobs", name, blob)
+            for key, name in data.get("prompts", {}).items():
+                txn.set("prompts", key, name)
+        self.index_path.rename(self.index_path.with_suffix(".json.imported"))
+
+    def lookup(self, prompt: str) -> Optional[Path]:
+        """Path of the cached image for this prompt, if any."""
+        key = prompt_key(prompt)
+        with self._index.transaction() as txn:
+            name = txn.get("prompts", key)
+            if not name:
+                return None
+            path = self.dir / name
+            blob = txn.get("blobs", name)
+            if not path.exists() or blob is None:
+                txn.delete("prompts", key)
+                txn.delete("blobs", name)
+                return None
+            blob["last_used"] = time.time()
+            txn.set("blobs", name, blob)
+            return path
+
+    @contextmanager
+    def single_flight(self, prompt: str):
+        """Serialize generation per prompt so concurrent requests share one result."""
+        key = prompt_key(prompt)
+        with self._lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+    def temp_path(self, suffix: str = ".png") -> Path:
+        return self.dir / f".tmp_{uuid.uuid4().hex}{suffix}"
+
+    def store(self, tmp_path: Path, prompt: Optional[str] = None) -> Path:
+        """
+        Move a finished temp file into the store under its content hash.
+
+        Args:
+            tmp_path: File written by the caller (consumed)
+            prompt: Index the blob under this prompt; None stores it unindexed
+
+        Returns:
+            Path of the content-addressed blob
+        """
+        digest = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            head = f.read(16)
+            digest.update(head)
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        name = f"{BLOB_PREFIX}{digest.hexdigest()}{sniff_extension(head)}"
+        path = self.dir / name
+
+        with self._index.transaction() as txn:
+            if path.exists():
+                os.remove(tmp_path)  # Same bytes already stored
+            else:
+                os.replace(tmp_path, path)
+            # A re-stored blob keeps the size of the variants it already has
+            known = txn.get("blobs", name) or {}
+            size = max(path.stat().st_size, known.get("size", 0))
+            txn.set("blobs", name, {"size": size, "last_used": time.time()})
+            if prompt:
+                txn.set("prompts", prompt_key(prompt), name)
+            self._evict(txn)
+        return path
+
+    def track_variants(self, blob_path) -> None:
+        """Count a blob's derived files (variants, ?w= resizes) against the size budget."""
+        name = Path(blob_path).name
+        if not name.startswith(BLOB_PREFIX):
+            return
+        size = 0
+        for path in self.dir.glob(Path(name).stem + ".*"):
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        with self._index.transaction() as txn:
+            blob = txn.get("blobs", name)
+            if blob is None or blob["size"] == size:
+                return
+            blob["size"] = size
+            txn.set("blobs", name, blob)
+            self._evict(txn)
+
+    def _evict(self, txn):
+        blobs = self._index.items("blobs")
+        total = sum(b["size"] for b in blobs.values())
+        evicted = set()
+        for name in sorted(blobs, key=lambda n: blobs[n]["last_used"]):
+            if total <= self.max_bytes or len(blobs) - len(evicted) <= 1:
+                break
+            total -= blobs[name]["size"]
+            evicted.add(name)
+            txn.delete("blobs", name)
+            # Derived variants share the blob's stem (img_<hash>.*)
+            for path in self.dir.glob(Path(name).stem + ".*"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            print(f"[ImageCache] Evicted {name}")
+        if evicted:
+            for key, name in self._index.items("prompts").items():
+                if name in evicted:
+                    txn.delete("prompts", key)
+
+    def stats(self) -> Dict:
+        blobs = self._index.items("blobs")
+        return {
+            "blobs": len(blobs),
+            "prompts": len(self._index.items("prompts")),
+            "bytes": sum(b["size"] for b in blobs.values()),
+            "max_bytes": self.max_bytes,
+        }
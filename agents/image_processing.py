@@ -0,0 +1,160 @@
+"""
+Image Processing - Streaming downloads and Instagram-ready image variants.
+
+Downloads are streamed to disk in chunks with a hard size cap instead of
+being buffered in memory. Each stored image then gets size-optimized
+variants next to it (same stem, so they share the content hash):
+- <stem>.ig.jpg     1080x1080 progressive JPEG for Instagram upload
+- <stem>.webp       1080x1080 WebP for in-app preview
+- <stem>.thumb.jpg  320x320 progressive JPEG for galleries
+- <stem>.w<N>.jpg   on-demand resized copies (?w=N on the image route)
+"""
+import os
+import re
+import uuid
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional
+
+MAX_DOWNLOAD_BYTES = int(float(os.getenv("MARKETING_IMAGE_MAX_MB", "15")) * 1024 * 1024)
+CHUNK_SIZE = 64 * 1024
+
+INSTAGRAM_SIZE = 1080
+THUMB_SIZE = 320
+# ?w= requests snap up to one of these so the on-disk cache stays bounded
+RESIZE_WIDTHS = (160, 320, 480, 640, 1080)
+
+# The image route may only serve these; posts.db, outbox.db (and their -wal
+# files) and the image index share the marketing_outputs directory
+IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif"})
+SAFE_FILENAME = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+# variant name -> (filename suffix, edge length, save options)
+VARIANTS = {
+    "instagram": (".ig.jpg", INSTAGRAM_SIZE, {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True}),
+    "webp": (".webp", INSTAGRAM_SIZE, {"format": "WEBP", "quality": 80, "method": 4}),
+    "thumbnail": (".thumb.jpg", THUMB_SIZE, {"format": "JPEG", "quality": 75, "optimize": True, "progressive": True}),
+}
+
+
+def is_servable_image(filename: str) -> bool:
+    """Plain file name (no path, no dotfile) with an image suffix."""
+    return bool(SAFE_FILENAME.match(filename or "")) and Path(filename).suffix.lower() in IMAGE_SUFFIXES
+
+
+class ImageTooLarge(ValueError):
+    """Raised when a download exceeds MAX_DOWNLOAD_BYTES."""
+
+
+def stream_download(url: str, dest: Path, timeout: int = 30, max_bytes: int = MAX_DOWNLOAD_BYTES) -> Path:
+    """
+    Stream a URL to disk without buffering it in memory.
+
+    Raises:
+        ImageTooLarge: if the declared or actual size exceeds max_bytes
+    """
+    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ImageTooLarge(f"Image is {int(declared)} bytes (limit {max_bytes})")
+
+        written = 0
+        try:
+            with open(dest, "wb") as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ImageTooLarge(f"Image exceeded {max_bytes} bytes")
+                    f.write(chunk)
+        except Exception:
+            Path(dest).unlink(missing_ok=True)
+            raise
+    return Path(dest)
+
+
+def _temp_path(path: Path) -> Path:
+    """Unique dotfile next to `path`, so concurrent writers never share one."""
+    return path.with_name(f".tmp_{uuid.uuid4().hex}_{path.name}")
+
+
+def variant_path(image_path, variant: str) -> Path:
+    image_path = Path(image_path)
+    return image_path.with_name(image_path.stem + VARIANTS[variant][0])
+
+
+def make_variants(image_path) -> Dict[str, Path]:
+    """
+    Create (or reuse) the Instagram, WebP and thumbnail variants of an image.
+
+    Returns:
+        Dict of variant name -> path; empty if Pillow is unavailable
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return {}
+
+    image_path = Path(image_path)
+    wanted = {name: variant_path(image_path, name) for name in VARIANTS}
+    missing = [name for name, path in wanted.items() if not path.exists()]
+    if not missing:
+        return wanted
+
+    try:
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            square = ImageOps.fit(img, (INSTAGRAM_SIZE, INSTAGRAM_SIZE), Image.LANCZOS)
+        for name in missing:
+            _, edge, options = VARIANTS[name]
+            out = square if edge == INSTAGRAM_SIZE else square.resize((edge, edge), Image.LANCZOS)
+            tmp = _temp_path(wanted[name])
+            try:
+                out.save(tmp, **options)
+                tmp.replace(wanted[name])
+            finally:
+                tmp.unlink(missing_ok=True)
+    except Exception as e:
+        print(f"[ImageProcessing] Could not create variants for {image_path.name}: {e}")
+        return {name: path for name, path in wanted.items() if path.exists()}
+    return wanted
+
+
+def resized_path(image_path, width: int) -> Path:
+    """
+    Path of a copy of the image at most `width` pixels wide, created on first request.
+
+    The width snaps up to the nearest RESIZE_WIDTHS entry; images already that
+    narrow are returned as-is.
+    """
+    image_path = Path(image_path)
+    width = next((w for w in RESIZE_WIDTHS if w >= width), RESIZE_WIDTHS[-1])
+    out = image_path.with_name(f"{image_path.stem}.w{width}.jpg")
+    if out.exists():
+        return out
+
+    from PIL import Image
+    with Image.open(image_path) as img:
+        if img.width <= width:
+            return image_path
+        img = img.convert("RGB")
+        img.thumbnail((width, width * img.height // img.width + 1), Image.LANCZOS)
+        tmp = _temp_path(out)
+        try:
+            img.save(tmp, format="JPEG", quality=80, optimize=True, progressive=True)
+            tmp.replace(out)
+        finally:
+            tmp.unlink(missing_ok=True)
+    return out
+
+
+def upload_path(image_path) -> str:
+    """Best file to upload: the Instagram JPEG variant when present."""
+    ig = variant_path(image_path, "instagram")
+    return str(ig) if ig.exists() else str(image_path)
+
+
+def variant_urls(image_path, url_prefix: str = "/marketing/image/") -> Optional[Dict[str, str]]:
+    paths = {name: variant_path(image_path, name) for name in VARIANTS}
+    urls = {name: url_prefix + path.name for name, path in paths.items() if path.exists()}
+    return urls or None
@@ -0,0 +1,186 @@
+"""
+Image Renderer - Offline branded post images (no network needed).
+
+Backgrounds are built from the brand palette with vectorized NumPy ops
+(gradients plus a light pattern) and cached per palette/style, fonts are
+loaded once per size, and text is word-wrapped by measured pixel width.
+Rendering a post is then a background copy, a few text draws and a JPEG
+encode, which makes this usable as a full image backend, not just a fallback.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SIZE = 1080
+STYLES = ("diagonal", "radial", "stripes", "dots")
+DEFAULT_PALETTE = {"primary": "#7c3aed", "secondary": "#4F46E5", "accent": "#10B981"}
+BLUEPRINT_PATH = Path(__file__).parent.parent / "pipeline_outputs" / "website_blueprint.json"
+
+FONT_CANDIDATES = [
+    "arialbd.ttf", "arial.ttf", "DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+    "C:\\Windows\\Fonts\\arialbd.ttf",
+]
+
+Palette = Tuple[Tuple[int, int, int], ...]
+
+
+def _hex_to_rgb(value: str) -> Tuple[int, int, int]:
+    value = (value or "").lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return (124, 58, 237)
+
+
+def palette_tuple(palette: Optional[Dict] = None) -> Palette:
+    palette = {**DEFAULT_PALETTE, **(palette or {})}
+    return tuple(_hex_to_rgb(palette[k]) for k in ("primary", "secondary", "accent"))
+
+
+def load_brand_palette() -> Dict:
+    """Brand colors from the generated website blueprint, if there is one."""
+    try:
+        return _load_palette(BLUEPRINT_PATH.stat().st_mtime)
+    except OSError:
+        return dict(DEFAULT_PALETTE)
+
+
+@lru_cache(maxsize=4)
+def _load_palette(_mtime: float) -> Dict:
+    try:
+        blueprint = json.loads(BLUEPRINT_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return dict(DEFAULT_PALETTE)
+    colors = blueprint.get("color_palette") or {}
+    if isinstance(colors, list):
+        # Older blueprints store a plain list; prefer the non-neutral colors
+        chromatic = [c for c in colors if len(set(_hex_to_rgb(c))) > 1]
+        colors = dict(zip(("primary", "secondary", "accent"), chromatic if len(chromatic) >= 2 else colors))
+    return {**DEFAULT_PALETTE, **colors} if isinstance(colors, dict) else dict(DEFAULT_PALETTE)
+
+
+@lru_cache(maxsize=16)
+def load_font(size: int):
+    """Load a TrueType font once per size (falls back to PIL's default)."""
+    from PIL import ImageFont
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=32)
+def render_background(palette: Palette, style: str, size: int = SIZE):
+    """Build a gradient + pattern background with NumPy (cached)."""
+    import numpy as np
+    from PIL import Image
+
+    c1, c2, accent = (np.array(c, dtype=np.float32) for c in palette)
+    ys, xs = np.ogrid[0:size, 0:size]
+    xs = xs.astype(np.float32) / (size - 1)
+    ys = ys.astype(np.float32) / (size - 1)
+
+    if style == "radial":
+        t = np.clip(np.sqrt((xs - 0.5) ** 2 + (ys - 0.4) ** 2) / 0.75, 0, 1)
+    else:
+        t = (xs + ys) / 2.0
+    rgb = c1 * (1 - t)[..., None] + c2 * t[..., None]
+
+    if style == "stripes":
+        mask = ((((xs - ys) * size) // 60) % 2 == 0).astype(np.float32) * 0.12
+    elif style == "dots":
+        cell = 54
+        dx = (xs * size) % cell - cell / 2
+        dy = (ys * size) % cell - cell / 2
+        mask = ((dx ** 2 + dy ** 2) < 36).astype(np.float32) * 0.35
+    else:
+        # Soft accent glow in the bottom-right corner
+        mask = np.clip(1 - np.sqrt((xs - 1) ** 2 + (ys - 1) ** 2) / 0.7, 0, 1) * 0.45
+    rgb = rgb * (1 - mask[..., None]) + accent * mask[..., None]
+
+    # Darken the middle band slightly so white text stays readable
+    band = np.exp(-((ys - 0.5) ** 2) / 0.05) * 0.25
+    rgb = rgb * (1 - band[..., None])
+
+    return Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), "RGB")
+
+
+def wrap_text(text: str, font, max_width: int, max_lines: int) -> List[str]:
+    """Greedy word wrap by measured pixel width."""
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if font.getlength(candidate) <= max_width or not current:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+    if current:
+        lines.append(current)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip(".,;:") + "…"
+    return lines
+
+
+def pick_style(text: str) -> str:
+    return STYLES[int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16) % len(STYLES)]
+
+
+def render_post_image(text: str, filepath, palette: Optional[Dict] = None,
+                      style: Optional[str] = None, brand_name: str = "") -> str:
+    """
+    Render a branded square post image with wrapped text.
+
+    Args:
+        text: Headline/prompt to lay out
+        filepath: Output path (JPEG)
+        palette: {"primary", "secondary", "accent"} hex colors; defaults to
+            the website blueprint's palette
+        style: One of STYLES; picked from the text when omitted
+        brand_name: Optional footer text
+
+    Returns:
+        The output path as a string
+    """
+    from PIL import ImageDraw
+
+    colors = palette_tuple(palette or load_brand_palette())
+    img = render_background(colors, style or pick_style(text)).copy()
+    draw = ImageDraw.Draw(img)
+
+    text = " ".join(text.split())[:160]
+    max_width = int(SIZE * 0.8)
+    for font_size in (84, 72, 60, 52, 44):
+        font = load_font(font_size)
+        lines = wrap_text(text, font, max_width, max_lines=6)
+        line_height = int(font_size * 1.25)
+        if len(lines) * line_height <= SIZE * 0.6:
+            break
+
+    y = (SIZE - len(lines) * line_height) // 2
+    for line in lines:
+        x = (SIZE - font.getlength(line)) / 2
+        draw.text((x + 3, y + 3), line, fill=(0, 0, 0), font=font)
+        draw.text((x, y), line, fill=(255, 255, 255), font=font)
+        y += line_height
+
+    if brand_name:
+        footer = load_font(36)
+        draw.text(((SIZE - footer.getlength(brand_name)) / 2, SIZE - 90), brand_name,
+                  fill=(255, 255, 255), font=footer)
+
+    img.save(filepath, format="JPEG", quality=88, optimize=False)
+    return str(filepath)
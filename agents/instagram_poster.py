@@ -4,25 +4,169 @@ No Facebook, No Zapier, No Business Account needed!
 Just your regular Instagram account.
 """
 import os
-import json
+import socket
+import threading
+import importlib.util
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
-try:
-    from instagrapi import Client
-    INSTAGRAPI_AVAILABLE = True
-except ImportError:
-    INSTAGRAPI_AVAILABLE = False
+# instagrapi is only located here; it is imported when a post is first made
+INSTAGRAPI_AVAILABLE = importlib.util.find_spec("instagrapi") is not None
+if not INSTAGRAPI_AVAILABLE:
     print("⚠️ Instagrapi not installed. Run: pip install instagrapi")
 
+SESSION_DIR = Path(os.getenv("INSTAGRAM_SESSION_DIR", Path(__file__).parent.parent / ".instagram_sessions"))
+
+
+def _default_client_factory():
+    from instagrapi import Client
+    client = Client()
+    client.delay_range = [1, 3]  # Delay between requests to avoid rate limits
+    return client
+
+
+def _configured_client_factory():
+    """instagrapi, or the local stand-in when INSTAGRAM_CLIENT=standin."""
+    if os.getenv("INSTAGRAM_CLIENT", "").lower() == "standin":
+        from tools.instagram_standin import StandinClient
+        return StandinClient
+    return _default_client_factory
+
+
+def _is_session_expired(error: Exception) -> bool:
+    """instagrapi raises LoginRequired (or 'login_required' responses) when a session dies."""
+    return type(error).__name__ in ("LoginRequired", "ReloginAttemptExceeded") or "login_required" in str(error).lower()
+
+
+# Raised while the photo was being sent: Instagram may have published it anyway
+DELIVERY_UNKNOWN_ERRORS = ("ReadTimeout", "Timeout", "ClientRequestTimeout", "ClientConnectionError",
+                           "ChunkedEncodingError", "ConnectionError", "RemoteDisconnected")
+# ...unless the connection was never made. instagrapi re-raises requests errors
+# as ClientConnectionError("<name> <message>"), so the cause is only in the text.
+NEVER_SENT_MARKERS = ("ConnectTimeout", "NewConnectionError", "NameResolutionError",
+                      "Failed to establish a new connection", "Connection refused", "SSLError")
+
+
+class UploadOutcomeUnknown(Exception):
+    """The upload was sent but no answer came back, so it may or may not have been posted."""
+
+
+def _never_sent(error: Exception) -> bool:
+    """Refused, DNS, connect-timeout and TLS failures: the upload never left (same rule as the webhook client)."""
+    if isinstance(error, (ConnectionRefusedError, socket.gaierror)):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(marker in text for marker in NEVER_SENT_MARKERS)
+
+
+def _is_delivery_unknown(error: Exception) -> bool:
+    """Timeouts and dropped connections during an upload, except failures to connect at all."""
+    if _never_sent(error):
+        return False
+    return type(error).__name__ in DELIVERY_UNKNOWN_ERRORS or isinstance(error, (TimeoutError, ConnectionError))
+
+
+class ClientPool:
+    """
+    One warm, logged-in client per Instagram account for the whole process.
+    
+    Session settings (cookies, device ids) are saved to SESSION_DIR after each
+    login and loaded on startup, so a restart reuses the session instead of
+    doing a full password login. Calls for the same account are serialized
+    because an instagrapi Client is not thread-safe.
+    """
+    
+    def __init__(self, session_dir: Path = SESSION_DIR, client_factory=None):
+        self.session_dir = Path(session_dir)
+        self.client_factory = client_factory or _configured_client_factory()
+        self._lock = threading.Lock()
+        self._clients: Dict[str, object] = {}
+        self._account_locks: Dict[str, threading.Lock] = {}
+        self.logins = 0
+    
+    @property
+    def available(self) -> bool:
+        """False only when the pool needs instagrapi and it isn't installed."""
+        return INSTAGRAPI_AVAILABLE or self.client_factory is not _default_client_factory
+    
+    def _session_path(self, username: str) -> Path:
+        return self.session_dir / f"{username.lower()}.json"
+    
+    def account_lock(self, username: str) -> threading.Lock:
+        """Per-account lock (not re-entrant: get/relogin run under it, discard takes it)."""
+        with self._lock:
+            return self._account_locks.setdefault(username.lower(), threading.Lock())
+    
+    def get(self, username: str, password: str):
+        """Warm client for the account (call with account_lock held)."""
+        key = username.lower()
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        
+        client = self.client_factory()
+        session_path = self._session_path(username)
+        restored = False
+        if session_path.exists():
+            try:
+                client.load_settings(session_path)
+                restored = True
+                print(f"[Instagram] Reusing saved session for {username}")
+            except Exception as e:
+                print(f"[Instagram] Ignoring unreadable session file: {e}")
+        # With restored settings this is a no-op (no network round-trip)
+        client.login(username, password)
+        if not restored:
+            self.logins += 1
+        self._save_session(client, username)
+        self._clients[key] = client
+        return client
+    
+    def relogin(self, username: str, password: str):
+        """Fresh password login after a session expired (keeps the device ids)."""
+        key = username.lower()
+        old = self._clients.pop(key, None)
+        client = self.client_factory()
+        if old is not None:
+            try:
+                client.set_uuids(old.get_settings().get("uuids", {}))
+            except Exception:
+                pass
+        print(f"[Instagram] Session expired, logging in again as {username}...")
+        client.login(username, password)
+        self.logins += 1
+        self._save_session(client, username)
+        self._clients[key] = client
+        return client
+    
+    def _save_session(self, client, username: str):
+        try:
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+            path = self._session_path(username)
+            client.dump_settings(path)
+            os.chmod(path, 0o600)
+        except Exception as e:
+            print(f"[Instagram] Could not save session: {e}")
+    
+    def discard(self, username: str):
+        """Forget the account's client and saved session (e.g. wrong password)."""
+        with self.account_lock(username):
+            self._clients.pop(username.lower(), None)
+            self._session_path(username).unlink(missing_ok=True)
+
+
+# Process-wide pool shared by every InstagramPoster
+client_pool = ClientPool()
+
+
 class InstagramPoster:
     """
     Free Instagram posting using Instagrapi library.
     Works with regular Instagram accounts - NO Facebook needed!
     """
     
-    def __init__(self):
+    def __init__(self, pool: ClientPool = None):
         # Get credentials from environment
         self.username = os.getenv("INSTAGRAM_USERNAME", "")
         self.password = os.getenv("INSTAGRAM_PASSWORD", "")
@@ -30,12 +174,33 @@ class InstagramPoster:
         self.output_dir = Path(__file__).parent.parent / "marketing_outputs"
         self.output_dir.mkdir(exist_ok=True)
         
-        self.client = None
-        if INSTAGRAPI_AVAILABLE:
-            self.client = Client()
-            self.client.delay_range = [1, 3]  # Delay between requests to avoid rate limits
+        self.pool = pool or client_pool
+    
+    @staticmethod
+    def _photo_upload(client, image_path: str, caption: str):
+        try:
+            return client.photo_upload(path=image_path, caption=caption)
+        except Exception as e:
+            if _is_delivery_unknown(e):
+                raise UploadOutcomeUnknown(f"{type(e).__name__}: {e}") from e
+            raise
+    
+    def _upload(self, image_path: str, caption: str):
+        """Upload with the pooled client; re-authenticate once if the session expired."""
+        with self.pool.account_lock(self.username):
+            client = self.pool.get(self.username, self.password)
+            try:
+                return self._photo_upload(client, image_path, caption)
+            except UploadOutcomeUnknown:
+                raise
+            except Exception as e:
+                if not _is_session_expired(e):
+                    raise
+                client = self.pool.relogin(self.username, self.password)
+                return self._photo_upload(client, image_path, caption)
     
-    def post_to_instagram(self, caption: str, image_path: str, hashtags: list = None) -> Dict:
+    def post_to_instagram(self, caption: str, image_path: str, hashtags: list = None,
+                          post_id: str = None) -> Dict:
         """
         Post directly to Instagram using Instagrapi (FREE, NO Facebook needed).
         
@@ -43,11 +208,13 @@ class InstagramPoster:
             caption: Post caption
             image_path: Local path to image file
             hashtags: List of hashtags
+            post_id: Post store id of the generated post, if any
             
         Returns:
-            Dict with status and post details
+            Dict with status and post details; status "unknown" when the
+            upload timed out and may have been published (don't retry it)
         """
-        if not INSTAGRAPI_AVAILABLE:
+        if not self.pool.available:
             return {
                 "status": "error",
                 "message": "Instagrapi not installed. Run: pip install instagrapi"
@@ -73,38 +240,40 @@ class InstagramPoster:
                     "message": f"Image file not found: {image_path}"
                 }
             
-            # Login to Instagram
-            print(f"[Instagram] Logging in as {self.username}...")
-            self.client.login(self.username, self.password)
-            print("[Instagram] Login successful!")
-            
-            # Upload photo
-            print(f"[Instagram] Uploading photo from {image_path}...")
-            media = self.client.photo_upload(
-                path=image_path,
-                caption=full_caption
-            )
+            # Upload photo (logs in only if there's no warm client or saved session)
+            print(f"[Instagram] Uploading photo from {image_path} as {self.username}...")
+            media = self._upload(image_path, full_caption)
             
-            post_id = media.pk
-            self._save_post_record(caption, image_path, hashtags, str(post_id))
+            media_id = str(media.pk)
+            post_url = f"https://www.instagram.com/p/{media.code}/"
+            self._save_post_record(caption, image_path, hashtags, media_id, post_url, post_id)
             
-            print(f"[Instagram] ✅ Posted successfully! ID: {post_id}")
-            print(f"[Instagram] View at: https://www.instagram.com/p/{media.code}/")
+            print(f"[Instagram] ✅ Posted successfully! ID: {media_id}")
+            print(f"[Instagram] View at: {post_url}")
             
             return {
                 "status": "success",
-                "message": f"Posted to Instagram successfully! View at: https://www.instagram.com/p/{media.code}/",
-                "post_id": str(post_id),
-                "post_url": f"https://www.instagram.com/p/{media.code}/",
+                "message": f"Posted to Instagram successfully! View at: {post_url}",
+                "post_id": media_id,
+                "post_url": post_url,
                 "caption": full_caption[:100] + "...",
                 "timestamp": datetime.now().isoformat()
             }
                 
+        except UploadOutcomeUnknown as e:
+            print(f"[Instagram] ⚠️ No answer to the upload, it may have been posted: {e}")
+            return {
+                "status": "unknown",
+                "message": f"Instagram did not confirm the upload ({e}). Check the account before posting again."
+            }
         except Exception as e:
             error_msg = str(e)
             print(f"[Instagram] ❌ Error: {error_msg}")
             
             # Provide helpful error messages
+            if "bad_password" in error_msg.lower() or type(e).__name__ == "BadPassword":
+                self.pool.discard(self.username)
+            
             if "challenge_required" in error_msg.lower():
                 error_msg = "Instagram requires verification. Please log in to Instagram on your phone/browser and complete any security checks, then try again."
             elif "login" in error_msg.lower() or "password" in error_msg.lower():
@@ -117,20 +286,21 @@ class InstagramPoster:
                 "message": f"Error posting to Instagram: {error_msg}"
             }
     
-    def _save_post_record(self, caption: str, image_path: str, hashtags: list, post_id: str):
-        """Save a record of the posted content."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        record = {
-            "post_id": post_id,
+    def _save_post_record(self, caption: str, image_path: str, hashtags: list, media_id: str,
+                          post_url: str, post_id: str = None):
+        """Mark the stored post as posted (or record a new posted entry)."""
+        from agents.post_store import get_post_store
+        store = get_post_store()
+        if post_id and store.mark_posted(post_id, media_id, post_url):
+            return
+        store.create({
             "caption": caption,
             "image_path": image_path,
             "hashtags": hashtags,
+            "instagram_id": media_id,
+            "post_url": post_url,
             "posted_at": datetime.now().isoformat()
-        }
-        
-        filepath = self.output_dir / f"posted_{timestamp}.json"
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(record, f, indent=2, ensure_ascii=False)
+        }, status="posted")
     
     def get_setup_instructions(self) -> Dict:
         """Get instructions for setting up Instagram posting (FREE, NO Facebook!)."""
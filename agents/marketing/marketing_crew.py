@@ -1,9 +1,26 @@
+"""
+Single Instagram post crew.
+
+The YAML configs and the shared LLM are loaded once per process, and
+get_crew() compiles the crew once and hands out cheap copies. After the post
+idea, image creation and posting prep run as async tasks side by side. The
+webhook send waits for both. Tool results are cached per crew run, so the
+agent can't send the same payload twice. Set MARKETING_CREW_VERBOSE=1 for
+CrewAI's step-by-step logs.
+"""
+import copy
 import os
+import threading
+from functools import lru_cache
+
 import yaml
 from crewai import LLM, Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from tools.zapier_instagram_webhook import ZapierInstagramWebhookTool
 
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+VERBOSE = os.getenv("MARKETING_CREW_VERBOSE", "0") == "1"
+
 # Placeholder for DALL-E since we don't have a key
 from crewai.tools import BaseTool
 class DummyDallETool(BaseTool):
@@ -12,43 +29,59 @@ class DummyDallETool(BaseTool):
     def _run(self, query: str) -> str:
         return "https://via.placeholder.com/1080x1080.png?text=AI+Generated+Image"
 
+
+def _cache_successful_sends(_args=None, result=None) -> bool:
+    # A retried failure should really resend; a repeated success should not
+    return isinstance(result, str) and result.startswith("✅")
+
+
+@lru_cache(maxsize=None)
+def _load_config(name: str) -> dict:
+    with open(os.path.join(CONFIG_DIR, f"{name}.yaml"), "r") as f:
+        return yaml.safe_load(f)
+
+
+@lru_cache(maxsize=1)
+def _shared_llm() -> LLM:
+    return LLM(model="gemini/gemini-2.5-flash", api_key=os.getenv("GEMINI_API_KEY"))
+
+
 @CrewBase
 class SingleInstagramPostCreatorCrew:
     """SingleInstagramPostCreator crew"""
-    
+
     def __init__(self):
-        # Load configs manually since we are not using the full CLI structure
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        with open(os.path.join(base_path, "config", "agents.yaml"), "r") as f:
-            self.agents_config = yaml.safe_load(f)
-        with open(os.path.join(base_path, "config", "tasks.yaml"), "r") as f:
-            self.tasks_config = yaml.safe_load(f)
+        # Parsed YAML is cached; copy it since CrewAI fills in agents/tools in place
+        self.agents_config = copy.deepcopy(_load_config("agents"))
+        self.tasks_config = copy.deepcopy(_load_config("tasks"))
 
     @agent
     def social_media_content_strategist(self) -> Agent:
         return Agent(
             config=self.agents_config["social_media_content_strategist"],
             tools=[], # Removed SerperDevTool
-            verbose=True,
-            llm=LLM(model="gemini/gemini-2.5-flash", api_key=os.getenv("GEMINI_API_KEY"))
+            verbose=VERBOSE,
+            llm=_shared_llm()
         )
-    
+
     @agent
     def content_publishing_manager(self) -> Agent:
+        webhook_tool = ZapierInstagramWebhookTool()
+        webhook_tool.cache_function = _cache_successful_sends
         return Agent(
             config=self.agents_config["content_publishing_manager"],
-            tools=[ZapierInstagramWebhookTool()],
-            verbose=True,
-            llm=LLM(model="gemini/gemini-2.5-flash", api_key=os.getenv("GEMINI_API_KEY"))
+            tools=[webhook_tool],
+            verbose=VERBOSE,
+            llm=_shared_llm()
         )
-    
+
     @agent
     def visual_content_creator(self) -> Agent:
         return Agent(
             config=self.agents_config["visual_content_creator"],
             tools=[DummyDallETool()], # Replaced DallETool
-            verbose=True,
-            llm=LLM(model="gemini/gemini-2.5-flash", api_key=os.getenv("GEMINI_API_KEY"))
+            verbose=VERBOSE,
+            llm=_shared_llm()
         )
 
     @task
@@ -56,15 +89,24 @@ class SingleInstagramPostCreatorCrew:
         return Task(
             config=self.tasks_config["generate_single_post_content_idea"],
         )
-    
+
     @task
     def create_single_instagram_image(self) -> Task:
         return Task(
             config=self.tasks_config["create_single_instagram_image"],
+            async_execution=True,  # Runs alongside prepare_instagram_post
+        )
+
+    @task
+    def prepare_instagram_post(self) -> Task:
+        return Task(
+            config=self.tasks_config["prepare_instagram_post"],
+            async_execution=True,
         )
-    
+
     @task
     def send_content_to_zapier_webhook(self) -> Task:
+        # Sync task: waits for both async tasks in its context
         return Task(
             config=self.tasks_config["send_content_to_zapier_webhook"],
         )
@@ -75,5 +117,24 @@ class SingleInstagramPostCreatorCrew:
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            cache=True,
+            verbose=VERBOSE,
         )
+
+
+_compiled = None
+_compiled_lock = threading.Lock()
+
+
+def get_crew() -> Crew:
+    """
+    A ready-to-kickoff crew built from the process-wide compiled definition.
+
+    Each call returns a copy (agents, tasks and tool cache of its own, same
+    LLM client), so concurrent kickoffs don't share task outputs.
+    """
+    global _compiled
+    with _compiled_lock:
+        if _compiled is None:
+            _compiled = SingleInstagramPostCreatorCrew().crew()
+        return _compiled.copy()
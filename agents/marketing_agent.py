@@ -4,12 +4,141 @@ Posts directly to Instagram using FREE Instagrapi (no Facebook needed).
 """
 import os
 import json
-import requests
-import urllib.request
-from datetime import datetime
+import uuid
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List
 from llm.gemini_llm import GeminiLLM
+from llm.json_reply import parse_json
+from agents.image_cache import ImageCache
+from agents.image_processing import stream_download, make_variants, upload_path, variant_urls
+from agents.post_store import get_post_store
+from memory.shared_state import get_shared_state
+
+# "pollinations" (AI images, offline render on failure) or "offline" (always render locally)
+IMAGE_BACKEND = os.getenv("MARKETING_IMAGE_BACKEND", "pollinations").lower()
+IMAGE_CACHE = ImageCache(Path(__file__).parent.parent / "marketing_outputs")
+
+# Image downloads run here so they overlap the caption LLM call
+IMAGE_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("MARKETING_IMAGE_WORKERS", "4")),
+                                thread_name_prefix="marketing-image")
+# Job state is shared so any server worker can answer /marketing/image-job polls;
+# the completion events only exist in the worker running the job
+IMAGE_JOBS_NAMESPACE = "image_jobs"
+IMAGE_JOB_TTL = 24 * 3600
+IMAGE_JOB_EVENTS: Dict[str, threading.Event] = {}
+IMAGE_JOBS_LOCK = threading.Lock()
+IMAGE_WAIT_SECONDS = 90
+
+# Content calendars: posts per multi-post LLM call, concurrent calls, hard cap
+CALENDAR_BATCH_SIZE = int(os.getenv("MARKETING_CALENDAR_BATCH", "7"))
+CALENDAR_LLM_WORKERS = int(os.getenv("MARKETING_CALENDAR_WORKERS", "3"))
+CALENDAR_MAX_POSTS = 62
+
+
+def _image_url(image_path: str) -> str:
+    return f"/marketing/image/{Path(image_path).name}"
+
+
+def get_image_job(job_id: str) -> Optional[Dict]:
+    """Current state of an image job."""
+    return get_shared_state().get(IMAGE_JOBS_NAMESPACE, job_id)
+
+
+def _update_image_job(job_id: str, **fields):
+    get_shared_state().update(IMAGE_JOBS_NAMESPACE, job_id, lambda job: {**(job or {}), **fields},
+                              ttl=IMAGE_JOB_TTL)
+
+
+def wait_for_image_job(job_id: str, timeout: float = IMAGE_WAIT_SECONDS) -> Dict:
+    """Block until an image job finishes; returns its image fields."""
+    with IMAGE_JOBS_LOCK:
+        done = IMAGE_JOB_EVENTS.get(job_id)
+    if done is not None:
+        done.wait(timeout)
+    else:
+        # Started by another worker: poll the shared state
+        deadline = time.time() + timeout
+        while time.time() < deadline and (get_image_job(job_id) or {}).get("status") == "pending":
+            time.sleep(0.5)
+    state = get_image_job(job_id)
+    if not state:
+        return {}
+    return {"image_path": state["image_path"], "image_url": state["image_url"],
+            "variants": state.get("variants"), "image_status": state["status"]}
+
+
+def _make_variants(image_path) -> None:
+    """Create an image's variants and count them against the cache budget."""
+    make_variants(image_path)
+    IMAGE_CACHE.track_variants(image_path)
+
+
+def _fallback_post(topic: str, brand_name: str) -> Dict:
+    """Template post used when the LLM reply is missing or unparseable."""
+    return {
+        "caption": f"🚀 {topic} - Discover how we can help you succeed! {brand_name} is here for you. 💪",
+        "hashtags": ["business", "success", "growth", "entrepreneur", "motivation",
+                     topic.lower().replace(" ", ""), brand_name.lower()],
+        "image_prompt": f"Professional business image about {topic}"
+    }
+
+
+def _competitor_facts(topic: str) -> str:
+    """Prompt lines about known competitors in the builder's industry relevant to the topic ('' if none)."""
+    try:
+        from agents.competitor_index import get_competitor_index
+        from memory import memory_manager as mem
+        industry = mem.load_builder().get("industry") or ""
+        facts = get_competitor_index().positioning_facts(industry=industry, features=topic)
+    except Exception:
+        return ""
+    return f"\nCompetitors to stand apart from (don't name them):\n{facts}" if facts else ""
+
+
+def calendar_slots(topics: Optional[List[str]] = None, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, count: Optional[int] = None) -> List[Dict]:
+    """
+    Expand a topic list and/or date range into calendar slots.
+    
+    Dates are daily from start_date to end_date (inclusive), or `count` days
+    from start_date. Topics are cycled over the dates; slots without a topic
+    let the LLM pick one. Without dates, one slot per topic (or `count`
+    slots). At most CALENDAR_MAX_POSTS slots are returned.
+    
+    Returns:
+        List of {"date": "YYYY-MM-DD" or None, "topic": str or None}
+    """
+    if count is not None:
+        if isinstance(count, bool) or not isinstance(count, int):
+            raise ValueError("count must be an integer")
+        if count < 1:
+            raise ValueError("count must be positive")
+        count = min(count, CALENDAR_MAX_POSTS)
+    if topics is not None and (not isinstance(topics, list) or not all(isinstance(t, str) for t in topics)):
+        raise ValueError("topics must be a list of strings")
+    topics = [t.strip() for t in (topics or []) if t and t.strip()]
+    dates: List[Optional[str]] = []
+    if start_date:
+        start = date.fromisoformat(start_date)
+        if end_date:
+            days = (date.fromisoformat(end_date) - start).days + 1
+        else:
+            days = count or len(topics) or 7
+        if days < 1:
+            raise ValueError("end_date must not be before start_date")
+        dates = [(start + timedelta(days=i)).isoformat() for i in range(min(days, CALENDAR_MAX_POSTS))]
+    elif topics:
+        dates = [None] * (count or len(topics))
+    else:
+        raise ValueError("Provide a topic list or a start_date")
+    
+    slots = [{"date": d, "topic": topics[i % len(topics)] if topics else None} for i, d in enumerate(dates)]
+    return slots[:CALENDAR_MAX_POSTS]
+
 
 class MarketingAgent:
     """Agent for generating and posting social media content."""
@@ -22,27 +151,39 @@ class MarketingAgent:
         # Zapier webhook URL - user can configure this
         self.webhook_url = os.getenv("ZAPIER_WEBHOOK_URL", "https://hooks.zapier.com/hooks/catch/25461153/uzfgb5n/")
     
-    def generate_post(self, topic: str, audience: str, tone: str, brand_name: str = "GrowthHub") -> Dict:
+    def generate_post(self, topic: str, audience: str, tone: str, brand_name: str = "GrowthHub",
+                      wait_for_image: bool = True) -> Dict:
         """
         Generate a complete Instagram post with caption, hashtags, and image prompt.
         
+        Image generation starts right away from a topic-based draft prompt and
+        runs alongside the caption call; once the caption's image_prompt
+        arrives a refined image is started and becomes the post image.
+        
         Args:
             topic: What the post is about
             audience: Target audience
             tone: Tone of voice (professional, casual, exciting, etc.)
             brand_name: Brand name for the post
+            wait_for_image: If False, return as soon as the caption is ready
+                with image_status "pending" and an image_job id to poll
             
         Returns:
             Dict with caption, hashtags, image_prompt, image_url
         """
         print(f"[Marketing] Generating post for: {topic}")
         
+        draft_prompt = f"Professional business image about {topic}"
+        draft = IMAGE_POOL.submit(self._generate_image, draft_prompt, brand_name)
+        
+        competitors = _competitor_facts(topic)
+        
         prompt = f"""Create an Instagram post for a business.
 
 Topic: {topic}
 Target Audience: {audience}
 Tone: {tone}
-Brand: {brand_name}
+Brand: {brand_name}{competitors}
 
 Generate:
 1. A compelling caption (2-3 sentences, engaging, with emojis)
@@ -57,113 +198,238 @@ Return ONLY valid JSON:
 }}"""
         
         try:
-            response = self.llm.call(prompt, max_tokens=500)
-            response = response.strip()
-            
-            # Clean JSON from markdown
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response)
-            
-            # Generate and download image
-            result["image_path"] = self._generate_image(result.get("image_prompt", topic))
-            # Create URL for preview in UI
-            image_filename = Path(result["image_path"]).name
-            result["image_url"] = f"/marketing/image/{image_filename}"
+            response = self.llm.call(prompt, max_tokens=500, tenant=brand_name)
+            result = parse_json(response)
             
         except Exception as e:
             print(f"[Marketing] Error: {e}")
-            # Fallback content
-            fallback_image_path = self._generate_image(f"Professional business image about {topic}")
-            image_filename = Path(fallback_image_path).name
-            result = {
-                "caption": f"🚀 {topic} - Discover how we can help you succeed! {brand_name} is here for you. 💪",
-                "hashtags": ["business", "success", "growth", "entrepreneur", "motivation", 
-                            topic.lower().replace(" ", ""), brand_name.lower()],
-                "image_prompt": f"Professional business image about {topic}",
-                "image_url": f"/marketing/image/{image_filename}",
-                "image_path": fallback_image_path
-            }
-        
-        # Save the generated post
-        self._save_post(result, topic)
+            result = _fallback_post(topic, brand_name)
+        
+        # Refine the image with the caption's prompt (reuse the draft if it's the same)
+        image_prompt = result.get("image_prompt") or draft_prompt
+        refined = draft if image_prompt == draft_prompt else IMAGE_POOL.submit(self._generate_image, image_prompt,
+                                                                                brand_name)
+        
+        # Save the generated post; the image fields are filled in when it's ready
+        post_id = self._save_post(result, topic, brand_name)
+        job_id = self._track_image(draft, refined, post_id)
+        
+        if wait_for_image:
+            result.update(wait_for_image_job(job_id))
+        else:
+            result.update({"image_job": job_id, "image_status": "pending", "image_url": None})
         
         return result
     
-    def _generate_image(self, prompt: str) -> str:
+    def generate_calendar(self, slots: List[Dict], audience: str, tone: str,
+                          brand_name: str = "GrowthHub") -> Iterator[Dict]:
         """
-        Generate and download AI image using FREE Pollinations.ai API.
-        No API key needed!
+        Generate a content calendar, yielding events as posts finish.
+        
+        Slots are split into batches of CALENDAR_BATCH_SIZE, each written by
+        one multi-post LLM call; up to CALENDAR_LLM_WORKERS calls run at once.
+        Every post's image is started on IMAGE_POOL as soon as its batch
+        returns, and posts are yielded in completion order.
+        
+        Args:
+            slots: Output of calendar_slots()
+            audience: Target audience
+            tone: Tone of voice
+            brand_name: Brand name for the posts
+            
+        Yields:
+            {"type": "plan", ...} first, then {"type": "post", "index", "post"}
+            per post, then {"type": "done", "count", "seconds"}
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"post_image_{timestamp}.png"
-        filepath = self.output_dir / filename
+        started = time.monotonic()
+        print(f"[Marketing] Generating calendar: {len(slots)} posts")
+        yield {"type": "plan", "count": len(slots), "slots": slots}
+        
+        batches = [list(range(i, min(i + CALENDAR_BATCH_SIZE, len(slots))))
+                   for i in range(0, len(slots), CALENDAR_BATCH_SIZE)]
+        images: Dict[Future, tuple] = {}
+        done_count = 0
+        with ThreadPoolExecutor(max_workers=max(1, CALENDAR_LLM_WORKERS),
+                                thread_name_prefix="marketing-calendar") as pool:
+            calls = {pool.submit(self._generate_batch, [slots[i] for i in batch],
+                                 audience, tone, brand_name): batch for batch in batches}
+            pending = set(calls)
+            # One loop over LLM batches and images, so each post streams as soon
+            # as its image lands even while later batches are still being written
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future in calls:
+                        for index, post in zip(calls[future], future.result()):
+                            post["scheduled_date"] = slots[index]["date"]
+                            post_id = self._save_post(post, post["topic"], brand_name)
+                            image = IMAGE_POOL.submit(self._generate_image, post["image_prompt"], brand_name)
+                            images[image] = (index, post, post_id)
+                            pending.add(image)
+                        continue
+                    
+                    index, post, post_id = images[future]
+                    try:
+                        image_path = future.result()
+                        fields = {"image_path": image_path, "image_url": _image_url(image_path),
+                                  "variants": variant_urls(image_path), "image_status": "ready"}
+                        self._update_post(post_id, fields)
+                    except Exception as e:
+                        print(f"[Marketing] Calendar image {index} failed: {e}")
+                        fields = {"image_url": None, "image_status": "error"}
+                    post.update(fields)
+                    done_count += 1
+                    yield {"type": "post", "index": index, "post": post}
+        
+        yield {"type": "done", "count": done_count, "seconds": round(time.monotonic() - started, 2)}
+    
+    def _generate_batch(self, slots: List[Dict], audience: str, tone: str, brand_name: str) -> List[Dict]:
+        """Write several posts with one LLM call (template posts for anything missing)."""
+        lines = []
+        for n, slot in enumerate(slots, 1):
+            when = f" (publishing {slot['date']})" if slot.get("date") else ""
+            lines.append(f"{n}. {slot.get('topic') or 'Pick a fresh topic that fits the brand'}{when}")
+        
+        prompt = f"""Create {len(slots)} Instagram posts for a business content calendar.
+
+Target Audience: {audience}
+Tone: {tone}
+Brand: {brand_name}
+
+Posts (one per line; vary the angle so the feed doesn't repeat itself):
+{chr(10).join(lines)}
+
+For each post generate:
+1. The topic (as given, or the one you picked)
+2. A compelling caption (2-3 sentences, engaging, with emojis)
+3. 10-15 relevant hashtags
+4. An image description for AI image generation
+
+Return ONLY a valid JSON array with exactly {len(slots)} objects, in order:
+[
+    {{
+        "topic": "Post topic",
+        "caption": "Your engaging caption here with emojis 🚀",
+        "hashtags": ["hashtag1", "hashtag2", "hashtag3"],
+        "image_prompt": "Description of the image to generate"
+    }}
+]"""
         
         try:
-            # Use Pollinations.ai - FREE AI image generation (no API key!)
-            safe_prompt = prompt.replace(" ", "%20")
-            image_url = f"https://image.pollinations.ai/prompt/{safe_prompt}?width=1080&height=1080&nologo=true"
-            
-            print(f"[Marketing] Generating AI image: {prompt[:50]}...")
-            
-            # Download with proper headers
-            req = urllib.request.Request(
-                image_url,
-                headers={'User-Agent': 'Mozilla/5.0'}
-            )
-            
-            with urllib.request.urlopen(req, timeout=30) as response:
-                with open(filepath, 'wb') as f:
-                    f.write(response.read())
-            
-            print(f"[Marketing] Image saved: {filepath}")
-            return str(filepath)
-            
+            response = self.llm.call(prompt, max_tokens=350 * len(slots) + 200, tenant=brand_name)
+            results = parse_json(response)
+            if not isinstance(results, list):
+                raise ValueError("expected a JSON array")
         except Exception as e:
-            print(f"[Marketing] Error generating image: {e}")
-            # Create a simple colored image as fallback
-            return self._create_fallback_image(filepath, prompt)
+            print(f"[Marketing] Calendar batch error: {e}")
+            results = []
+        
+        posts = []
+        for n, slot in enumerate(slots):
+            topic = slot.get("topic") or "Business Growth"
+            item = results[n] if n < len(results) and isinstance(results[n], dict) else {}
+            if not item.get("caption"):
+                item = _fallback_post(topic, brand_name)
+            item["topic"] = slot.get("topic") or item.get("topic") or topic
+            item.setdefault("hashtags", [])
+            item["image_prompt"] = item.get("image_prompt") or f"Professional business image about {item['topic']}"
+            posts.append(item)
+        return posts
     
-    def _create_fallback_image(self, filepath: Path, text: str) -> str:
-        """Create a simple colored image with text as fallback."""
-        try:
-            from PIL import Image, ImageDraw, ImageFont
-            
-            # Create a gradient background
-            img = Image.new('RGB', (1080, 1080), color='#7c3aed')
-            draw = ImageDraw.Draw(img)
-            
-            # Add text
+    def _track_image(self, draft: Future, refined: Future, post_id: str) -> str:
+        """Register an image job and fill in the post once the image lands."""
+        job_id = uuid.uuid4().hex[:12]
+        with IMAGE_JOBS_LOCK:
+            IMAGE_JOB_EVENTS[job_id] = threading.Event()
+        get_shared_state().set(IMAGE_JOBS_NAMESPACE, job_id, {"status": "pending", "image_url": None,
+                               "image_path": None, "draft_url": None}, ttl=IMAGE_JOB_TTL)
+        
+        def on_draft(future: Future):
+            if future is not refined and not future.exception():
+                _update_image_job(job_id, draft_url=_image_url(future.result()))
+        
+        def on_refined(future: Future):
+            fields, status = {}, "ready"
             try:
-                font = ImageFont.truetype("arial.ttf", 60)
-            except:
-                font = ImageFont.load_default()
+                image_path = future.result() if not future.exception() else draft.result()
+                fields = {"image_path": image_path, "image_url": _image_url(image_path),
+                          "variants": variant_urls(image_path)}
+                self._update_post(post_id, fields)
+            except Exception as e:
+                print(f"[Marketing] Image job {job_id} failed: {e}")
+                status = "error"
+            _update_image_job(job_id, status=status, **fields)
+            with IMAGE_JOBS_LOCK:
+                # Waiters hold their own reference; later waits fall back to polling
+                IMAGE_JOB_EVENTS.pop(job_id).set()
+        
+        draft.add_done_callback(on_draft)
+        refined.add_done_callback(on_refined)
+        return job_id
+    
+    def _generate_image(self, prompt: str, brand_name: str = "") -> str:
+        """
+        Generate and download AI image using FREE Pollinations.ai API.
+        No API key needed! Repeat prompts are served from the image cache.
+        """
+        cache_key = prompt
+        if IMAGE_BACKEND == "offline":
+            # The render also depends on the brand palette and footer, so they
+            # are part of its cache key
+            from agents.image_renderer import load_brand_palette
+            palette = load_brand_palette()
+            cache_key = f"{prompt}\x00{json.dumps(palette, sort_keys=True)}\x00{brand_name}"
+        
+        cached = IMAGE_CACHE.lookup(cache_key)
+        if cached:
+            print(f"[Marketing] Image cache hit: {cached.name}")
+            return str(cached)
+        
+        with IMAGE_CACHE.single_flight(cache_key):
+            # Another request may have just generated it
+            cached = IMAGE_CACHE.lookup(cache_key)
+            if cached:
+                return str(cached)
             
-            # Wrap text
-            words = text[:100].split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 30:
-                    lines.append(' '.join(current_line[:-1]))
-                    current_line = [word]
-            if current_line:
-                lines.append(' '.join(current_line))
+            filepath = IMAGE_CACHE.temp_path()
+            if IMAGE_BACKEND == "offline":
+                self._create_fallback_image(filepath, prompt, brand_name, palette)
+                stored = IMAGE_CACHE.store(filepath, prompt=cache_key)
+                # Variants cost ~10x the render, so they are made on demand:
+                # post_now() builds the upload JPEG and ?w= serves resizes
+                return str(stored)
             
-            # Draw text centered
-            y = 400
-            for line in lines[:3]:  # Max 3 lines
-                bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = bbox[2] - bbox[0]
-                x = (1080 - text_width) // 2
-                draw.text((x, y), line, fill='white', font=font)
-                y += 80
+            try:
+                # Use Pollinations.ai - FREE AI image generation (no API key!)
+                safe_prompt = prompt.replace(" ", "%20")
+                image_url = f"https://image.pollinations.ai/prompt/{safe_prompt}?width=1080&height=1080&nologo=true"
+                
+                print(f"[Marketing] Generating AI image: {prompt[:50]}...")
+                
+                # Stream straight to disk with a size cap
+                stream_download(image_url, filepath)
+                
+                stored = IMAGE_CACHE.store(filepath, prompt=prompt)
+                _make_variants(stored)
+                print(f"[Marketing] Image saved: {stored}")
+                return str(stored)
+                
+            except Exception as e:
+                print(f"[Marketing] Error generating image: {e}")
+                # Create a simple colored image as fallback (not indexed by prompt,
+                # so the real image is tried again next time)
+                self._create_fallback_image(filepath, prompt, brand_name)
+                stored = IMAGE_CACHE.store(filepath)
+                _make_variants(stored)
+                return str(stored)
+    
+    def _create_fallback_image(self, filepath: Path, text: str, brand_name: str = "",
+                               palette: Optional[Dict] = None) -> str:
+        """Render a branded image offline (brand-palette background + wrapped text)."""
+        try:
+            from agents.image_renderer import render_post_image
             
-            img.save(filepath)
+            render_post_image(text, filepath, palette=palette, brand_name=brand_name)
             print(f"[Marketing] Created fallback image: {filepath}")
             return str(filepath)
             
@@ -175,19 +441,26 @@ Return ONLY valid JSON:
                 f.write(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx\x9cc\xf8\xcf\xc0\x00\x00\x00\x03\x00\x01\x00\x00\x00\x00IEND\xaeB`\x82')
             return str(filepath)
     
-    def _save_post(self, post: Dict, topic: str):
-        """Save generated post to file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"post_{timestamp}.json"
-        filepath = self.output_dir / filename
-        
+    def _save_post(self, post: Dict, topic: str, brand_name: str = None) -> str:
+        """Save a generated post to the post store; returns its post_id."""
         post["generated_at"] = datetime.now().isoformat()
         post["topic"] = topic
+        if brand_name:
+            post["brand"] = brand_name
         
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(post, f, indent=2, ensure_ascii=False)
+        post_id = get_post_store().create(post)
+        post["post_id"] = post_id
+        post["status"] = "generated"
         
-        print(f"[Marketing] Saved: {filepath}")
+        print(f"[Marketing] Saved post {post_id}")
+        return post_id
+    
+    def _update_post(self, post_id: str, fields: Dict):
+        """Merge late fields (e.g. the image) into a saved post."""
+        try:
+            get_post_store().update(post_id, fields)
+        except Exception as e:
+            print(f"[Marketing] Could not update post {post_id}: {e}")
     
     def post_now(self, post: Dict, instagram_account: str = None) -> Dict:
         """
@@ -205,30 +478,47 @@ Return ONLY valid JSON:
         from agents.instagram_poster import InstagramPoster
         poster = InstagramPoster()
         
+        # Image may still be generating
+        if not post.get("image_path") and post.get("image_job"):
+            post.update(wait_for_image_job(post["image_job"]))
+        
         # Get image path - if not exists, download from URL
         image_path = post.get("image_path")
         if not image_path or not Path(image_path).exists():
             # Download image from URL
-            image_url = post.get("image_url", "")
-            if image_url:
-                import urllib.request
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                image_path = str(self.output_dir / f"temp_image_{timestamp}.png")
+            image_url = post.get("image_url") or ""
+            local = self.output_dir / Path(image_url).name if image_url.startswith("/marketing/image/") else None
+            if local and local.exists():
+                image_path = str(local)
+            elif image_url:
+                tmp_path = IMAGE_CACHE.temp_path()
                 try:
-                    urllib.request.urlretrieve(image_url, image_path)
+                    stream_download(image_url, tmp_path)
+                    image_path = str(IMAGE_CACHE.store(tmp_path))
                 except Exception as e:
                     return {
                         "status": "error",
                         "message": f"Failed to download image: {str(e)}"
                     }
         
+        # Upload the compact Instagram JPEG variant when available
+        if image_path and Path(image_path).exists():
+            _make_variants(image_path)
+            image_path = upload_path(image_path)
+        
         # Post to Instagram
         result = poster.post_to_instagram(
             caption=post.get("caption", ""),
             image_path=image_path,
-            hashtags=post.get("hashtags", [])
+            hashtags=post.get("hashtags", []),
+            post_id=post.get("post_id")
         )
         
+        if post.get("post_id") and result.get("status") != "success":
+            # "unknown": the upload may have gone out, so it isn't marked as failed
+            status = "unknown" if result.get("status") == "unknown" else "failed"
+            self._update_post(post["post_id"], {"status": status, "error": result.get("message")})
+        
         return result
     
     def get_post_preview(self, post: Dict) -> str:
@@ -246,7 +536,7 @@ Return ONLY valid JSON:
 {hashtags}
 
 🖼️ Image:
-{post.get('image_url', 'No image')}
+{post.get('image_url') or 'Generating...'}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━
 """
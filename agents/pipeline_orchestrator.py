@@ -1,15 +1,69 @@
 """Pipeline Orchestrator - Runs website generation."""
 import json
+import os
+import shutil
+import threading
+import uuid
 from pathlib import Path
 from typing import Dict, Callable, Optional
 from llm.gemini_llm import GeminiLLM
-from agents.strategy_agent import StrategyAgent
+from agents.strategy_agent import StrategyAgent, competitor_facts
 from agents.content_agent import ContentAgent
 from agents.frontend_dev_agent import FrontendDevAgent
+from agents.speculative_pipeline import prefetcher
+from agents.site_history import get_site_history
 
 OUTPUT_DIR = Path(__file__).parent.parent / "pipeline_outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Opt-in: research competitors in the background when the index knows none for
+# the industry. Each run costs 10+ LLM calls, so builds don't start it by default.
+COMPETITOR_RESEARCH = os.getenv("PIPELINE_COMPETITOR_RESEARCH", "0") == "1"
+_researching = set()
+_research_lock = threading.Lock()
+
+
+def research_competitors(memory: Dict) -> bool:
+    """
+    Populate the competitor index for this industry without blocking the build.
+
+    Runs DeepResearchAgent (and ScannerAgent when a search backend is set up)
+    at background priority. Results are shared across tenants through the
+    competitor cache, so the blueprint of the next generation and marketing
+    posts can use them. Returns True if a run was started.
+    """
+    industry = (memory.get('industry') or '').strip()
+    if not COMPETITOR_RESEARCH or not industry or competitor_facts(memory):
+        return False
+    key = industry.lower()
+    with _research_lock:
+        if key in _researching:
+            return False
+        _researching.add(key)
+
+    def run():
+        from llm.scheduler import BACKGROUND
+        from agents.deep_research_agent import DeepResearchAgent
+        from agents.scanner_agent import ScannerAgent, SERPER_AVAILABLE
+        llm = GeminiLLM(priority=BACKGROUND, tenant=memory.get('brand_name') or 'default')
+        context = {"industry": industry, "problem": memory.get('problem', ''),
+                   "target_users": memory.get('target_audience', ''), "offer": memory.get('services', ''),
+                   "value_proposition": memory.get('unique_feature', ''), "keywords": memory.get('services', '')}
+        try:
+            DeepResearchAgent(llm).execute(context)
+            if SERPER_AVAILABLE and os.getenv("SERPER_API_KEY"):
+                ScannerAgent(llm).scan_market(industry, context["keywords"], context["problem"])
+        except Exception as e:
+            print(f"[PIPELINE] Competitor research failed: {e}")
+        finally:
+            with _research_lock:
+                _researching.discard(key)
+
+    threading.Thread(target=run, name="competitor-research", daemon=True).start()
+    print(f"[PIPELINE] Researching competitors for {industry} in the background")
+    return True
+
+
 def trigger_pipeline(memory: Dict, status_callback: Optional[Callable] = None) -> Dict:
     results = {"status": "running"}
     
@@ -22,29 +76,55 @@ def trigger_pipeline(memory: Dict, status_callback: Optional[Callable] = None) -
     
     try:
         print("[PIPELINE] Starting...")
-        llm = GeminiLLM()
+        llm = GeminiLLM(tenant=memory.get('brand_name') or 'default')
         
         # Save context
         notify("init", "Preparing data...")
         (OUTPUT_DIR / "context.json").write_text(json.dumps(memory, indent=2))
+        research_competitors(memory)
+        
+        # Reuse stages prefetched during onboarding when their inputs still match
+        prefetched = prefetcher.take(memory)
+        if prefetched:
+            print(f"[PIPELINE] Reusing prefetched: {', '.join(prefetched)}")
+        
+        def reuse(stage, filename):
+            target = OUTPUT_DIR / filename
+            tmp = OUTPUT_DIR / f".tmp_{uuid.uuid4().hex}_{filename}"
+            shutil.copyfile(prefetched[stage], tmp)
+            os.replace(tmp, target)
+            return target
         
         # Strategy
         notify("strategy", "Creating blueprint...")
         print("[PIPELINE] Phase 1: Strategy")
-        strategy = StrategyAgent(llm)
-        blueprint_path = strategy.execute(memory)
+        if "strategy" in prefetched:
+            blueprint_path = reuse("strategy", "website_blueprint.json")
+        else:
+            strategy = StrategyAgent(llm)
+            blueprint_path = strategy.execute(memory)
         
         # Content
         notify("content", "Writing copy...")
         print("[PIPELINE] Phase 2: Content")
-        content = ContentAgent(llm)
-        content_path = content.execute(blueprint_path, memory)
+        if "content" in prefetched:
+            content_path = reuse("content", "content_copy.json")
+        else:
+            content = ContentAgent(llm)
+            content_path = content.execute(blueprint_path, memory)
         
         # Frontend
         notify("frontend", "Building website...")
         print("[PIPELINE] Phase 3: Frontend")
-        frontend = FrontendDevAgent(llm)
-        html_path = frontend.execute(blueprint_path, content_path)
+        if "frontend" in prefetched:
+            html_path = reuse("frontend", "index.html")
+        else:
+            frontend = FrontendDevAgent(llm)
+            html_path = frontend.execute(blueprint_path, content_path)
+        
+        # Keep every generated version so it can be previewed or restored later
+        version = get_site_history().snapshot("pipeline", brand=memory.get("brand_name"))
+        results["version_id"] = version["version_id"] if version else None
         
         results["status"] = "completed"
         notify("completed", "Website ready!")
@@ -0,0 +1,484 @@
+"""
+Post Outbox - Durable scheduled posting for Instagram and the Zapier webhook.
+
+Scheduled posts are rows in a local SQLite outbox instead of fire-and-forget
+calls. A background worker claims due rows in run_at order and sends them
+concurrently. Each account is held to a minimum spacing and an hourly cap.
+Failures are retried with exponential backoff, and idempotency keys make
+re-submitting the same post a no-op. A webhook post or Instagram upload that
+timed out waiting for a response may already have gone out, so it is parked
+as "unknown" instead of being retried. Claims are leases that the worker renews
+while a send is in flight, so only rows held by a crashed worker are picked
+up again once the lease runs out.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DB_PATH = Path(__file__).parent.parent / "marketing_outputs" / "outbox.db"
+CHANNELS = ("instagram", "webhook")
+
+WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+LEASE_SECONDS = 300
+RENEW_SECONDS = LEASE_SECONDS / 3
+PURGE_SECONDS = 3600  # How often expired shared-state entries are cleared
+POLL_SECONDS = 5.0
+
+# Per-account limits: minimum gap between sends and max sends per rolling hour
+RATE_LIMITS = {
+    "instagram": (float(os.getenv("OUTBOX_INSTAGRAM_MIN_INTERVAL", "60")), int(os.getenv("OUTBOX_INSTAGRAM_PER_HOUR", "10"))),
+    "webhook": (float(os.getenv("OUTBOX_WEBHOOK_MIN_INTERVAL", "1")), int(os.getenv("OUTBOX_WEBHOOK_PER_HOUR", "100"))),
+}
+
+# Errors that will not go away on retry
+PERMANENT_ERRORS = ("not configured", "not installed", "file not found", "two-factor", "login failed")
+
+TZ_ALIASES = {
+    "EST": "America/New_York", "EDT": "America/New_York", "ET": "America/New_York",
+    "CST": "America/Chicago", "CDT": "America/Chicago", "CT": "America/Chicago",
+    "MST": "America/Denver", "MDT": "America/Denver", "MT": "America/Denver",
+    "PST": "America/Los_Angeles", "PDT": "America/Los_Angeles", "PT": "America/Los_Angeles",
+    "IST": "Asia/Kolkata", "GMT": "UTC", "UTC": "UTC", "BST": "Europe/London", "CET": "Europe/Paris",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE NOT NULL,
+    channel TEXT NOT NULL,
+    account TEXT NOT NULL,
+    post_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    result TEXT,
+    sent_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, run_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_channel_sent ON outbox (channel, account, sent_at);
+CREATE TABLE IF NOT EXISTS account_limits (
+    channel TEXT NOT NULL,
+    account TEXT NOT NULL,
+    next_at REAL NOT NULL,
+    PRIMARY KEY (channel, account)
+);
+"""
+
+
+def _zone(name: Optional[str]):
+    from zoneinfo import ZoneInfo
+    if not name:
+        return None
+    try:
+        return ZoneInfo(TZ_ALIASES.get(name.strip().upper(), name.strip()))
+    except Exception:
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def parse_run_at(run_at: str = None, posting_time: str = None, timezone: str = None) -> float:
+    """
+    Resolve a schedule to a UNIX timestamp.
+
+    Args:
+        run_at: ISO datetime ("2025-03-01T09:30", offset optional)
+        posting_time: Time of day ("1:10 PM", "13:10"); the next occurrence is used
+        timezone: Zone for naive values ("EST", "Asia/Kolkata"); server local if omitted
+
+    Returns:
+        Timestamp; now if neither run_at nor posting_time is given
+    """
+    tz = _zone(timezone)
+    if run_at:
+        when = datetime.fromisoformat(run_at)
+        if when.tzinfo is None and tz is not None:
+            when = when.replace(tzinfo=tz)
+        return when.timestamp()
+    if posting_time:
+        for fmt in ("%I:%M %p", "%I %p", "%H:%M", "%I:%M%p", "%I%p"):
+            try:
+                clock = datetime.strptime(posting_time.strip().upper(), fmt).time()
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"Unrecognized posting time: {posting_time}")
+        now = datetime.now(tz)
+        when = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+        if when <= now:
+            when += timedelta(days=1)
+        return when.timestamp()
+    return time.time()
+
+
+def idempotency_key_for(channel: str, account: str, payload: Dict) -> str:
+    """Default key: same channel, account and post content means the same send."""
+    basis = payload.get("post_id") or json.dumps(
+        {k: payload.get(k) for k in ("caption", "content", "hashtags", "image_path", "image_url", "media_urls")},
+        sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{channel}|{account}|{basis}".encode("utf-8")).hexdigest()
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict:
+    item = dict(row)
+    item["payload"] = json.loads(item["payload"])
+    item["result"] = json.loads(item["result"]) if item["result"] else None
+    for key in ("run_at", "sent_at", "created_at", "updated_at"):
+        if item.get(key):
+            item[key] = datetime.fromtimestamp(item[key]).isoformat()
+    item.pop("lease_until", None)
+    return item
+
+
+class PostOutbox:
+    """SQLite-backed outbox of scheduled posts."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self.wakeup = threading.Event()
+
+    def _migrate(self):
+        """Rate-limit windows used to be keyed by account alone; they are only timers, so start fresh."""
+        columns = [r[1] for r in self._conn.execute("PRAGMA table_info(account_limits)")]
+        if columns and "channel" not in columns:
+            self._conn.execute("DROP TABLE account_limits")
+            self._conn.execute("DROP INDEX IF EXISTS idx_outbox_sent")
+
+    def enqueue(self, channel: str, payload: Dict, run_at: float = None, account: str = "default",
+                idempotency_key: str = None, max_attempts: int = MAX_ATTEMPTS) -> Dict:
+        """
+        Schedule a send. Re-using an idempotency key returns the existing entry
+        (with "duplicate": True) instead of queueing a second post.
+        """
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown channel: {channel}")
+        account = (account or "default").lstrip("@").lower()
+        key = idempotency_key or idempotency_key_for(channel, account, payload)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            existing = self._conn.execute("SELECT * FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()
+            if existing:
+                return {**_row_to_dict(existing), "duplicate": True}
+            entry_id = uuid.uuid4().hex[:16]
+            self._conn.execute(
+                "INSERT INTO outbox (id, idempotency_key, channel, account, post_id, payload, status, run_at,"
+                " max_attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (entry_id, key, channel, account, payload.get("post_id"), json.dumps(payload, ensure_ascii=False),
+                 run_at or now, max_attempts, now, now),
+            )
+            row = self._conn.execute("SELECT * FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        self.wakeup.set()
+        return {**_row_to_dict(row), "duplicate": False}
+
+    def claim(self, limit: int) -> List[Dict]:
+        """
+        Lease up to `limit` due entries, oldest run_at first, skipping
+        (channel, account) pairs that are rate limited or already have a send
+        in flight.
+        """
+        now = time.time()
+        claimed = []
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Leases of crashed workers expire back into the queue
+            self._conn.execute(
+                "UPDATE outbox SET status = 'queued' WHERE status = 'running' AND lease_until < ?", (now,))
+            busy = {(r["channel"], r["account"]) for r in self._conn.execute(
+                "SELECT DISTINCT channel, account FROM outbox WHERE status = 'running'")}
+            rows = self._conn.execute(
+                "SELECT * FROM outbox WHERE status = 'queued' AND run_at <= ? ORDER BY run_at LIMIT ?",
+                (now, max(limit * 10, 50))).fetchall()
+            for row in rows:
+                if len(claimed) >= limit:
+                    break
+                target = (row["channel"], row["account"])
+                if target in busy or not self._within_limits(*target, now):
+                    continue
+                min_interval = RATE_LIMITS[row["channel"]][0]
+                self._conn.execute(
+                    "INSERT INTO account_limits (channel, account, next_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(channel, account) DO UPDATE SET next_at = excluded.next_at",
+                    (*target, now + min_interval))
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ?"
+                    " WHERE id = ?", (now + LEASE_SECONDS, now, row["id"]))
+                busy.add(target)
+                claimed.append({**dict(row), "attempts": row["attempts"] + 1,
+                                "payload": json.loads(row["payload"])})
+        return claimed
+
+    def _within_limits(self, channel: str, account: str, now: float) -> bool:
+        _, per_hour = RATE_LIMITS[channel]
+        limit = self._conn.execute(
+            "SELECT next_at FROM account_limits WHERE channel = ? AND account = ?", (channel, account)).fetchone()
+        if limit and limit["next_at"] > now:
+            return False
+        sent = self._conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE channel = ? AND account = ? AND sent_at > ?",
+            (channel, account, now - 3600)).fetchone()[0]
+        return sent < per_hour
+
+    def renew(self, entry_ids: List[str]) -> int:
+        """Extend the leases of sends still in flight; returns how many were renewed."""
+        if not entry_ids:
+            return 0
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE outbox SET lease_until = ?, updated_at = ? WHERE status = 'running'"
+                f" AND id IN ({', '.join('?' * len(entry_ids))})", (now + LEASE_SECONDS, now, *entry_ids))
+        return cur.rowcount
+
+    def complete(self, entry_id: str, result: Dict):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, result = ?, last_error = NULL,"
+                " lease_until = NULL, updated_at = ? WHERE id = ?",
+                (now, json.dumps(result, ensure_ascii=False, default=str), now, entry_id))
+            row = self._conn.execute("SELECT channel, post_id FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        # Instagram sends mark the post themselves (post_now); the webhook has no such hook
+        if row and row["channel"] == "webhook" and row["post_id"]:
+            from agents.post_store import get_post_store
+            get_post_store().update(row["post_id"], {"status": "posted", "posted_via": "webhook",
+                                                     "posted_at": datetime.fromtimestamp(now).isoformat()})
+
+    def fail(self, entry_id: str, error: str, attempts: int, max_attempts: int, permanent: bool = False):
+        """Record a failed attempt; requeue with backoff unless out of attempts."""
+        now = time.time()
+        if permanent or attempts >= max_attempts:
+            status, run_at = "failed", now
+        else:
+            status, run_at = "queued", now + backoff_seconds(attempts)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, run_at = ?, last_error = ?, lease_until = NULL, updated_at = ?"
+                " WHERE id = ?", (status, run_at, error, now, entry_id))
+        return status
+
+    def mark_unknown(self, entry_id: str, error: str):
+        """Park a send that may or may not have been delivered; it is never retried."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'unknown', last_error = ?, lease_until = NULL, updated_at = ?"
+                " WHERE id = ?", (error, now, entry_id))
+
+    def cancel(self, entry_id: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE outbox SET status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), entry_id))
+        return cur.rowcount > 0
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def list(self, status: str = None, limit: int = 50) -> List[Dict]:
+        """Entries in run_at order (next due first), optionally by status."""
+        limit = max(1, min(int(limit or 50), 200))
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM outbox WHERE status = ? ORDER BY run_at LIMIT ?", (status, limit)).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM outbox ORDER BY run_at LIMIT ?", (limit,)).fetchall()
+        return [_row_to_dict(r) for r in rows]
+
+    def next_due_in(self) -> float:
+        """Seconds until the earliest queued entry can be sent (capped at POLL_SECONDS)."""
+        with self._lock:
+            # An entry can't go before its account's rate-limit window opens either
+            row = self._conn.execute(
+                "SELECT MIN(MAX(o.run_at, COALESCE(l.next_at, 0))) FROM outbox o"
+                " LEFT JOIN account_limits l ON l.channel = o.channel AND l.account = o.account"
+                " WHERE o.status = 'queued'").fetchone()
+        if not row or row[0] is None:
+            return POLL_SECONDS
+        return max(0.0, min(POLL_SECONDS, row[0] - time.time()))
+
+    def counts(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def dispatch(entry: Dict) -> Dict:
+    """Send one outbox entry; returns a result dict with "status"."""
+    payload = entry["payload"]
+    if entry["channel"] == "instagram":
+        from agents.marketing_agent import MarketingAgent
+        return MarketingAgent().post_now(payload, payload.get("instagram_account"))
+
+    from tools.webhook_client import instagram_payload, send
+    result = send(instagram_payload(**{
+        k: payload.get(k) for k in ("content", "preferred_posting_time", "timezone",
+                                    "media_urls", "hashtags", "brand_name")
+    }))
+    status = "success" if result.ok else "unknown" if result.unknown else "error"
+    return {"status": status, "status_code": result.status_code,
+            "attempts": result.attempts, "message": result.error or result.body}
+
+
+class OutboxWorker:
+    """Background thread that drains due outbox entries on a small thread pool."""
+
+    def __init__(self, outbox: PostOutbox, workers: int = WORKERS, sender=dispatch):
+        self.outbox = outbox
+        self.workers = max(1, workers)
+        self.sender = sender
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox")
+        self._slots = threading.Semaphore(self.workers)
+        self._stop = threading.Event()
+        self._thread = None
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self._renewed_at = 0.0
+        self._purged_at = time.monotonic()  # Server startup already purged once
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="outbox-scheduler", daemon=True)
+        self._thread.start()
+        print(f"[Outbox] Worker started ({self.workers} senders)")
+
+    def stop(self):
+        self._stop.set()
+        self.outbox.wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+    def _renew_leases(self):
+        """Keep leases of slow sends alive so no other worker re-claims and re-sends them."""
+        if time.monotonic() - self._renewed_at < RENEW_SECONDS:
+            return
+        with self._in_flight_lock:
+            ids = list(self._in_flight)
+        try:
+            self.outbox.renew(ids)
+            self._renewed_at = time.monotonic()
+        except Exception as e:
+            print(f"[Outbox] Lease renewal failed: {e}")
+
+    def _purge_state(self):
+        """Drop expired shared-state entries (image jobs); reads skip them but nothing else deletes them."""
+        if time.monotonic() - self._purged_at < PURGE_SECONDS:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            from memory.shared_state import get_shared_state
+            purged = get_shared_state().purge_expired()
+            if purged:
+                print(f"[Outbox] Purged {purged} expired shared-state entries")
+        except Exception as e:
+            print(f"[Outbox] Shared-state purge failed: {e}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._renew_leases()
+            self._purge_state()
+            free = 0
+            while self._slots.acquire(blocking=False):
+                free += 1
+            entries = []
+            try:
+                entries = self.outbox.claim(free) if free else []
+            except Exception as e:
+                print(f"[Outbox] Claim failed: {e}")
+            for _ in range(free - len(entries)):
+                self._slots.release()
+            for entry in entries:
+                with self._in_flight_lock:
+                    self._in_flight.add(entry["id"])
+                self._pool.submit(self._send, entry)
+            if not entries:
+                # Due entries that are still blocked (account busy, hourly cap) get a short pause
+                self.outbox.wakeup.wait(self.outbox.next_due_in() or 0.5)
+                self.outbox.wakeup.clear()
+
+    def _send(self, entry: Dict):
+        try:
+            result = self.sender(entry)
+            if result.get("status") == "success":
+                self.outbox.complete(entry["id"], result)
+                print(f"[Outbox] Sent {entry['id']} ({entry['channel']} @{entry['account']})")
+                return
+            error = result.get("message") or "Unknown error"
+            if result.get("status") == "unknown":
+                self.outbox.mark_unknown(entry["id"], error)
+                print(f"[Outbox] {entry['id']} delivery unknown, not retrying: {error[:120]}")
+                return
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(entry["id"])
+            self._slots.release()
+            self.outbox.wakeup.set()
+
+        permanent = any(marker in error.lower() for marker in PERMANENT_ERRORS)
+        status = self.outbox.fail(entry["id"], error, entry["attempts"], entry["max_attempts"], permanent)
+        print(f"[Outbox] {entry['id']} attempt {entry['attempts']} failed ({status}): {error[:120]}")
+        if entry.get("post_id") and status == "queued":
+            # post_now marked it failed; it's still going out on a later attempt
+            from agents.post_store import get_post_store
+            get_post_store().update(entry["post_id"], {"status": "scheduled"})
+
+
+_outbox: Optional[PostOutbox] = None
+_worker: Optional[OutboxWorker] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> PostOutbox:
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = PostOutbox()
+        return _outbox
+
+
+def start_worker() -> OutboxWorker:
+    """Start the process-wide outbox worker (idempotent)."""
+    global _worker
+    outbox = get_outbox()
+    with _outbox_lock:
+        if _worker is None:
+            _worker = OutboxWorker(outbox)
+        _worker.start()
+        return _worker
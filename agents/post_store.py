@@ -0,0 +1,235 @@
+"""
+Post Store - Indexed SQLite history of generated and posted marketing content.
+
+Replaces the one-JSON-file-per-post layout in marketing_outputs/. Every post
+gets a unique id and one row with its status, topic, brand, timestamps and
+the full post JSON; hashtags live in their own indexed table. Listing uses
+keyset pagination over (created_at, id), so a page costs the same no matter
+how much history there is. Legacy post_*.json / posted_*.json files are
+imported once when the database is first created.
+"""
+import base64
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DB_PATH = Path(__file__).parent.parent / "marketing_outputs" / "posts.db"
+STATUSES = ("generated", "scheduled", "posted", "failed", "unknown")
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    topic TEXT COLLATE NOCASE,
+    brand TEXT COLLATE NOCASE,
+    caption TEXT,
+    image_url TEXT,
+    instagram_id TEXT,
+    scheduled_date TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    posted_at REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON posts (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_posts_status ON posts (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_posts_topic ON posts (topic, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_posts_brand ON posts (brand, created_at, id);
+CREATE TABLE IF NOT EXISTS post_hashtags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    created_at REAL NOT NULL,
+    post_id TEXT NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, created_at, post_id)
+);
+"""
+
+# Columns mirrored from the post JSON so they can be filtered on
+INDEXED_FIELDS = ("status", "topic", "brand", "caption", "image_url", "instagram_id", "scheduled_date")
+
+
+def _normalize_tag(tag: str) -> str:
+    return str(tag).strip().lstrip("#").lower()
+
+
+def _encode_cursor(created_at: float, post_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at!r}|{post_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(created_at), post_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _timestamp(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+class PostStore:
+    """Thread-safe post history backed by a single SQLite file."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        if is_new:
+            self.import_legacy(self.path.parent)
+
+    # ---------- writes ----------
+
+    def create(self, post: Dict, status: str = "generated", post_id: Optional[str] = None,
+               created_at: Optional[float] = None) -> str:
+        """Insert a post; returns its id (also stored in post["post_id"])."""
+        post_id = post_id or post.get("post_id") or uuid.uuid4().hex
+        now = time.time()
+        created_at = created_at or now
+        post = {**post, "post_id": post_id, "status": status}
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (id, status, topic, brand, caption, image_url, instagram_id,"
+                " scheduled_date, created_at, updated_at, posted_at, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (post_id, status, post.get("topic"), post.get("brand"), post.get("caption"),
+                 post.get("image_url"), post.get("instagram_id"), post.get("scheduled_date"),
+                 created_at, now, _timestamp(post.get("posted_at")),
+                 json.dumps(post, ensure_ascii=False)),
+            )
+            self._write_tags(post_id, created_at, post.get("hashtags"))
+        return post_id
+
+    def update(self, post_id: str, fields: Dict) -> bool:
+        """Merge fields into a post; returns False if it doesn't exist."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT data, created_at FROM posts WHERE id = ?", (post_id,)).fetchone()
+            if not row:
+                return False
+            post = {**json.loads(row["data"]), **fields}
+            columns = {k: post.get(k) for k in INDEXED_FIELDS}
+            columns["posted_at"] = _timestamp(post.get("posted_at"))
+            assignments = ", ".join(f"{k} = ?" for k in columns)
+            self._conn.execute(
+                f"UPDATE posts SET {assignments}, updated_at = ?, data = ? WHERE id = ?",
+                (*columns.values(), time.time(), json.dumps(post, ensure_ascii=False), post_id),
+            )
+            if "hashtags" in fields:
+                self._conn.execute("DELETE FROM post_hashtags WHERE post_id = ?", (post_id,))
+                self._write_tags(post_id, row["created_at"], post.get("hashtags"))
+        return True
+
+    def mark_posted(self, post_id: str, instagram_id: str, post_url: str = None) -> bool:
+        return self.update(post_id, {"status": "posted", "instagram_id": instagram_id,
+                                     "post_url": post_url, "posted_at": datetime.now().isoformat()})
+
+    def _write_tags(self, post_id: str, created_at: float, hashtags):
+        tags = {_normalize_tag(t) for t in hashtags or [] if _normalize_tag(t)}
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO post_hashtags (tag, created_at, post_id) VALUES (?, ?, ?)",
+            [(tag, created_at, post_id) for tag in tags],
+        )
+
+    # ---------- reads ----------
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def list(self, status: str = None, topic: str = None, brand: str = None, hashtag: str = None,
+             limit: int = 20, cursor: str = None) -> Dict:
+        """
+        Newest-first page of posts.
+
+        Args:
+            status/topic/brand/hashtag: Optional exact-match filters (case-insensitive)
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            {"items": [...], "next_cursor": str or None}
+        """
+        limit = max(1, min(int(limit or 20), MAX_PAGE_SIZE))
+        where, params = [], []
+        table = "posts p"
+        if hashtag:
+            # Walk the hashtag index instead of the whole posts table
+            table = "post_hashtags h JOIN posts p ON p.id = h.post_id"
+            where.append("h.tag = ?")
+            params.append(_normalize_tag(hashtag))
+            order = ("h.created_at", "h.post_id")
+        else:
+            order = ("p.created_at", "p.id")
+        for column, value in (("status", status), ("topic", topic), ("brand", brand)):
+            if value:
+                where.append(f"p.{column} = ?")
+                params.append(value)
+        if cursor:
+            created_at, post_id = _decode_cursor(cursor)
+            where.append(f"({order[0]} < ? OR ({order[0]} = ? AND {order[1]} < ?))")
+            params.extend([created_at, created_at, post_id])
+
+        sql = (f"SELECT p.id, p.created_at, p.data FROM {table}"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+               f" ORDER BY {order[0]} DESC, {order[1]} DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+
+        items = [json.loads(r["data"]) for r in rows[:limit]]
+        next_cursor = _encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    # ---------- migration ----------
+
+    def import_legacy(self, directory: Path) -> int:
+        """Import post_*.json / posted_*.json files from the old layout (files are left in place)."""
+        count = 0
+        for pattern, status in (("post_*.json", "generated"), ("posted_*.json", "posted")):
+            for path in sorted(Path(directory).glob(pattern)):
+                try:
+                    post = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                if status == "posted" and post.get("post_id"):
+                    post["instagram_id"] = post.pop("post_id")
+                created_at = (_timestamp(post.get("generated_at") or post.get("posted_at"))
+                              or path.stat().st_mtime)
+                self.create(post, status=status, post_id=f"legacy_{path.stem}", created_at=created_at)
+                count += 1
+        if count:
+            print(f"[PostStore] Imported {count} legacy post files")
+        return count
+
+
+_store: Optional[PostStore] = None
+_store_lock = threading.Lock()
+
+
+def get_post_store() -> PostStore:
+    """Process-wide PostStore (opened on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PostStore()
+        return _store
@@ -1,33 +1,57 @@
-from crewai import Agent, LLM
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize Gemini LLM for Router Agent using CrewAI's LLM class
-# This ensures compatibility with the latest CrewAI version
-print("[DEBUG] Initializing CrewAI LLM for Router Agent...")
-llm = LLM(
-    model="gemini/gemini-2.5-flash",
-    api_key=os.getenv("GEMINI_API_KEY")
-)
-print(f"[DEBUG] CrewAI LLM initialized: {llm.model}")
-
-router_agent = Agent(
-    name="RouterAgent",
-    role="Smart Chatbot CEO / Project Manager / Orchestrator",
-    goal=(
-        "Be a friendly and engaging AI Advisor. Your primary goal is to ONBOARD the user by asking 10 key questions "
-        "to understand their business idea deeply. Do not overwhelm them; ask 1-2 questions at a time. "
-        "Once you have enough info, route them to specialized teams or provide a comprehensive plan."
-    ),
-    backstory=(
-        "You are the AI Advisor and Onboarding Specialist for Growth Hub. "
-        "You are friendly, enthusiastic, and curious. "
-        "Your job is to guide new founders through a 10-step discovery process to uncover their vision, target audience, and needs. "
-        "You keep the conversation flowing naturally. You are NOT just a router; you are a partner. "
-        "Start by welcoming them and asking about their core business idea."
-    ),
-    llm=llm,
-    verbose=True,
-)
+# crewai is heavy to import, so the CrewAI LLM and Agent are built on first
+# access of `llm` / `router_agent` (or get_router_agent()) instead of at import.
+_llm = None
+_router_agent = None
+
+
+def get_llm():
+    """Initialize Gemini LLM for Router Agent using CrewAI's LLM class."""
+    global _llm
+    if _llm is None:
+        from crewai import LLM
+        print("[DEBUG] Initializing CrewAI LLM for Router Agent...")
+        _llm = LLM(
+            model="gemini/gemini-2.5-flash",
+            api_key=os.getenv("GEMINI_API_KEY")
+        )
+        print(f"[DEBUG] CrewAI LLM initialized: {_llm.model}")
+    return _llm
+
+
+def get_router_agent():
+    global _router_agent
+    if _router_agent is None:
+        from crewai import Agent
+        _router_agent = Agent(
+            name="RouterAgent",
+            role="Smart Chatbot CEO / Project Manager / Orchestrator",
+            goal=(
+                "Be a friendly and engaging AI Advisor. Your primary goal is to ONBOARD the user by asking 10 key questions "
+                "to understand their business idea deeply. Do not overwhelm them; ask 1-2 questions at a time. "
+                "Once you have enough info, route them to specialized teams or provide a comprehensive plan."
+            ),
+            backstory=(
+                "You are the AI Advisor and Onboarding Specialist for Growth Hub. "
+                "You are friendly, enthusiastic, and curious. "
+                "Your job is to guide new founders through a 10-step discovery process to uncover their vision, target audience, and needs. "
+                "You keep the conversation flowing naturally. You are NOT just a router; you are a partner. "
+                "Start by welcoming them and asking about their core business idea."
+            ),
+            llm=get_llm(),
+            verbose=True,
+        )
+    return _router_agent
+
+
+def __getattr__(name):
+    # Keeps `from agents.router_agent import router_agent, llm` working
+    if name == "llm":
+        return get_llm()
+    if name == "router_agent":
+        return get_router_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,21 @@
 """Router Agent - Handles chatbot conversation."""
 from memory import memory_manager as mem
 from llm.gemini_llm import GeminiLLM
+from llm.scheduler import INTERACTIVE
+from llm.intent_classifier import classify, is_question
+from llm.fallback_handler import extract_answer_from_input
+from agents.answer_extractor import AnswerExtractor
+from agents.speculative_pipeline import prefetcher
 
-llm = GeminiLLM()
+llm = GeminiLLM(priority=INTERACTIVE)
 router_agent = type("RA", (), {"llm": llm})()
 
+def prefetch_pipeline():
+    """Let the speculative pipeline see the latest answers."""
+    prefetcher.update(mem.load_builder())
+
+extractor = AnswerExtractor(llm, on_update=prefetch_pipeline)
+
 FRIENDLY_QUESTIONS = [
     "Let's start! 🎯 What problem does your business solve?",
     "Great! Who is your ideal customer or target audience?",
@@ -18,11 +29,19 @@ FRIENDLY_QUESTIONS = [
     "Last one! 🚀 What's your launch goal or next milestone?"
 ]
 
+HELP_TEXT = (
+    "💡 Just answer in your own words - there are no wrong answers. "
+    "Type 'summary' to see what I have so far, or 'start over' to reset."
+)
+
 def process_message_with_memory(message):
     msg = (message or "").strip()
     
-    if msg.lower() in ["reset", "restart", "start over"]:
+    intent = classify(msg)
+    
+    if intent.is_command and intent.primary == "reset":
         mem.reset()
+        prefetch_pipeline()
         return f"🔄 Starting fresh!\n\n{FRIENDLY_QUESTIONS[0]}"
     
     if msg in ["__CHECK__", "__CHECK_ONBOARDING__"]:
@@ -32,32 +51,53 @@ def process_message_with_memory(message):
         return FRIENDLY_QUESTIONS[idx] if idx < len(FRIENDLY_QUESTIONS) else "All done!"
     
     if mem.is_complete():
-        return handle_post_chat(msg)
+        return handle_post_chat(msg, intent)
     
-    return handle_answer(msg)
+    return handle_answer(msg, intent)
 
-def handle_answer(user_input):
-    idx, _ = mem.get_question()
+def handle_answer(user_input, intent=None):
+    idx, field = mem.get_question()
+    intent = intent or classify(user_input)
     
-    greetings = ["hi", "hello", "hey", "hii"]
-    if user_input.lower() in greetings:
-        return f"👋 Welcome to Growth Hub!\n\n{FRIENDLY_QUESTIONS[idx]}"
+    # Bare commands are answered locally and never stored as answers
+    if intent.is_command:
+        if intent.primary == "greeting":
+            return f"👋 Welcome to Growth Hub!\n\n{FRIENDLY_QUESTIONS[idx]}"
+        if intent.primary == "thanks":
+            return f"😊 You're welcome!\n\n{FRIENDLY_QUESTIONS[idx]}"
+        if intent.primary == "help":
+            return f"{HELP_TEXT}\n\n{FRIENDLY_QUESTIONS[idx]}"
+        if intent.primary == "summary":
+            return f"{mem.get_summary()}\n\n{FRIENDLY_QUESTIONS[idx]}"
+        if intent.primary == "build":
+            remaining = len(FRIENDLY_QUESTIONS) - idx
+            return f"🏗️ Almost there! {remaining} more question(s) before we can build your site.\n\n{FRIENDLY_QUESTIONS[idx]}"
     
     if len(user_input) < 2:
         return f"Please provide more detail.\n\n{FRIENDLY_QUESTIONS[idx]}"
     
-    mem.save_answer(user_input)
+    question = FRIENDLY_QUESTIONS[idx]
+    checked = extract_answer_from_input(user_input, question)
+    if checked["type"] == "CHAT" and is_question(user_input):
+        return f"{checked['reply']}\n\n{question}"
+    
+    mem.save_answer(user_input, extractor.extract(field, question, user_input))
+    prefetch_pipeline()
     
     if mem.is_complete():
+        extractor.flush()
         return f"✅ Got it!\n\n🎉 All done!\n\n{mem.get_summary()}\n\n🚀 Go to Website Builder to create your site!"
     
     new_idx, _ = mem.get_question()
     return f"✅ Saved!\n\n{FRIENDLY_QUESTIONS[new_idx]}"
 
-def handle_post_chat(message):
-    if any(w in message.lower() for w in ["summary", "answers", "info"]):
+def handle_post_chat(message, intent=None):
+    intent = intent or classify(message)
+    if intent.has("help"):
+        return f"{HELP_TEXT}\n\n👉 Your answers are saved - head to the Website Builder when ready!"
+    if intent.has("summary"):
         return mem.get_summary()
-    if any(w in message.lower() for w in ["build", "website", "create"]):
+    if intent.has("build"):
         return f"🚀 Go to Website Builder to create your site!\n\n{mem.get_summary()}"
     return f"Your business is ready!\n\n{mem.get_summary()}\n\n👉 Go to Website Builder!"
 
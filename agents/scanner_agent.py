@@ -1,6 +1,12 @@
 import os
-from typing import Dict, List, Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 from llm.gemini_llm import GeminiLLM
+from llm.json_reply import parse_json
+from llm.scheduler import BACKGROUND
+from agents.competitor_cache import get_competitor_cache
+from agents.competitor_index import get_competitor_index, normalize_domain
 
 try:
     from serper import SerperDevTool
@@ -10,18 +16,124 @@ except ImportError:
     SerperDevTool = None
 
 
+MAX_QUERIES = 6
+MAX_COMPETITORS = 5
+RESULTS_PER_QUERY = 10
+
+# Hits on these are directories/social/UGC pages, not competitors
+SKIP_DOMAINS = {
+    "youtube.com", "wikipedia.org", "reddit.com", "quora.com", "facebook.com", "instagram.com",
+    "linkedin.com", "twitter.com", "x.com", "pinterest.com", "tiktok.com", "medium.com",
+}
+
+
+def _clean_name(title: str, domain: str) -> str:
+    """Page title -> brand-ish name ('Acme | Healthy Snacks' -> 'Acme')."""
+    parts = [p.strip() for p in re.split(r"\s+[|\-–—·]\s+|:\s+", title or "") if p.strip()]
+    if not parts:
+        return domain.split(".")[0].title()
+    label = domain.split(".")[0]
+    # Prefer the segment that mentions the domain label, else the shortest one
+    for part in parts:
+        if label and label in part.lower().replace(" ", ""):
+            return part
+    return min(parts, key=len)
+
+
+def build_queries(industry: str, keywords: str, problem: str) -> List[str]:
+    """One query per keyword plus a couple of angles, instead of one concatenated query."""
+    terms = [k.strip() for k in re.split(r"[,;/\n]+", keywords or "") if k.strip()]
+    if len(terms) <= 1 and keywords:
+        terms = keywords.split()
+    queries = [f"{industry} {term}".strip() for term in terms]
+    if problem:
+        queries.append(f"{industry} {problem}".strip())
+    queries.append(f"best {industry} brands".strip())
+    seen, unique = set(), []
+    for q in queries:
+        key = q.lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(q)
+    return unique[:MAX_QUERIES]
+
+
+def _is_real_scan(result: Dict) -> bool:
+    """Don't cache the placeholder result produced when every path failed."""
+    competitors = (result or {}).get("competitors") or []
+    return bool(competitors) and competitors[0].get("name") != "Competitor 1"
+
+
+class SerperSearch:
+    """Search backend backed by SerperDevTool (returns organic hits)."""
+    
+    def __init__(self):
+        self.tool = SerperDevTool()
+    
+    def __call__(self, query: str) -> List[Dict]:
+        results = self.tool.search(query)
+        return (results or {}).get("organic", [])[:RESULTS_PER_QUERY]
+
+
+def merge_results(results_per_query: List[List[Dict]], limit: int = MAX_COMPETITORS) -> List[Dict]:
+    """
+    Dedup hits by normalized domain and rank by how many queries found them
+    (then by average position).
+    """
+    merged: Dict[str, Dict] = {}
+    for hits in results_per_query:
+        seen_here = set()
+        for position, hit in enumerate(hits):
+            link = hit.get("link") or hit.get("url") or ""
+            domain = normalize_domain(link)
+            if not domain or domain in SKIP_DOMAINS or domain in seen_here:
+                continue
+            seen_here.add(domain)
+            entry = merged.setdefault(domain, {
+                "name": _clean_name(hit.get("title", ""), domain),
+                "url": f"https://{domain}",
+                "domain": domain,
+                "snippets": [],
+                "mentions": 0,
+                "positions": [],
+            })
+            entry["mentions"] += 1
+            entry["positions"].append(position)
+            if hit.get("snippet") and len(entry["snippets"]) < 2:
+                entry["snippets"].append(hit["snippet"])
+    
+    ranked = sorted(merged.values(),
+                    key=lambda c: (-c["mentions"], sum(c["positions"]) / len(c["positions"])))
+    for c in ranked:
+        c.pop("positions")
+    return ranked[:limit]
+
+
 class ScannerAgent:
     """Agent responsible for scanning the market for competitors."""
     
-    def __init__(self, llm: GeminiLLM):
+    def __init__(self, llm: GeminiLLM, search: Optional[Callable[[str], List[Dict]]] = None):
+        """
+        Args:
+            llm: LLM used for the strengths/weaknesses analysis
+            search: Backend mapping a query to organic hits; defaults to Serper
+                when installed and SERPER_API_KEY is set (see tools/search_standin.py)
+        """
         self.llm = llm
-        if not SERPER_AVAILABLE:
+        self.search = search
+        if self.search is None and SERPER_AVAILABLE and os.getenv("SERPER_API_KEY"):
+            self.search = SerperSearch()
+        if not SERPER_AVAILABLE and search is None:
             print("[ScannerAgent] WARNING: SerperDevTool not available. Install with: pip install serper")
     
     def scan_market(self, industry: str, keywords: str, problem: str) -> Dict:
         """
         Scan the market for competitors.
         
+        Runs one search per keyword/angle concurrently, merges hits by domain,
+        ranks them by cross-query frequency and analyzes all of them in one
+        LLM call. Results are shared through the competitor cache.
+        
         Args:
             industry: The industry/niche
             keywords: 3 keywords for searching
@@ -33,95 +145,103 @@ class ScannerAgent:
         print(f"[ScannerAgent] Scanning market for: {industry}")
         print(f"[ScannerAgent] Keywords: {keywords}")
         
-        # If Serper is not available, use LLM to generate realistic competitors
-        if not SERPER_AVAILABLE or not os.getenv("SERPER_API_KEY"):
+        # Same niche, same answer: shared across tenants with TTL + refresh-ahead
+        result = get_competitor_cache().get_or_compute(
+            "scan", industry, keywords,
+            lambda: self._scan_market(industry, keywords, problem),
+            validate=_is_real_scan,
+        )
+        if _is_real_scan(result):
+            try:
+                get_competitor_index().index_scan(result, industry)
+            except Exception as e:
+                print(f"[ScannerAgent] Could not index scan: {e}")
+        return result
+    
+    def _scan_market(self, industry: str, keywords: str, problem: str) -> Dict:
+        """Uncached scan (see scan_market)."""
+        # Without a search backend, use LLM to generate realistic competitors
+        if self.search is None:
             print("[ScannerAgent] Using LLM fallback for competitor research")
             return self._llm_fallback_scan(industry, keywords, problem)
         
+        queries = build_queries(industry, keywords, problem)
+        print(f"[ScannerAgent] Searching {len(queries)} queries in parallel")
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = [pool.submit(self.search, q) for q in queries]
+            results = []
+            for query, future in zip(queries, futures):
+                try:
+                    results.append(future.result() or [])
+                except Exception as e:
+                    print(f"[ScannerAgent] Search failed for '{query}': {e}")
+                    results.append([])
+        
+        competitors_raw = merge_results(results)
+        if not competitors_raw:
+            # No competitors found, use LLM fallback
+            return self._llm_fallback_scan(industry, keywords, problem)
+        
         try:
-            # Use SerperDevTool to search
-            serper = SerperDevTool()
-            
-            # Build search query
-            search_query = f"{industry} {keywords} {problem}"
-            print(f"[ScannerAgent] Search query: {search_query}")
-            
-            # Search for competitors
-            results = serper.search(search_query)
-            
-            # Extract competitors from search results
-            competitors_raw = []
-            if results and "organic" in results:
-                for item in results["organic"][:5]:
-                    competitors_raw.append({
-                        "name": item.get("title", "Unknown"),
-                        "url": item.get("link", ""),
-                        "snippet": item.get("snippet", "")
-                    })
-            
-            # Use LLM to analyze strengths and weaknesses from search results
-            if competitors_raw:
-                analysis_prompt = f"""You are a market research expert. Analyze these competitors in {industry}:
+            return self._analyze(industry, problem, competitors_raw)
+        except Exception as e:
+            print(f"[ScannerAgent] Error analyzing competitors: {e}")
+            # Fallback to LLM-only scan
+            return self._llm_fallback_scan(industry, keywords, problem)
+    
+    def _analyze(self, industry: str, problem: str, competitors_raw: List[Dict]) -> Dict:
+        """Strengths/weaknesses for every merged competitor in one LLM call."""
+        listing = "\n".join(
+            f"{i}. {c['name']} ({c['url']}, found by {c['mentions']} searches): {' '.join(c['snippets'])}"
+            for i, c in enumerate(competitors_raw, 1)
+        )
+        analysis_prompt = f"""You are a market research expert. Analyze these competitors in {industry} (problem space: {problem}):
 
-{chr(10).join([f"- {c['name']} ({c.get('url', 'N/A')}): {c.get('snippet', '')}" for c in competitors_raw])}
+{listing}
 
 For EACH competitor, identify:
 1. **Main Strength** - What they are good at (e.g., 'Low Price', 'Huge Community', 'Fast Delivery')
 2. **Main Weakness** - What users complain about or what they lack (e.g., 'Buggy App', 'Slow Support', 'Expensive')
 
-Provide a JSON response with this EXACT structure:
+Provide a JSON response with this EXACT structure, one entry per competitor in the same order:
 {{
   "competitors": [
-    {{ "name": "{competitors_raw[0]['name']}", "url": "{competitors_raw[0].get('url', '')}", "strength": "...", "weakness": "..." }},
-    {{ "name": "{competitors_raw[1]['name'] if len(competitors_raw) > 1 else 'Competitor 2'}", "url": "{competitors_raw[1].get('url', '') if len(competitors_raw) > 1 else ''}", "strength": "...", "weakness": "..." }},
-    {{ "name": "{competitors_raw[2]['name'] if len(competitors_raw) > 2 else 'Competitor 3'}", "url": "{competitors_raw[2].get('url', '') if len(competitors_raw) > 2 else ''}", "strength": "...", "weakness": "..." }},
-    {{ "name": "{competitors_raw[3]['name'] if len(competitors_raw) > 3 else 'Competitor 4'}", "url": "{competitors_raw[3].get('url', '') if len(competitors_raw) > 3 else ''}", "strength": "...", "weakness": "..." }},
-    {{ "name": "{competitors_raw[4]['name'] if len(competitors_raw) > 4 else 'Competitor 5'}", "url": "{competitors_raw[4].get('url', '') if len(competitors_raw) > 4 else ''}", "strength": "...", "weakness": "..." }}
+    {{ "id": 1, "name": "{competitors_raw[0]['name']}", "strength": "...", "weakness": "..." }}
   ],
   "top_competitor": {{
     "name": "{competitors_raw[0]['name']}"
   }}
 }}
 
-IMPORTANT: Include the URL from the search results for each competitor. If URL is not available, use an empty string.
-
 Return ONLY valid JSON, no markdown formatting."""
-                
-                try:
-                    analysis_response = self.llm.call(analysis_prompt)
-                    import json
-                    analysis_response = analysis_response.strip()
-                    if "```json" in analysis_response:
-                        analysis_response = analysis_response.split("```json")[1].split("```")[0].strip()
-                    elif "```" in analysis_response:
-                        analysis_response = analysis_response.split("```")[1].split("```")[0].strip()
-                    
-                    result = json.loads(analysis_response)
-                    
-                    # Ensure structure and merge URLs from search results
-                    if "competitors" not in result:
-                        result["competitors"] = []
-                    if "top_competitor" not in result:
-                        result["top_competitor"] = {"name": competitors_raw[0]["name"] if competitors_raw else "Market Leader"}
-                    
-                    # Merge URLs from search results (in case LLM didn't include them)
-                    for i, comp in enumerate(result.get("competitors", [])):
-                        if i < len(competitors_raw) and isinstance(comp, dict):
-                            if not comp.get("url") and competitors_raw[i].get("url"):
-                                comp["url"] = competitors_raw[i]["url"]
-                    
-                    return result
-                except Exception as e:
-                    print(f"[ScannerAgent] Error analyzing competitors: {e}")
-                    # Fallback to LLM-only scan
-                    return self._llm_fallback_scan(industry, keywords, problem)
-            
-            # No competitors found, use LLM fallback
-            return self._llm_fallback_scan(industry, keywords, problem)
-            
-        except Exception as e:
-            print(f"[ScannerAgent] Error with Serper: {e}")
-            return self._llm_fallback_scan(industry, keywords, problem)
+        
+        result = parse_json(self.llm.call(analysis_prompt, max_tokens=150 * len(competitors_raw) + 200,
+                                           priority=BACKGROUND))
+        analyzed = {}
+        for i, comp in enumerate(result.get("competitors", []), 1):
+            if not isinstance(comp, dict):
+                continue
+            try:
+                analyzed[int(comp.get("id", i))] = comp  # Models return "1" as often as 1
+            except (TypeError, ValueError):
+                analyzed[i] = comp
+        
+        # Names and URLs always come from the search results
+        competitors = []
+        for i, raw in enumerate(competitors_raw, 1):
+            comp = analyzed.get(i, {})
+            competitors.append({
+                "name": raw["name"],
+                "url": raw["url"],
+                "strength": comp.get("strength", "Market presence"),
+                "weakness": comp.get("weakness", "Unknown weaknesses"),
+                "mentions": raw["mentions"],
+            })
+        top = result.get("top_competitor") or {}
+        return {
+            "competitors": competitors,
+            "top_competitor": {"name": top.get("name") or competitors[0]["name"]},
+        }
     
     def _llm_fallback_scan(self, industry: str, keywords: str, problem: str) -> Dict:
         """Fallback to LLM for competitor research if Serper is unavailable."""
@@ -159,17 +279,9 @@ IMPORTANT:
 Return ONLY valid JSON, no markdown formatting."""
         
         try:
-            response = self.llm.call(prompt)
-            
-            # Clean and parse JSON
-            import json
-            response = response.strip()
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0].strip()
+            response = self.llm.call(prompt, priority=BACKGROUND)
             
-            result = json.loads(response)
+            result = parse_json(response)
             
             # Ensure structure
             if "competitors" not in result:
@@ -0,0 +1,555 @@
+"""
+Site CSS - Offline compiler for the Tailwind-style classes in generated sites.
+
+Generated pages used to load the Tailwind Play CDN, a JIT compiler that built
+the stylesheet in every visitor's browser on every page load. Instead, the
+frontend stage now scans the page's class attributes (and classList calls in
+inline scripts). It resolves each utility from the local table below and
+inlines only the rules the page uses, after a small preflight reset. The CDN
+script and tailwind.config block are removed; custom colors from the config
+and the blueprint palette become theme colors (bg-primary, text-accent...).
+
+Supported: spacing, sizing, flex/grid, typography, colors with /opacity or
+bg-/text-/border-/divide-opacity-*, gradients, borders/rounded, divide colors,
+shadows and shadow colors, line-clamp, transitions, translate/scale/rotate,
+arbitrary values (w-[300px], bg-[#0f172a]), and the sm/md/lg/xl/2xl, hover,
+focus, active and group-hover variants. Unknown classes are dropped.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950")
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+COLORS = {f"{name}-{shade}": f"#{hex_}" for name, values in PALETTE.items()
+          for shade, hex_ in zip(SHADES, values.split())}
+COLORS.update({"white": "#ffffff", "black": "#000000", "transparent": "transparent", "current": "currentColor"})
+
+BREAKPOINTS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px", "2xl": "1536px"}
+STATES = {"hover": ":hover", "focus": ":focus", "focus-visible": ":focus-visible", "active": ":active",
+          "disabled": ":disabled", "first": ":first-child", "last": ":last-child", "group-hover": None}
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"), "7xl": ("4.5rem", "1"), "8xl": ("6rem", "1"), "9xl": ("8rem", "1"),
+}
+FONT_WEIGHTS = {"thin": 100, "extralight": 200, "light": 300, "normal": 400, "medium": 500,
+                "semibold": 600, "bold": 700, "extrabold": 800, "black": 900}
+MAX_WIDTHS = {"xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem",
+              "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+              "full": "100%", "none": "none", "prose": "65ch", "screen-sm": "640px", "screen-md": "768px",
+              "screen-lg": "1024px", "screen-xl": "1280px", "screen-2xl": "1536px"}
+RADII = {"none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem", "xl": "0.75rem",
+         "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+LEADING = {"none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5", "relaxed": "1.625", "loose": "2"}
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em",
+            "wider": "0.05em", "widest": "0.1em"}
+GRADIENT_DIRECTIONS = {"t": "top", "tr": "top right", "r": "right", "br": "bottom right",
+                       "b": "bottom", "bl": "bottom left", "l": "left", "tl": "top left"}
+TRANSITIONS = {
+    "": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, translate, scale, rotate",
+    "all": "all", "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity", "shadow": "box-shadow", "transform": "transform, translate, scale, rotate",
+}
+KEYFRAMES = {
+    "spin": "@keyframes spin{to{transform:rotate(360deg)}}",
+    "ping": "@keyframes ping{75%,100%{transform:scale(2);opacity:0}}",
+    "pulse": "@keyframes pulse{50%{opacity:.5}}",
+    "bounce": "@keyframes bounce{0%,100%{transform:translateY(-25%);animation-timing-function:cubic-bezier(0.8,0,1,1)}"
+              "50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}",
+}
+ANIMATIONS = {"spin": "spin 1s linear infinite", "ping": "ping 1s cubic-bezier(0, 0, 0.2, 1) infinite",
+              "pulse": "pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite", "bounce": "bounce 1s infinite", "none": "none"}
+
+STATIC = {
+    "block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+    "flex": "display:flex", "inline-flex": "display:inline-flex", "grid": "display:grid",
+    "inline-grid": "display:inline-grid", "hidden": "display:none", "contents": "display:contents",
+    "table": "display:table",
+    "static": "position:static", "fixed": "position:fixed", "absolute": "position:absolute",
+    "relative": "position:relative", "sticky": "position:sticky",
+    "flex-row": "flex-direction:row", "flex-row-reverse": "flex-direction:row-reverse",
+    "flex-col": "flex-direction:column", "flex-col-reverse": "flex-direction:column-reverse",
+    "flex-wrap": "flex-wrap:wrap", "flex-nowrap": "flex-wrap:nowrap",
+    "flex-1": "flex:1 1 0%", "flex-auto": "flex:1 1 auto", "flex-initial": "flex:0 1 auto", "flex-none": "flex:none",
+    "grow": "flex-grow:1", "flex-grow": "flex-grow:1", "grow-0": "flex-grow:0",
+    "shrink": "flex-shrink:1", "shrink-0": "flex-shrink:0", "flex-shrink-0": "flex-shrink:0",
+    "items-start": "align-items:flex-start", "items-end": "align-items:flex-end",
+    "items-center": "align-items:center", "items-baseline": "align-items:baseline", "items-stretch": "align-items:stretch",
+    "justify-start": "justify-content:flex-start", "justify-end": "justify-content:flex-end",
+    "justify-center": "justify-content:center", "justify-between": "justify-content:space-between",
+    "justify-around": "justify-content:space-around", "justify-evenly": "justify-content:space-evenly",
+    "self-auto": "align-self:auto", "self-start": "align-self:flex-start", "self-end": "align-self:flex-end",
+    "self-center": "align-self:center", "self-stretch": "align-self:stretch",
+    "content-center": "align-content:center", "content-between": "align-content:space-between",
+    "place-items-center": "place-items:center", "place-content-center": "place-content:center",
+    "col-span-full": "grid-column:1 / -1", "col-auto": "grid-column:auto",
+    "font-sans": "font-family:ui-sans-serif, system-ui, sans-serif, \"Apple Color Emoji\", \"Segoe UI Emoji\"",
+    "font-serif": "font-family:ui-serif, Georgia, Cambria, \"Times New Roman\", Times, serif",
+    "font-mono": "font-family:ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, monospace",
+    "italic": "font-style:italic", "not-italic": "font-style:normal",
+    "uppercase": "text-transform:uppercase", "lowercase": "text-transform:lowercase",
+    "capitalize": "text-transform:capitalize", "normal-case": "text-transform:none",
+    "underline": "text-decoration-line:underline", "line-through": "text-decoration-line:line-through",
+    "no-underline": "text-decoration-line:none",
+    "text-left": "text-align:left", "text-center": "text-align:center", "text-right": "text-align:right",
+    "text-justify": "text-align:justify",
+    "whitespace-nowrap": "white-space:nowrap", "whitespace-normal": "white-space:normal",
+    "whitespace-pre-line": "white-space:pre-line",
+    "break-words": "overflow-wrap:break-word", "break-all": "word-break:break-all",
+    "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+    "antialiased": "-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale",
+    "list-none": "list-style-type:none", "list-disc": "list-style-type:disc",
+    "list-decimal": "list-style-type:decimal", "list-inside": "list-style-position:inside",
+    "border-solid": "border-style:solid", "border-dashed": "border-style:dashed",
+    "border-dotted": "border-style:dotted", "border-none": "border-style:none",
+    "overflow-hidden": "overflow:hidden", "overflow-auto": "overflow:auto", "overflow-visible": "overflow:visible",
+    "overflow-scroll": "overflow:scroll", "overflow-x-auto": "overflow-x:auto", "overflow-y-auto": "overflow-y:auto",
+    "overflow-x-hidden": "overflow-x:hidden", "overflow-y-hidden": "overflow-y:hidden",
+    "object-cover": "object-fit:cover", "object-contain": "object-fit:contain", "object-center": "object-position:center",
+    "bg-cover": "background-size:cover", "bg-contain": "background-size:contain", "bg-center": "background-position:center",
+    "bg-no-repeat": "background-repeat:no-repeat", "bg-fixed": "background-attachment:fixed",
+    "bg-clip-text": "-webkit-background-clip:text;background-clip:text", "bg-none": "background-image:none",
+    "cursor-pointer": "cursor:pointer", "cursor-default": "cursor:default", "cursor-not-allowed": "cursor:not-allowed",
+    "pointer-events-none": "pointer-events:none", "pointer-events-auto": "pointer-events:auto",
+    "select-none": "user-select:none", "outline-none": "outline:2px solid transparent;outline-offset:2px",
+    "scroll-smooth": "scroll-behavior:smooth", "aspect-square": "aspect-ratio:1 / 1", "aspect-video": "aspect-ratio:16 / 9",
+    "sr-only": "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;"
+               "clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0",
+    "transform": "", "transform-gpu": "", "filter": "",
+    "blur-sm": "filter:blur(4px)", "blur": "filter:blur(8px)", "blur-md": "filter:blur(12px)", "blur-lg": "filter:blur(16px)",
+    "backdrop-blur-sm": "-webkit-backdrop-filter:blur(4px);backdrop-filter:blur(4px)",
+    "backdrop-blur": "-webkit-backdrop-filter:blur(8px);backdrop-filter:blur(8px)",
+    "backdrop-blur-md": "-webkit-backdrop-filter:blur(12px);backdrop-filter:blur(12px)",
+    "backdrop-blur-lg": "-webkit-backdrop-filter:blur(16px);backdrop-filter:blur(16px)",
+    "ease-linear": "transition-timing-function:linear", "ease-in": "transition-timing-function:cubic-bezier(0.4, 0, 1, 1)",
+    "ease-out": "transition-timing-function:cubic-bezier(0, 0, 0.2, 1)",
+    "ease-in-out": "transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1)",
+    "w-full": "width:100%", "w-screen": "width:100vw", "w-auto": "width:auto", "w-fit": "width:fit-content",
+    "h-full": "height:100%", "h-screen": "height:100vh", "h-auto": "height:auto", "h-fit": "height:fit-content",
+    "min-h-screen": "min-height:100vh", "min-h-full": "min-height:100%", "min-h-0": "min-height:0px",
+    "min-w-0": "min-width:0px", "min-w-full": "min-width:100%", "max-h-full": "max-height:100%",
+    "max-h-screen": "max-height:100vh",
+}
+
+PREFLIGHT = (
+    "*,::before,::after{box-sizing:border-box;border:0 solid #e5e7eb}"
+    "html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"
+    "\"Apple Color Emoji\",\"Segoe UI Emoji\"}"
+    "body{margin:0;line-height:inherit}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "a{color:inherit;text-decoration:inherit}b,strong{font-weight:bolder}"
+    "blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}"
+    "ol,ul,menu{list-style:none;margin:0;padding:0}"
+    "img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}img,video{max-width:100%;height:auto}"
+    "button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;"
+    "color:inherit;margin:0;padding:0}"
+    "button,[type='button'],[type='submit']{-webkit-appearance:button;background-color:transparent;background-image:none;"
+    "cursor:pointer}"
+    "input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}[hidden]{display:none}"
+)
+
+SPACING_PROPS = {
+    "p": ("padding",), "px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom"),
+    "pt": ("padding-top",), "pr": ("padding-right",), "pb": ("padding-bottom",), "pl": ("padding-left",),
+    "m": ("margin",), "mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom"),
+    "mt": ("margin-top",), "mr": ("margin-right",), "mb": ("margin-bottom",), "ml": ("margin-left",),
+    "gap": ("gap",), "gap-x": ("column-gap",), "gap-y": ("row-gap",),
+    "w": ("width",), "h": ("height",), "min-w": ("min-width",), "min-h": ("min-height",),
+    "max-h": ("max-height",), "size": ("width", "height"),
+    "inset": ("inset",), "inset-x": ("left", "right"), "inset-y": ("top", "bottom"),
+    "top": ("top",), "right": ("right",), "bottom": ("bottom",), "left": ("left",),
+}
+# Shorthands sort before the longhands they overlap (p-4 px-2 -> px wins, as in Tailwind)
+SPECIFICITY = {"p": 0, "m": 0, "inset": 0, "gap": 0, "rounded": 0, "border": 0,
+               "px": 1, "py": 1, "mx": 1, "my": 1, "inset-x": 1, "inset-y": 1, "gap-x": 1, "gap-y": 1,
+               "from": 0, "via": 1, "to": 2}
+COLOR_PROPS = {"bg": "background-color", "text": "color", "border": "border-color", "ring": "--tw-ring-color",
+               "fill": "fill", "stroke": "stroke", "placeholder": "color", "decoration": "text-decoration-color",
+               "divide": "border-color"}
+# Colors that take a separate *-opacity-N utility (bg-black bg-opacity-50), via a CSS variable
+OPACITY_KINDS = ("bg", "text", "border", "divide")
+MAX_UNKNOWN_LOGGED = 30
+
+
+def _spacing(value: str) -> Optional[str]:
+    if value == "px":
+        return "1px"
+    if value in ("auto", "full", "screen"):
+        return {"auto": "auto", "full": "100%", "screen": "100vw"}[value]
+    if re.fullmatch(r"\d+(\.\d+)?", value):
+        return "0px" if float(value) == 0 else f"{float(value) / 4:g}rem"
+    fraction = re.fullmatch(r"(\d+)/(\d+)", value)
+    if fraction:
+        return f"{int(fraction.group(1)) / int(fraction.group(2)) * 100:g}%"
+    if value.startswith("[") and value.endswith("]"):
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _negate(value: str) -> str:
+    return value if value in ("0px", "auto") else f"calc({value} * -1)"
+
+
+def _rgb(color: str) -> Optional[str]:
+    """'#4f46e5' -> '79 70 229'; None for anything but 3/6-digit hex."""
+    hex_ = color.lstrip("#") if color.startswith("#") else ""
+    if len(hex_) == 3:
+        hex_ = "".join(c * 2 for c in hex_)
+    if not re.fullmatch(r"[0-9a-fA-F]{6}", hex_):
+        return None
+    return " ".join(str(int(hex_[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def _hex_alpha(color: str, alpha: Optional[str]) -> str:
+    rgb = _rgb(color) if alpha is not None else None
+    if rgb is None:
+        return color
+    opacity = alpha[1:-1] if alpha.startswith("[") else f"{int(alpha) / 100:g}"
+    return f"rgb({rgb} / {opacity})"
+
+
+def _colored_shadow(shadow: str) -> str:
+    """The same shadow drawn in --tw-shadow-color (for shadow-<color>)."""
+    return re.sub(r"rgb\([^)]*\)|#0000", "var(--tw-shadow-color)", shadow)
+
+
+class Compiler:
+    """Resolves utility classes against the table plus the page's theme colors."""
+
+    def __init__(self, theme_colors: Optional[Dict[str, str]] = None):
+        self.colors = {**COLORS, **(theme_colors or {})}
+        self.keyframes = set()
+
+    def color(self, value: str, opacity_var: Optional[str] = None) -> Optional[str]:
+        """
+        CSS color for a class value ("indigo-600", "white/80", "[#0f172a]").
+
+        With opacity_var, a hex color without /alpha reads its alpha from that
+        variable, so a separate bg-opacity-50 class can fade it. The caller sets
+        the variable to 1 next to the color, so a faded parent doesn't fade
+        its children through inheritance.
+        """
+        name, _, alpha = value.partition("/")
+        if name.startswith("[") and name.endswith("]"):
+            color = name[1:-1].replace("_", " ")
+        else:
+            color = self.colors.get(name)
+        if color is None or (alpha and not re.fullmatch(r"\d+|\[[\d.]+\]", alpha)):
+            return None
+        if opacity_var and not alpha and _rgb(color):
+            return f"rgb({_rgb(color)} / var({opacity_var}))"
+        return _hex_alpha(color, alpha or None)
+
+    def resolve(self, utility: str) -> Optional[Tuple[str, str, int]]:
+        """(selector suffix, declarations, sort rank) for one utility, or None."""
+        if utility in STATIC:
+            return "", STATIC[utility], 0
+        negative = utility.startswith("-")
+        base = utility[1:] if negative else utility
+
+        # Spacing, sizing and position
+        for prefix in sorted(SPACING_PROPS, key=len, reverse=True):
+            if base.startswith(prefix + "-"):
+                value = _spacing(base[len(prefix) + 1:])
+                if value is None or (prefix in ("w", "size") and value == "100vw" and base != "w-screen"):
+                    break
+                if prefix == "h" and base.endswith("-screen"):
+                    value = "100vh"
+                value = _negate(value) if negative else value
+                rank = SPECIFICITY.get(prefix, 2)
+                return "", ";".join(f"{prop}:{value}" for prop in SPACING_PROPS[prefix]), rank
+        if negative and not re.match(r"(translate|rotate|z)-", base):
+            return None
+
+        match = re.fullmatch(r"space-([xy])-(.+)", base)
+        if match and _spacing(match.group(2)):
+            side = "left" if match.group(1) == "x" else "top"
+            return " > * + *", f"margin-{side}:{_spacing(match.group(2))}", 0
+        match = re.fullmatch(r"divide-([xy])(?:-(\d+))?", base)
+        if match:
+            side = "left" if match.group(1) == "x" else "top"
+            return " > * + *", f"border-{side}-width:{match.group(2) or 1}px", 0
+        match = re.fullmatch(r"line-clamp-(\d+|none)", base)
+        if match:
+            if match.group(1) == "none":
+                return "", "overflow:visible;display:block;-webkit-box-orient:horizontal;-webkit-line-clamp:none", 0
+            return "", (f"overflow:hidden;display:-webkit-box;-webkit-box-orient:vertical;"
+                        f"-webkit-line-clamp:{match.group(1)}"), 0
+
+        match = re.fullmatch(r"max-w-(.+)", base)
+        if match:
+            value = MAX_WIDTHS.get(match.group(1)) or (_spacing(match.group(1)) if "[" in base else None)
+            return ("", f"max-width:{value}", 0) if value else None
+        if base == "container":
+            return "", "width:100%", 0
+
+        match = re.fullmatch(r"text-(.+)", base)
+        if match:
+            value = match.group(1)
+            if value in FONT_SIZES:
+                size, line = FONT_SIZES[value]
+                return "", f"font-size:{size};line-height:{line}", 0
+            if value.startswith("[") and re.match(r"\[\d", value):
+                return "", f"font-size:{value[1:-1]}", 0
+        match = re.fullmatch(r"font-(\w+)", base)
+        if match and match.group(1) in FONT_WEIGHTS:
+            return "", f"font-weight:{FONT_WEIGHTS[match.group(1)]}", 0
+        match = re.fullmatch(r"leading-(.+)", base)
+        if match:
+            value = LEADING.get(match.group(1)) or _spacing(match.group(1))
+            return ("", f"line-height:{value}", 0) if value else None
+        match = re.fullmatch(r"tracking-(.+)", base)
+        if match and match.group(1) in TRACKING:
+            return "", f"letter-spacing:{TRACKING[match.group(1)]}", 0
+
+        # Opacity of a separately set color; ranks after the color so it wins
+        match = re.fullmatch(r"(bg|text|border|divide)-opacity-(\d+)", base)
+        if match:
+            kind, value = match.groups()
+            suffix = " > * + *" if kind == "divide" else ""
+            return suffix, f"--tw-{kind}-opacity:{int(value) / 100:g}", 1
+
+        # Colors (bg-indigo-600, text-white/80, border-[#ddd], from-primary, divide-gray-200...)
+        match = re.fullmatch(r"(bg|text|border|ring|fill|stroke|placeholder|decoration|divide|from|via|to)-(.+)", base)
+        if match:
+            kind, value = match.groups()
+            opacity_var = f"--tw-{kind}-opacity" if kind in OPACITY_KINDS else None
+            color = self.color(value, opacity_var)
+            if color:
+                if kind == "from":
+                    return "", (f"--tw-gradient-from:{color};--tw-gradient-to:transparent;"
+                                "--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)"), 0
+                if kind == "via":
+                    return "", (f"--tw-gradient-to:transparent;--tw-gradient-stops:var(--tw-gradient-from), "
+                                f"{color}, var(--tw-gradient-to)"), 1
+                if kind == "to":
+                    return "", f"--tw-gradient-to:{color}", 2
+                suffix = {"placeholder": "::placeholder", "divide": " > * + *"}.get(kind, "")
+                reset = f"{opacity_var}:1;" if opacity_var and f"var({opacity_var})" in color else ""
+                return suffix, f"{reset}{COLOR_PROPS[kind]}:{color}", 0
+            if kind == "bg" and value.startswith("[url("):
+                return "", f"background-image:{value[1:-1]}", 0
+
+        match = re.fullmatch(r"bg-gradient-to-(\w+)", base)
+        if match and match.group(1) in GRADIENT_DIRECTIONS:
+            return "", f"background-image:linear-gradient(to {GRADIENT_DIRECTIONS[match.group(1)]}, var(--tw-gradient-stops))", 0
+
+        # Borders, radius, shadows, rings
+        match = re.fullmatch(r"border(?:-([trblxy]))?(?:-(\d+))?", base)
+        if match:
+            side, width = match.group(1), f"{match.group(2) or 1}px"
+            sides = {"t": ["top"], "r": ["right"], "b": ["bottom"], "l": ["left"],
+                     "x": ["left", "right"], "y": ["top", "bottom"]}.get(side)
+            props = [f"border-{s}-width" for s in sides] if sides else ["border-width"]
+            return "", ";".join(f"{p}:{width}" for p in props), 1 if side else 0
+        match = re.fullmatch(r"rounded(?:-(t|r|b|l|tl|tr|br|bl))?(?:-(none|sm|md|lg|xl|2xl|3xl|full|\[.+\]))?", base)
+        if match:
+            side, size = match.group(1), match.group(2) or ""
+            radius = size[1:-1] if size.startswith("[") else RADII[size]
+            corners = {"t": ["top-left", "top-right"], "r": ["top-right", "bottom-right"],
+                       "b": ["bottom-right", "bottom-left"], "l": ["top-left", "bottom-left"],
+                       "tl": ["top-left"], "tr": ["top-right"], "br": ["bottom-right"], "bl": ["bottom-left"]}.get(side)
+            props = [f"border-{c}-radius" for c in corners] if corners else ["border-radius"]
+            return "", ";".join(f"{p}:{radius}" for p in props), 1 if side else 0
+        match = re.fullmatch(r"shadow(?:-(sm|md|lg|xl|2xl|inner|none))?", base)
+        if match:
+            shadow = SHADOWS[match.group(1) or '']
+            return "", f"--tw-shadow:{shadow};--tw-shadow-colored:{_colored_shadow(shadow)};box-shadow:var(--tw-shadow)", 0
+        match = re.fullmatch(r"shadow-(.+)", base)
+        if match and self.color(match.group(1)):
+            # shadow-lg shadow-indigo-500/50: recolor whichever size is set
+            return "", f"--tw-shadow-color:{self.color(match.group(1))};--tw-shadow:var(--tw-shadow-colored)", 1
+        match = re.fullmatch(r"ring(?:-(\d+))?", base)
+        if match:
+            return "", f"box-shadow:0 0 0 {match.group(1) or 3}px var(--tw-ring-color, rgb(59 130 246 / 0.5))", 0
+
+        # Grid
+        match = re.fullmatch(r"grid-(cols|rows)-(\d+|none|\[.+\])", base)
+        if match:
+            kind, value = match.groups()
+            prop = "grid-template-columns" if kind == "cols" else "grid-template-rows"
+            if value.isdigit():
+                value = f"repeat({value}, minmax(0, 1fr))"
+            elif value.startswith("["):
+                value = value[1:-1].replace("_", " ")
+            return "", f"{prop}:{value}", 0
+        match = re.fullmatch(r"(col|row)-span-(\d+)", base)
+        if match:
+            prop = "grid-column" if match.group(1) == "col" else "grid-row"
+            return "", f"{prop}:span {match.group(2)} / span {match.group(2)}", 0
+        match = re.fullmatch(r"order-(\d+|first|last)", base)
+        if match:
+            value = {"first": "-9999", "last": "9999"}.get(match.group(1), match.group(1))
+            return "", f"order:{value}", 0
+
+        # Effects, transforms, transitions
+        match = re.fullmatch(r"opacity-(\d+)", base)
+        if match:
+            return "", f"opacity:{int(match.group(1)) / 100:g}", 0
+        match = re.fullmatch(r"z-(\d+|auto)", base)
+        if match:
+            value = match.group(1)
+            return "", f"z-index:{'-' + value if negative else value}", 0
+        match = re.fullmatch(r"scale-(x-|y-)?(\d+)", base)
+        if match:
+            value = f"{int(match.group(2)) / 100:g}"
+            axis = match.group(1)
+            return "", f"scale:{value if not axis else (f'{value} 1' if axis == 'x-' else f'1 {value}')}", 0
+        match = re.fullmatch(r"translate-([xy])-(.+)", base)
+        if match and _spacing(match.group(2)):
+            value = _spacing(match.group(2))
+            value = _negate(value) if negative else value
+            var = "--tw-translate-x" if match.group(1) == "x" else "--tw-translate-y"
+            return "", f"{var}:{value};translate:var(--tw-translate-x, 0) var(--tw-translate-y, 0)", 0
+        match = re.fullmatch(r"rotate-(\d+)", base)
+        if match:
+            return "", f"rotate:{'-' if negative else ''}{match.group(1)}deg", 0
+        match = re.fullmatch(r"transition(?:-(all|colors|opacity|shadow|transform|none))?", base)
+        if match:
+            if match.group(1) == "none":
+                return "", "transition-property:none", 0
+            return "", (f"transition-property:{TRANSITIONS[match.group(1) or '']};"
+                        "transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);transition-duration:150ms"), 0
+        match = re.fullmatch(r"(duration|delay)-(\d+)", base)
+        if match:
+            prop = "transition-duration" if match.group(1) == "duration" else "transition-delay"
+            return "", f"{prop}:{match.group(2)}ms", 1
+        match = re.fullmatch(r"animate-(\w+)", base)
+        if match and match.group(1) in ANIMATIONS:
+            self.keyframes.add(match.group(1))
+            return "", f"animation:{ANIMATIONS[match.group(1)]}", 0
+        return None
+
+
+def _escape(class_name: str) -> str:
+    escaped = re.sub(r"([^A-Za-z0-9_-])", r"\\\1", class_name)
+    if class_name[0].isdigit():
+        escaped = f"\\3{class_name[0]} " + escaped[1:]
+    return escaped
+
+
+def compile_css(classes: Iterable[str], theme_colors: Optional[Dict[str, str]] = None) -> Tuple[str, List[str]]:
+    """
+    Minimal stylesheet for the given classes.
+
+    Returns:
+        (css, unknown classes that were skipped)
+    """
+    compiler = Compiler(theme_colors)
+    rules, unknown = [], []
+    for order, cls in enumerate(dict.fromkeys(classes)):
+        *variants, utility = cls.split(":")
+        if utility.startswith("!"):
+            utility = utility[1:]
+        breakpoint = next((v for v in variants if v in BREAKPOINTS), None)
+        states = [v for v in variants if v in STATES]
+        if len(variants) != len(states) + (1 if breakpoint else 0):
+            unknown.append(cls)  # dark:, print:, peer-* ...
+            continue
+        resolved = compiler.resolve(utility)
+        if resolved is None:
+            unknown.append(cls)
+            continue
+        suffix, declarations, rank = resolved
+        if not declarations:
+            continue
+        selector = "." + _escape(cls)
+        if "group-hover" in states:
+            selector = f".group:hover {selector}"
+        selector += "".join(STATES[s] for s in states if STATES[s])
+        bp_index = list(BREAKPOINTS).index(breakpoint) + 1 if breakpoint else 0
+        rules.append((bp_index, bool(states), rank, order, breakpoint, f"{selector}{suffix}{{{declarations}}}"))
+
+    rules.sort(key=lambda r: r[:4])
+    css, open_bp = [PREFLIGHT], None
+    if any(cls.split(":")[-1] == "container" for cls in classes):
+        css.append("".join(f"@media (min-width:{w}){{.container{{max-width:{w}}}}}" for w in BREAKPOINTS.values()))
+    for _, _, _, _, breakpoint, rule in rules:
+        if breakpoint != open_bp:
+            if open_bp:
+                css.append("}")
+            if breakpoint:
+                css.append(f"@media (min-width:{BREAKPOINTS[breakpoint]}){{")
+            open_bp = breakpoint
+        css.append(rule)
+    if open_bp:
+        css.append("}")
+    css.extend(KEYFRAMES[name] for name in sorted(compiler.keyframes))
+    return "\n".join(css), unknown
+
+
+CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+CLASSLIST_RE = re.compile(r"""classList\.(?:add|remove|toggle)\(([^)]*)\)""")
+CDN_SCRIPT_RE = re.compile(r"""<script[^>]*\bsrc\s*=\s*["'][^"']*cdn\.tailwindcss\.com[^"']*["'][^>]*>\s*</script>\s*""", re.I)
+CONFIG_SCRIPT_RE = re.compile(r"""<script[^>]*>\s*tailwind\.config\s*=.*?</script>\s*""", re.I | re.S)
+COMPILED_STYLE_RE = re.compile(r"""<style id="site-css">.*?</style>\s*""", re.S)
+CONFIG_COLOR_RE = re.compile(r"""["']?([\w-]+)["']?\s*:\s*["'](#[0-9a-fA-F]{3,8}|rgba?\([^"')]*\))["']""")
+
+
+def page_classes(html: str) -> List[str]:
+    """Every class used in class attributes and in classList calls."""
+    classes = []
+    for match in CLASS_ATTR_RE.finditer(html):
+        classes.extend((match.group(1) if match.group(1) is not None else match.group(2)).split())
+    for match in CLASSLIST_RE.finditer(html):
+        classes.extend(re.findall(r"""["']([^"']+)["']""", match.group(1)))
+    return classes
+
+
+def compile_page(html: str, palette: Optional[Dict[str, str]] = None) -> str:
+    """
+    Replace the Tailwind CDN in a generated page with an inlined, precompiled stylesheet.
+
+    Args:
+        html: Generated page
+        palette: Blueprint color_palette ({"primary": "#4F46E5", ...}), used as theme colors
+    """
+    theme = {k: v for k, v in (palette or {}).items() if isinstance(v, str) and v.startswith(("#", "rgb"))}
+    for config in CONFIG_SCRIPT_RE.findall(html):
+        theme.update(dict(CONFIG_COLOR_RE.findall(config)))  # tailwind.config colors win
+
+    html = COMPILED_STYLE_RE.sub("", CONFIG_SCRIPT_RE.sub("", CDN_SCRIPT_RE.sub("", html)))
+    css, unknown = compile_css(page_classes(html), theme)
+    style = f'<style id="site-css">\n{css}\n</style>\n'
+    if re.search(r"</head>", html, re.I):
+        html = re.sub(r"</head>", lambda _: style + "</head>", html, count=1, flags=re.I)
+    else:
+        html = style + html
+    print(f"[SiteCSS] Compiled {len(css)} bytes of CSS ({len(unknown)} unknown classes skipped)")
+    if unknown:
+        shown = ", ".join(unknown[:MAX_UNKNOWN_LOGGED])
+        more = f" (+{len(unknown) - MAX_UNKNOWN_LOGGED} more)" if len(unknown) > MAX_UNKNOWN_LOGGED else ""
+        print(f"[SiteCSS] Unknown classes: {shown}{more}")
+    return html
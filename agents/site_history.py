@@ -0,0 +1,204 @@
+"""
+Site History - Content-addressed versions of generated websites.
+
+After every pipeline run or regenerate, the output files (index.html,
+content_copy.json, website_blueprint.json) are snapshotted. Each file is
+stored once as a gzip blob named by the SHA-256 of its bytes, so versions that
+share a blueprint or copy share its blob. A version's id is the hash of its
+file hashes: re-snapshotting identical output just marks the existing version
+current again and moves it to the top of the list (last_current_at).
+Rolling back copies a version's blobs over pipeline_outputs/ (and removes
+site files the version lacks) with no LLM call.
+"""
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+OUTPUT_DIR = Path(__file__).parent.parent / "pipeline_outputs"
+HISTORY_DIR = OUTPUT_DIR / "history"
+SITE_FILES = ("index.html", "content_copy.json", "website_blueprint.json")
+MAX_DIFF_LINES = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    source TEXT,
+    brand TEXT,
+    headline TEXT,
+    files TEXT NOT NULL,
+    last_current_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_versions_created ON versions (created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _headline(files: Dict[str, bytes]) -> Optional[str]:
+    """Hero headline for the version list (best effort)."""
+    try:
+        content = json.loads(files.get("content_copy.json") or b"{}")
+        return (content.get("hero") or {}).get("h1")
+    except (ValueError, AttributeError):
+        return None
+
+
+class SiteHistory:
+    """Versions table plus a deduplicated blob directory."""
+
+    def __init__(self, directory: Path = HISTORY_DIR, output_dir: Path = OUTPUT_DIR):
+        self.dir = Path(directory)
+        self.blob_dir = self.dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = Path(output_dir)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.dir / "versions.db"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = [r[1] for r in self._conn.execute("PRAGMA table_info(versions)")]
+        if "last_current_at" not in columns:
+            self._conn.execute("ALTER TABLE versions ADD COLUMN last_current_at REAL")
+        self._conn.execute("UPDATE versions SET last_current_at = created_at WHERE last_current_at IS NULL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_versions_current ON versions (last_current_at)")
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.gz"
+
+    def _put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():  # Same bytes already stored by an earlier version
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_bytes(gzip.compress(data, mtime=0))
+            tmp.replace(path)
+        return digest
+
+    def _get_blob(self, digest: str) -> bytes:
+        return gzip.decompress(self._blob_path(digest).read_bytes())
+
+    def _row(self, row) -> Dict:
+        return {"version_id": row["id"], "created_at": row["created_at"],
+                "last_current_at": row["last_current_at"], "source": row["source"],
+                "brand": row["brand"], "headline": row["headline"], "files": json.loads(row["files"])}
+
+    def current_id(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'current'").fetchone()
+        return row[0] if row else None
+
+    def _set_current(self, version_id: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('current', ?)", (version_id,))
+        self._conn.execute("UPDATE versions SET last_current_at = ? WHERE id = ?", (time.time(), version_id))
+
+    def snapshot(self, source: str = "pipeline", brand: Optional[str] = None) -> Optional[Dict]:
+        """
+        Record the files currently in pipeline_outputs/ as a version.
+
+        Returns:
+            The version (existing one if identical output was seen before),
+            or None when there is no generated site yet
+        """
+        contents = {name: (self.output_dir / name).read_bytes()
+                    for name in SITE_FILES if (self.output_dir / name).exists()}
+        if "index.html" not in contents:
+            return None
+        files = {name: self._put_blob(data) for name, data in contents.items()}
+        version_id = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:16]
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO versions (id, created_at, source, brand, headline, files)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (version_id, time.time(), source, brand, _headline(contents), json.dumps(files)))
+            self._set_current(version_id)
+            row = self._conn.execute("SELECT * FROM versions WHERE id = ?", (version_id,)).fetchone()
+        print(f"[SiteHistory] Snapshot {version_id} ({source})")
+        return self._row(row)
+
+    def get(self, version_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM versions WHERE id = ?", (version_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        """Most recently live first, with the current version flagged."""
+        current = self.current_id()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM versions ORDER BY last_current_at DESC LIMIT ?", (max(1, min(limit, 500)),)).fetchall()
+        return [{**self._row(row), "current": row["id"] == current} for row in rows]
+
+    def read(self, version_id: str, name: str = "index.html") -> Optional[bytes]:
+        """One file of a version, or None if the version or file is unknown."""
+        version = self.get(version_id)
+        if not version or name not in version["files"]:
+            return None
+        return self._get_blob(version["files"][name])
+
+    def diff(self, a: str, b: str) -> Optional[Dict]:
+        """
+        Unified diffs between two versions, per file.
+
+        Unchanged files (same blob) are listed without a diff.
+        """
+        va, vb = self.get(a), self.get(b)
+        if not va or not vb:
+            return None
+        files = {}
+        for name in SITE_FILES:
+            ha, hb = va["files"].get(name), vb["files"].get(name)
+            if ha == hb:
+                files[name] = {"changed": False}
+                continue
+            old = self._get_blob(ha).decode("utf-8", "replace").splitlines() if ha else []
+            new = self._get_blob(hb).decode("utf-8", "replace").splitlines() if hb else []
+            lines = list(difflib.unified_diff(old, new, f"{a}/{name}", f"{b}/{name}", lineterm=""))
+            files[name] = {"changed": True, "diff": "\n".join(lines[:MAX_DIFF_LINES]),
+                           "truncated": len(lines) > MAX_DIFF_LINES}
+        return {"from": a, "to": b, "files": files}
+
+    def rollback(self, version_id: str) -> Optional[Dict]:
+        """
+        Restore a version's files into pipeline_outputs/ and mark it current.
+
+        Site files the version doesn't have are removed, so nothing from a
+        newer version is left mixed in.
+        """
+        version = self.get(version_id)
+        if not version:
+            return None
+        for name in SITE_FILES:
+            target = self.output_dir / name
+            if name in version["files"]:
+                tmp = target.with_name(f".{name}.tmp{os.getpid()}")
+                tmp.write_bytes(self._get_blob(version["files"][name]))
+                tmp.replace(target)
+            else:
+                target.unlink(missing_ok=True)
+        with self._lock:
+            self._set_current(version_id)
+        print(f"[SiteHistory] Rolled back to {version_id}")
+        return version
+
+
+_history: Optional[SiteHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_site_history() -> SiteHistory:
+    """Process-wide site history (opened on first use)."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = SiteHistory()
+        return _history
@@ -0,0 +1,266 @@
+"""
+Speculative Pipeline - Prefetches website stages during onboarding.
+
+Each stage starts in the background as soon as the answers it reads are in,
+keyed by a hash of those inputs. A changed answer invalidates the stage and
+everything downstream of it. trigger_pipeline() then reuses any stage whose
+key still matches instead of calling the LLM again. Outputs are written under
+speculative/<key>/, so a stage finished by another server worker is reused
+from disk too. A stage output only appears there once complete, and never when
+the agent fell back to its template because the LLM failed. Each worker claims
+a stage key in shared state before running it; the others wait for its output
+instead of spending their own LLM calls on the same stage.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+from memory.shared_state import get_shared_state
+
+ENABLED = os.getenv("SPECULATIVE_PIPELINE", "1") != "0"
+WAIT_SECONDS = 180
+SPEC_DIR = Path(__file__).parent.parent / "pipeline_outputs" / "speculative"
+CLAIMS_NAMESPACE = "speculative_claims"
+CLAIM_SECONDS = 600  # A claim outlives any real stage; expiry only covers a worker that died
+POLL_SECONDS = 0.5
+
+# stage -> (context fields it reads, fields that must be present, upstream stages)
+# Strategy never reads brand_name (asked late, at question 9); its key also
+# covers the competitor facts it is given.
+STAGES = {
+    "strategy": (
+        ["problem", "target_audience", "services", "unique_feature", "industry"],
+        ["problem", "target_audience", "services", "unique_feature"],
+        [],
+    ),
+    "content": (
+        ["brand_name", "problem", "services", "unique_feature", "primary_cta", "trust_factors"],
+        ["brand_name", "problem", "services", "unique_feature", "trust_factors"],
+        ["strategy"],
+    ),
+    "frontend": ([], [], ["strategy", "content"]),
+}
+STAGE_OUTPUTS = {"strategy": "website_blueprint.json", "content": "content_copy.json", "frontend": "index.html"}
+
+
+def _on_disk(stage: str, key: str):
+    """Output a finished stage left under its key, from this or another worker."""
+    path = SPEC_DIR / key / STAGE_OUTPUTS[stage]
+    return path if path.exists() else None
+
+
+def _claim(stage: str, key: str, owner: str) -> bool:
+    """Claim a stage key in one transaction; False if another worker is running it."""
+    with get_shared_state().transaction() as txn:
+        if txn.get(CLAIMS_NAMESPACE, f"{stage}:{key}") is not None:
+            return False
+        txn.set(CLAIMS_NAMESPACE, f"{stage}:{key}", {"owner": owner, "claimed_at": time.time()}, ttl=CLAIM_SECONDS)
+        return True
+
+
+def _release(stage: str, key: str, owner: str):
+    with get_shared_state().transaction() as txn:
+        claim = txn.get(CLAIMS_NAMESPACE, f"{stage}:{key}")
+        if claim is not None and claim.get("owner") == owner:
+            txn.delete(CLAIMS_NAMESPACE, f"{stage}:{key}")
+
+
+def _claimed_elsewhere(stage: str, key: str, cancel: threading.Event) -> Future:
+    """Future for a stage another worker claimed: its output once on disk, or an error once unclaimed."""
+    future = Future()
+
+    def watch():
+        while not future.done():
+            output = _on_disk(stage, key)
+            if cancel.is_set():
+                future.set_exception(StageCancelled(stage))
+            elif output:
+                future.set_result(output)
+            elif get_shared_state().get(CLAIMS_NAMESPACE, f"{stage}:{key}") is None:
+                future.set_exception(StageFellBack(f"{stage} was not finished by the worker that claimed it"))
+            else:
+                time.sleep(POLL_SECONDS)
+
+    threading.Thread(target=watch, daemon=True, name=f"speculative-{stage}-watch").start()
+    return future
+
+
+class StageCancelled(Exception):
+    """The stage was invalidated before it finished."""
+
+
+class StageFellBack(Exception):
+    """The LLM failed and the agent produced its generic template instead."""
+
+
+def _done(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def stage_keys(context: Dict) -> Dict[str, str]:
+    """Input hash for every stage whose inputs are complete."""
+    keys = {}
+    for stage, (fields, required, upstream) in STAGES.items():
+        if any(not context.get(f) for f in required) or any(u not in keys for u in upstream):
+            continue
+        material = {f: context.get(f, "") for f in fields}
+        material["_upstream"] = [keys[u] for u in upstream]
+        if stage == "strategy":
+            from agents.strategy_agent import competitor_facts
+            material["_competitors"] = competitor_facts(context)
+        digest = hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+        keys[stage] = digest[:16]
+    return keys
+
+
+class SpeculativePipeline:
+    """Runs pipeline stages ahead of time on a single low-priority worker."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative")
+        self._stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._llm = None
+        self._owner = uuid.uuid4().hex
+
+    def _get_llm(self, cancel: threading.Event = None):
+        """Shared LLM handle, or a per-stage one that stops queueing once cancelled."""
+        from llm.gemini_llm import GeminiLLM
+        from llm.scheduler import BACKGROUND
+        if cancel is not None:
+            return GeminiLLM(priority=BACKGROUND, cancel=cancel)
+        if self._llm is None:
+            self._llm = GeminiLLM(priority=BACKGROUND)
+        return self._llm
+
+    def update(self, context: Dict):
+        """Schedule stages whose inputs are complete; drop stale ones."""
+        if not ENABLED or not getattr(self._get_llm(), "ready", False):
+            return
+        keys = stage_keys(context)
+        with self._lock:
+            for stage, (_, _, upstream) in STAGES.items():
+                key = keys.get(stage)
+                entry = self._stages.get(stage)
+                if entry and entry["key"] == key:
+                    continue
+                if entry:
+                    entry["future"].cancel()
+                    entry["cancel"].set()
+                    print(f"[Speculative] Invalidated {stage}")
+                if key is None:
+                    self._stages.pop(stage, None)
+                    continue
+                cancel = threading.Event()
+                if _on_disk(stage, key):
+                    self._stages[stage] = {"key": key, "future": _done(_on_disk(stage, key)), "cancel": cancel}
+                    continue
+                if not _claim(stage, key, self._owner):
+                    self._stages[stage] = {"key": key, "future": _claimed_elsewhere(stage, key, cancel), "cancel": cancel}
+                    print(f"[Speculative] {stage} ({key}) is running in another worker")
+                    continue
+                deps = {u: self._stages[u]["future"] for u in upstream}
+                future = self._executor.submit(self._run, stage, key, dict(context), deps, cancel)
+                future.add_done_callback(lambda _, stage=stage, key=key: _release(stage, key, self._owner))
+                self._stages[stage] = {"key": key, "future": future, "cancel": cancel}
+                print(f"[Speculative] Scheduled {stage} ({key})")
+
+    def _run(self, stage: str, key: str, context: Dict, deps: Dict[str, Future],
+             cancel: threading.Event) -> Path:
+        """
+        Run one stage. An invalidated stage stops waiting for an LLM slot, and
+        whatever it produced is discarded. The agent writes into a private work
+        directory and the finished output is renamed into place.
+        """
+        from agents.strategy_agent import StrategyAgent
+        from agents.content_agent import ContentAgent
+        from agents.frontend_dev_agent import FrontendDevAgent
+
+        inputs = {u: f.result() for u, f in deps.items()}
+        if cancel.is_set():
+            raise StageCancelled(stage)
+
+        out_dir = SPEC_DIR / key
+        work_dir = out_dir / f".work_{uuid.uuid4().hex}"
+        work_dir.mkdir(parents=True)
+        llm = self._get_llm(cancel)
+
+        try:
+            if stage == "strategy":
+                agent = StrategyAgent(llm)
+                agent.output_dir = work_dir
+                output = agent.execute(context)
+            elif stage == "content":
+                agent = ContentAgent(llm)
+                agent.output_dir = work_dir
+                output = agent.execute(inputs["strategy"], context)
+            else:
+                agent = FrontendDevAgent(llm)
+                agent.output_dir = work_dir
+                output = agent.execute(inputs["strategy"], inputs["content"])
+
+            if cancel.is_set():
+                print(f"[Speculative] Discarded cancelled {stage}")
+                raise StageCancelled(stage)
+            if agent.used_fallback:
+                print(f"[Speculative] Discarded {stage}: LLM failed, template output not cached")
+                raise StageFellBack(stage)
+            final = out_dir / STAGE_OUTPUTS[stage]
+            os.replace(output, final)
+            return final
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def take(self, context: Dict) -> Dict[str, Path]:
+        """
+        Collect prefetched outputs that match the given context.
+
+        Waits for stages still in flight, so a build started mid-prefetch
+        reuses that work instead of duplicating it.
+
+        Returns:
+            Dict of stage -> output path for every reusable stage
+        """
+        keys = stage_keys(context)
+        with self._lock:
+            matches = {s: e["future"] for s, e in self._stages.items() if keys.get(s) == e["key"]}
+
+        ready = {}
+        for stage in STAGES:
+            future = matches.get(stage)
+            if future is None and keys.get(stage) and _on_disk(stage, keys[stage]):
+                future = _done(_on_disk(stage, keys[stage]))
+            if future is None:
+                break
+            try:
+                ready[stage] = future.result(timeout=WAIT_SECONDS)
+            except Exception as e:
+                print(f"[Speculative] {stage} not reusable: {e}")
+                break
+        return ready
+
+    def status(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {stage: {"key": e["key"], "state": _state(e["future"])} for stage, e in self._stages.items()}
+
+
+def _state(future: Future) -> str:
+    if future.running():
+        return "running"
+    if not future.done():
+        return "queued"
+    if future.cancelled() or future.exception():
+        return "failed"
+    return "done"
+
+
+prefetcher = SpeculativePipeline()
@@ -1,23 +1,43 @@
 """Strategy Agent - Creates website blueprint."""
 import json
+import os
+import uuid
 from pathlib import Path
 from llm.gemini_llm import GeminiLLM
+from agents.competitor_index import get_competitor_index
+
+def competitor_facts(context: dict) -> str:
+    """Known competitors from earlier research/scans (local lookup, no LLM call); '' if unavailable."""
+    try:
+        return get_competitor_index().positioning_facts(
+            industry=context.get('industry', ''),
+            features=f"{context.get('services', '')} {context.get('problem', '')} {context.get('unique_feature', '')}",
+        )
+    except Exception as e:
+        print(f"[Strategy] Competitor lookup failed: {e}")
+        return ""
 
 class StrategyAgent:
     def __init__(self, llm: GeminiLLM):
         self.llm = llm
         self.output_dir = Path(__file__).parent.parent / "pipeline_outputs"
         self.output_dir.mkdir(exist_ok=True)
+        self.used_fallback = False
     
     def execute(self, context: dict) -> Path:
         print("[Strategy] Creating blueprint...")
+        self.used_fallback = False
+        
+        competitors = competitor_facts(context)
+        competitor_block = f"\n- Competitors (position against these):\n{competitors}" if competitors else ""
         
+        # The brand name is left to the content stage, so the blueprint can be
+        # prefetched before onboarding reaches the brand question.
         prompt = f"""Create a website blueprint JSON for this business:
-- Brand: {context.get('brand_name', 'My Business')}
 - Problem: {context.get('problem', 'N/A')}
 - Audience: {context.get('target_audience', 'N/A')}
 - Services: {context.get('services', 'N/A')}
-- Unique: {context.get('unique_feature', 'N/A')}
+- Unique: {context.get('unique_feature', 'N/A')}{competitor_block}
 
 Return ONLY valid JSON:
 {{"site_structure": ["Hero", "Features", "How It Works", "Testimonials", "Pricing", "CTA"],
@@ -32,6 +52,7 @@ Return ONLY valid JSON:
                 response = response.split("```")[1].replace("json", "").strip()
             blueprint = json.loads(response)
         except:
+            self.used_fallback = True
             blueprint = {
                 "site_structure": ["Hero", "Features", "How It Works", "Testimonials", "CTA"],
                 "color_palette": {"primary": "#4F46E5", "secondary": "#1F2937"},
@@ -39,7 +60,10 @@ Return ONLY valid JSON:
                 "positioning": context.get('unique_feature', 'Your solution')
             }
         
+        # Written aside and renamed, so readers never see a half-written file
         output = self.output_dir / "website_blueprint.json"
-        output.write_text(json.dumps(blueprint, indent=2))
+        tmp = self.output_dir / f".tmp_{uuid.uuid4().hex}_{output.name}"
+        tmp.write_text(json.dumps(blueprint, indent=2))
+        os.replace(tmp, output)
         print(f"[Strategy] Saved: {output}")
         return output
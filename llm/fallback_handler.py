@@ -2,6 +2,7 @@
 Fallback handler for when AI safety filters are triggered.
 Provides rule-based responses to keep the conversation flowing.
 """
+from llm.intent_classifier import classify, is_question
 
 def get_fallback_response(user_input: str, context: dict = None) -> str:
     """
@@ -14,18 +15,18 @@ def get_fallback_response(user_input: str, context: dict = None) -> str:
     Returns:
         A helpful fallback response
     """
-    user_input_lower = user_input.lower().strip()
+    intent = classify(user_input)
     
     # Greetings
-    if any(greeting in user_input_lower for greeting in ["hi", "hello", "hey", "good morning", "good afternoon"]):
+    if intent.has("greeting"):
         return "Hello! I'm here to help you build your business. Let's get started with some questions about your venture."
     
     # Thanks
-    if any(thanks in user_input_lower for thanks in ["thank", "thanks", "appreciate"]):
+    if intent.has("thanks"):
         return "You're welcome! Let's continue building your business foundation."
     
     # Help requests
-    if any(help_word in user_input_lower for help_word in ["help", "stuck", "confused", "don't understand"]):
+    if intent.has("help"):
         return "I'm here to help! Just answer the questions as best as you can. There are no wrong answers - I want to understand your business vision."
     
     # Short responses
@@ -84,10 +85,10 @@ def extract_answer_from_input(user_input: str, question: str) -> dict:
     Returns:
         Dict with type, reply, and extracted answer
     """
-    user_input_lower = user_input.lower().strip()
+    intent = classify(user_input)
     
     # Check if it's a greeting
-    if any(g in user_input_lower for g in ["hi", "hello", "hey"]) and len(user_input.split()) <= 3:
+    if intent.has("greeting") and intent.word_count <= 3:
         return {
             "type": "CHAT",
             "reply": "Hello! Let's focus on the question at hand.",
@@ -103,7 +104,7 @@ def extract_answer_from_input(user_input: str, question: str) -> dict:
         }
     
     # Check if it's a question back
-    if "?" in user_input:
+    if is_question(user_input):
         return {
             "type": "CHAT",
             "reply": "That's a good question! But first, let me understand your answer to my question.",
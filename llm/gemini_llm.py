@@ -1,42 +1,85 @@
 """
 Gemini LLM - Simple wrapper for Google's Gemini API.
+
+The google.generativeai SDK is heavy to import, so it is only located at
+import time and actually loaded on the first call.
 """
 import os
+import threading
+import importlib.util
+from typing import Optional
+
+from llm.scheduler import scheduler, SchedulerTimeout, PIPELINE
+
+
+def _sdk_installed(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
 
-try:
-    import google.generativeai as genai
-    HAS_GENAI = True
-except ImportError:
-    genai = None
-    HAS_GENAI = False
+
+genai = None
+HAS_GENAI = _sdk_installed("google.generativeai")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
 DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
+_sdk_lock = threading.Lock()
+
+
+def _load_genai():
+    """Import and configure the SDK once per process."""
+    global genai
+    with _sdk_lock:
+        if genai is None:
+            import google.generativeai as sdk
+            sdk.configure(api_key=GEMINI_API_KEY)
+            genai = sdk
+    return genai
+
 
 class GeminiLLM:
-    def __init__(self, model_name=None):
+    def __init__(self, model_name=None, priority: int = PIPELINE, tenant: str = "default",
+                 cancel: Optional[threading.Event] = None):
         self.model_name = model_name or DEFAULT_MODEL
-        self.ready = False
+        # Scheduler class and fairness key used when a call doesn't pass its own
+        self.priority = priority
+        self.tenant = tenant
+        # Once set, calls still queued for a slot are dropped (speculative work)
+        self.cancel = cancel
+        self.ready = bool(HAS_GENAI and GEMINI_API_KEY)
         self._model = None
         
-        if HAS_GENAI and GEMINI_API_KEY:
+        if not self.ready:
+            print("[GeminiLLM] Not configured (missing SDK or API key)")
+
+    def _get_model(self):
+        """Build the model on first use."""
+        if self._model is None and self.ready:
             try:
-                genai.configure(api_key=GEMINI_API_KEY)
-                self._model = genai.GenerativeModel(self.model_name)
-                self.ready = True
+                self._model = _load_genai().GenerativeModel(self.model_name)
                 print(f"[GeminiLLM] Initialized: {self.model_name}")
             except Exception as e:
                 print(f"[GeminiLLM] Init error: {e}")
                 self.ready = False
-        else:
-            print("[GeminiLLM] Not configured (missing SDK or API key)")
+        return self._model
 
-    def call(self, prompt: str, max_tokens: int = 1024, temperature: float = 0.7) -> str:
-        """Call the LLM with a prompt."""
-        if not self.ready or not self._model:
+    def call(self, prompt: str, max_tokens: int = 1024, temperature: float = 0.7,
+             priority: int = None, tenant: str = None) -> str:
+        """Call the LLM with a prompt (queued through the LLM scheduler)."""
+        if not self.ready or not self._get_model():
             return "⚠️ AI not configured. Please set GEMINI_API_KEY."
         
+        try:
+            with scheduler.slot(self.priority if priority is None else priority, tenant or self.tenant,
+                                cancel=self.cancel):
+                return self._generate(prompt, max_tokens, temperature)
+        except SchedulerTimeout as e:
+            print(f"[GeminiLLM] Dropped: {e}")
+            return "⚠️ AI is busy right now. Please try again in a moment."
+
+    def _generate(self, prompt: str, max_tokens: int, temperature: float) -> str:
         try:
             # Safety settings to reduce blocking
             safety_settings = [
@@ -78,15 +121,23 @@ class GeminiLLM:
             return f"⚠️ AI error: {str(e)}"
 
     def stream(self, prompt: str):
-        """Stream response (yields chunks)."""
-        if not self.ready:
+        """
+        Stream response (yields chunks).
+        
+        The scheduler slot only covers starting the upstream request, so a
+        consumer that stops reading mid-stream can't keep holding it.
+        """
+        if not self.ready or not self._get_model():
             yield "⚠️ AI not configured"
             return
         
         try:
-            response = self._model.generate_content(prompt, stream=True)
+            with scheduler.slot(self.priority, self.tenant, cancel=self.cancel):
+                response = self._model.generate_content(prompt, stream=True)
             for chunk in response:
                 if hasattr(chunk, "text") and chunk.text:
                     yield chunk.text
+        except SchedulerTimeout:
+            yield "⚠️ AI is busy right now. Please try again in a moment."
         except Exception as e:
             yield f"⚠️ Error: {e}"
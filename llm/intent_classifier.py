@@ -0,0 +1,138 @@
+"""
+Intent Classifier - Precompiled keyword automaton for chat messages.
+Classifies a message in a single regex pass so greetings, help, summary and
+build requests can be answered locally without calling the LLM.
+"""
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+# Verbs of an explicit build request; also build topics, so the two sets can't drift
+_BUILD_VERBS = ("build", "create", "generate", "make")
+
+# Intent -> trigger phrases. Phrases match on word boundaries only,
+# so "hi" no longer fires on "this" or "thanks". These detect what a message
+# is about (Classification.has); nouns like "website" are fine here.
+INTENT_PHRASES: Dict[str, List[str]] = {
+    "reset": ["reset", "restart", "start over", "start again"],
+    "greeting": ["hi", "hii", "hiii", "hello", "hey", "heya", "hola", "yo",
+                 "good morning", "good afternoon", "good evening"],
+    "thanks": ["thank you", "thanks", "thank", "thx", "ty", "appreciate it", "appreciate"],
+    "help": ["help", "stuck", "confused", "don't understand", "dont understand",
+             "not sure", "what do you mean", "what should i say"],
+    "summary": ["summary", "summarize", "recap", "my answers", "answers", "info"],
+    "build": [*_BUILD_VERBS, "website", "site"],
+}
+
+# Explicit command phrases. A message is a bare command only if it is made of
+# these plus filler, so onboarding answers such as "I need a website" or
+# "not sure" are saved instead of being answered as commands.
+_BUILD_OBJECTS = ("site", "website", "landing page", "page", "it")
+COMMAND_PHRASES: Dict[str, List[str]] = {
+    "reset": ["reset", "restart", "start over", "start again"],
+    "greeting": INTENT_PHRASES["greeting"],
+    "thanks": INTENT_PHRASES["thanks"],
+    "help": ["help", "help me", "i'm stuck", "im stuck", "i am stuck", "don't understand", "dont understand",
+             "what do you mean", "what should i say"],
+    "summary": ["summary", "summarize", "recap", "show my answers", "show me my answers"],
+    "build": [f"{verb} {det}{obj}" for verb in _BUILD_VERBS for obj in _BUILD_OBJECTS
+              for det in ("", "a ", "a new ", "my ", "the ", "our ")],
+}
+
+# Words that may surround a command without turning it into a real answer
+# ("hey there", "show me my summary", "please build the website").
+FILLER_WORDS = frozenset({
+    "a", "again", "all", "am", "and", "any", "are", "can", "could", "do", "for", "give",
+    "go", "i", "is", "it", "let's", "lets", "lot", "me", "much", "my", "need", "now", "ok",
+    "okay", "please", "pls", "see", "show", "so", "some", "the", "there", "to",
+    "very", "want", "what", "would", "you", "your",
+})
+
+# Order used to pick a single primary intent when several match.
+INTENT_PRIORITY = ("reset", "help", "summary", "build", "thanks", "greeting")
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# A message that asks something back: a question word followed by a verb, or
+# a verb followed by a subject. "What makes us unique is..." is an answer.
+_QUESTION_START_RE = re.compile(
+    r"^(?:(?:what|why|how|who|where|when|which)\s+(?:do|does|did|is|are|was|were|can|could|should|would|will)"
+    r"|(?:can|could|should|would|will|do|does|is|are)\s+(?:you|i|we|it|this|that|there))\b")
+
+
+def _compile(phrases: Dict[str, List[str]]) -> "re.Pattern":
+    groups = []
+    for intent, words in phrases.items():
+        # Longest first so "thank you" wins over "thank"
+        alts = sorted({w.lower() for w in words}, key=len, reverse=True)
+        body = "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in alts)
+        groups.append(f"(?P<{intent}>{body})")
+    return re.compile(r"(?<![\w'])(?:" + "|".join(groups) + r")(?![\w'])")
+
+
+_INTENT_RE = _compile(INTENT_PHRASES)
+_COMMAND_RE = _compile(COMMAND_PHRASES)
+
+
+class Classification(NamedTuple):
+    """Result of classifying one message."""
+    intents: Tuple[str, ...]
+    primary: str
+    is_command: bool
+    word_count: int
+
+    def has(self, intent: str) -> bool:
+        return intent in self.intents
+
+
+def classify(text: str) -> Classification:
+    """
+    Classify a message in one pass over the compiled automaton.
+
+    Args:
+        text: The raw user message
+
+    Returns:
+        Classification with every matched intent, the primary intent
+        ("" when nothing matched), and whether the message is a bare
+        command (only command phrases and filler words).
+    """
+    lowered = (text or "").lower()
+    found = []
+    for match in _INTENT_RE.finditer(lowered):
+        if match.lastgroup not in found:
+            found.append(match.lastgroup)
+
+    commands = []
+    pieces = []
+    pos = 0
+    for match in _COMMAND_RE.finditer(lowered):
+        if match.lastgroup not in commands:
+            commands.append(match.lastgroup)
+        pieces.append(lowered[pos:match.start()])
+        pos = match.end()
+    pieces.append(lowered[pos:])
+
+    words = _WORD_RE.findall(lowered)
+    remaining = [w for w in _WORD_RE.findall(" ".join(pieces)) if w not in FILLER_WORDS]
+    is_command = bool(commands) and not remaining
+    ranked = commands if is_command else found
+    primary = next((i for i in INTENT_PRIORITY if i in ranked), "")
+
+    return Classification(
+        intents=tuple(found),
+        primary=primary,
+        is_command=is_command,
+        word_count=len(words),
+    )
+
+
+def command_intent(text: str) -> str:
+    """Return the primary intent if the message is a bare command, else ""."""
+    result = classify(text)
+    return result.primary if result.is_command else ""
+
+
+def is_question(text: str) -> bool:
+    """True if the message is interrogative, not merely an answer containing "?"."""
+    stripped = (text or "").strip().lower()
+    return stripped.endswith("?") or bool(_QUESTION_START_RE.match(stripped))
@@ -0,0 +1,17 @@
+"""
+JSON Reply - Parse JSON out of an LLM reply.
+
+Models often wrap JSON in markdown fences even when told not to; the fence
+is stripped before parsing.
+"""
+import json
+
+
+def parse_json(response: str):
+    """Parse an LLM JSON reply, stripping markdown fences. Raises ValueError if it isn't JSON."""
+    response = (response or "").strip()
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0].strip()
+    return json.loads(response)
@@ -0,0 +1,189 @@
+"""
+LLM Scheduler - Priority-aware admission in front of GeminiLLM.
+
+Every Gemini request takes a slot from one process-wide scheduler:
+- Priority classes: interactive > pipeline > background (speculative, research)
+- Slots are reserved for interactive work, so batch jobs can never fill the quota
+- Within a class, tenants are served round-robin so one big batch can't starve others
+- Queued work close to its deadline jumps ahead (earliest deadline first), and
+  work whose deadline passes while still queued is dropped instead of sent late
+
+GEMINI_MAX_CONCURRENCY is the quota for the whole server. Each uvicorn worker
+gets its share (WEB_CONCURRENCY, exported by `main.py prod`), the same way the
+route admission limits in server.py are split.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+INTERACTIVE = 0
+PIPELINE = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PIPELINE: "pipeline", BACKGROUND: "background"}
+
+# Max time a request may wait in the queue before it is dropped
+DEFAULT_QUEUE_TIMEOUTS = {INTERACTIVE: 30.0, PIPELINE: 300.0, BACKGROUND: None}
+
+WORKER_PROCESSES = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+def per_worker(total: int, workers: int = WORKER_PROCESSES) -> int:
+    """One worker's share of a server-wide slot count, never below one."""
+    return max(1, math.ceil(total / max(1, workers)))
+
+
+MAX_CONCURRENCY = per_worker(int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")))
+RESERVED_INTERACTIVE = int(os.getenv("GEMINI_RESERVED_INTERACTIVE", "1"))
+URGENT_SECONDS = 2.0
+CANCEL_POLL_SECONDS = 0.5
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a request's deadline passes while it is still queued."""
+
+
+class _Ticket:
+    __slots__ = ("priority", "tenant", "deadline", "granted")
+
+    def __init__(self, priority: int, tenant: str, deadline: Optional[float]):
+        self.priority = priority
+        self.tenant = tenant
+        self.deadline = deadline
+        self.granted = False
+
+
+class LLMScheduler:
+    """Grants LLM slots by priority class, tenant fairness and deadline."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, reserved_interactive: int = RESERVED_INTERACTIVE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_concurrency - 1)
+        self._cond = threading.Condition()
+        self._queues: Dict[int, Dict[str, deque]] = {p: {} for p in PRIORITY_NAMES}
+        self._rotation: Dict[int, deque] = {p: deque() for p in PRIORITY_NAMES}
+        self._in_flight = 0
+        self._dropped = 0
+
+    def _limit(self, priority: int) -> int:
+        if priority == INTERACTIVE:
+            return self.max_concurrency
+        return self.max_concurrency - self.reserved_interactive
+
+    def _enqueue(self, ticket: _Ticket):
+        tenants = self._queues[ticket.priority]
+        if ticket.tenant not in tenants:
+            tenants[ticket.tenant] = deque()
+            self._rotation[ticket.priority].append(ticket.tenant)
+        tenants[ticket.tenant].append(ticket)
+
+    def _remove(self, ticket: _Ticket):
+        tenants = self._queues[ticket.priority]
+        queue = tenants.get(ticket.tenant)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del tenants[ticket.tenant]
+                self._rotation[ticket.priority].remove(ticket.tenant)
+
+    def _pop(self, priority: int) -> Optional[_Ticket]:
+        tenants = self._queues[priority]
+        if not tenants:
+            return None
+
+        # Earliest deadline first for anything about to expire
+        now = time.monotonic()
+        urgent = [t for q in tenants.values() for t in q
+                  if t.deadline is not None and t.deadline - now < URGENT_SECONDS]
+        if urgent:
+            ticket = min(urgent, key=lambda t: t.deadline)
+        else:
+            rotation = self._rotation[priority]
+            ticket = tenants[rotation[0]][0]
+            rotation.rotate(-1)
+        self._remove(ticket)
+        return ticket
+
+    def _dispatch(self):
+        granted = False
+        for priority in sorted(PRIORITY_NAMES):
+            while self._in_flight < self._limit(priority):
+                ticket = self._pop(priority)
+                if ticket is None:
+                    break
+                ticket.granted = True
+                self._in_flight += 1
+                granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, priority: int = PIPELINE, tenant: str = "default", timeout: Optional[float] = -1,
+                cancel: Optional[threading.Event] = None):
+        """
+        Block until a slot is granted.
+
+        Args:
+            priority: INTERACTIVE, PIPELINE or BACKGROUND
+            tenant: Fairness key (brand, account or user)
+            timeout: Max seconds to wait in the queue; -1 uses the class
+                default, None waits forever
+            cancel: Event that withdraws the request while it is still queued
+
+        Raises:
+            SchedulerTimeout: if the deadline passes (or cancel is set) before
+                a slot frees up
+        """
+        if timeout == -1:
+            timeout = DEFAULT_QUEUE_TIMEOUTS.get(priority)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        ticket = _Ticket(priority, tenant or "default", deadline)
+
+        with self._cond:
+            self._enqueue(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    self._dropped += 1
+                    raise SchedulerTimeout(
+                        f"{PRIORITY_NAMES[priority]} request for {ticket.tenant} waited {timeout:.1f}s"
+                    )
+                if cancel is not None:
+                    if cancel.is_set():
+                        self._remove(ticket)
+                        raise SchedulerTimeout(f"{PRIORITY_NAMES[priority]} request for {ticket.tenant} cancelled")
+                    remaining = CANCEL_POLL_SECONDS if remaining is None else min(remaining, CANCEL_POLL_SECONDS)
+                self._cond.wait(remaining)
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: int = PIPELINE, tenant: str = "default", timeout: Optional[float] = -1,
+             cancel: Optional[threading.Event] = None):
+        self.acquire(priority, tenant, timeout, cancel)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "dropped": self._dropped,
+                "queued": {
+                    PRIORITY_NAMES[p]: sum(len(q) for q in tenants.values())
+                    for p, tenants in self._queues.items()
+                },
+            }
+
+
+scheduler = LLMScheduler()
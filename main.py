@@ -1,4 +1,5 @@
 # main.py
+import os
 import sys
 import uvicorn
 
@@ -6,12 +7,29 @@ def start_server():
     print("Starting AI Company Builder API Server...")
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
 
+def start_production(workers: int = None):
+    """
+    Run N worker processes (default WEB_CONCURRENCY or one per core).
+    
+    Cross-request state lives in memory/state.db and the other SQLite stores,
+    so any worker can serve any request.
+    """
+    workers = workers or int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+    # Workers inherit the environment; server.py divides admission limits by it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    print(f"Starting AI Company Builder API Server with {workers} workers...")
+    uvicorn.run("server:app", host=os.getenv("HOST", "0.0.0.0"), port=int(os.getenv("PORT", "8000")),
+                workers=workers, proxy_headers=True)
+
 def main():
     print("AI Setup Completed\n")
     if len(sys.argv) > 1 and sys.argv[1] in ("server", "run"):
         start_server()
+    elif len(sys.argv) > 1 and sys.argv[1] in ("prod", "production"):
+        start_production(int(sys.argv[2]) if len(sys.argv) > 2 else None)
     else:
-        print("Usage: python main.py server")
+        print("Usage: python main.py server            # dev, auto-reload\n"
+              "       python main.py prod [workers]    # production, multi-process")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,177 @@
+"""
+Memory Manager - Persists chatbot onboarding state and builder context.
+
+Chatbot progress and the structured business context read by the pipeline
+agents live in the shared state store, so every server worker sees the same
+onboarding. memory/user_memory.json and memory.json at the repo root are
+imported once as the starting values.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from memory.shared_state import get_shared_state
+
+BASE_DIR = Path(__file__).parent.parent
+CHATBOT_FILE = Path(__file__).parent / "user_memory.json"
+BUILDER_FILE = BASE_DIR / "memory.json"
+
+# Builder field each onboarding question fills (same order as FRIENDLY_QUESTIONS)
+QUESTION_FIELDS = [
+    "problem",
+    "target_audience",
+    "unique_feature",
+    "services",
+    "pricing_model",
+    "tools_needed",
+    "marketing_channels",
+    "trust_factors",
+    "brand_name",
+    "launch_goal",
+]
+
+FIELD_LABELS = {
+    "brand_name": "Brand",
+    "industry": "Industry",
+    "problem": "Problem",
+    "target_audience": "Audience",
+    "unique_feature": "Unique Value",
+    "services": "Services",
+    "pricing_model": "Pricing",
+    "tools_needed": "Tools",
+    "marketing_channels": "Marketing",
+    "trust_factors": "Trust",
+    "launch_goal": "Launch Goal",
+}
+
+DEFAULT_CHATBOT = {"current": 0, "answers": {}, "complete": False}
+DEFAULT_BUILDER = {
+    "brand_name": "", "industry": "", "problem": "", "target_audience": "", "keywords": "",
+    "unique_feature": "", "services": "", "primary_cta": "Get Started", "trust_factors": "",
+    "pricing_model": "", "launch_goal": "", "onboarding_complete": False,
+}
+
+NAMESPACE = "memory"
+
+
+def _read(path: Path, default: Dict) -> Dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return {**default, **data} if isinstance(data, dict) else dict(default)
+    except (OSError, ValueError):
+        return json.loads(json.dumps(default))
+
+
+def _load(txn, key: str, legacy: Path, default: Dict) -> Dict:
+    data = txn.get(NAMESPACE, key)
+    if data is None:
+        data = _read(legacy, default)  # First run: start from the JSON file
+        txn.set(NAMESPACE, key, data)
+    return {**json.loads(json.dumps(default)), **data}
+
+
+def _get(key: str, legacy: Path, default: Dict) -> Dict:
+    """Plain read; the write lock is only taken once, to import the legacy file."""
+    data = get_shared_state().get(NAMESPACE, key)
+    if data is None:
+        with get_shared_state().transaction() as txn:
+            return _load(txn, key, legacy, default)
+    return {**json.loads(json.dumps(default)), **data}
+
+
+def load_chatbot() -> Dict:
+    return _get("chatbot", CHATBOT_FILE, DEFAULT_CHATBOT)
+
+
+def save_chatbot(data: Dict):
+    get_shared_state().set(NAMESPACE, "chatbot", data)
+
+
+def load_builder() -> Dict:
+    return _get("builder", BUILDER_FILE, DEFAULT_BUILDER)
+
+
+def save_builder(data: Dict):
+    get_shared_state().set(NAMESPACE, "builder", data)
+
+
+def update_builder(fields: Dict, only_if: Optional[Dict] = None) -> Dict:
+    """
+    Merge fields into the builder context.
+
+    Args:
+        fields: Field values to write
+        only_if: Optional {field: expected_value}; the update is skipped
+            unless every listed field still holds its expected value
+
+    Returns:
+        The updated builder context
+    """
+    with get_shared_state().transaction() as txn:
+        builder = _load(txn, "builder", BUILDER_FILE, DEFAULT_BUILDER)
+        if only_if and any(builder.get(k) != v for k, v in only_if.items()):
+            return builder
+        builder.update(fields)
+        txn.set(NAMESPACE, "builder", builder)
+        return builder
+
+
+def reset():
+    with get_shared_state().transaction() as txn:
+        txn.set(NAMESPACE, "chatbot", json.loads(json.dumps(DEFAULT_CHATBOT)))
+        txn.set(NAMESPACE, "builder", dict(DEFAULT_BUILDER))
+
+
+def is_complete() -> bool:
+    return bool(load_chatbot().get("complete"))
+
+
+def get_question() -> Tuple[int, Optional[str]]:
+    """Return (index, builder field) of the current onboarding question."""
+    idx = load_chatbot().get("current", 0)
+    field = QUESTION_FIELDS[idx] if idx < len(QUESTION_FIELDS) else None
+    return idx, field
+
+
+def save_answer(answer: str, extracted: Optional[Dict] = None) -> int:
+    """
+    Store the answer to the current question and advance.
+
+    Args:
+        answer: Raw user answer
+        extracted: Structured fields pulled from the answer; defaults to
+            {question field: answer}
+
+    Returns:
+        Index of the question that was answered
+    """
+    with get_shared_state().transaction() as txn:
+        chatbot = _load(txn, "chatbot", CHATBOT_FILE, DEFAULT_CHATBOT)
+        idx = chatbot.get("current", 0)
+        if idx >= len(QUESTION_FIELDS):
+            return idx
+
+        field = QUESTION_FIELDS[idx]
+        chatbot["answers"][field] = answer
+        chatbot["current"] = idx + 1
+        chatbot["complete"] = chatbot["current"] >= len(QUESTION_FIELDS)
+        txn.set(NAMESPACE, "chatbot", chatbot)
+
+        fields = dict(extracted or {field: answer})
+        fields["onboarding_complete"] = chatbot["complete"]
+        update_builder(fields)
+        return idx
+
+
+def get_answers() -> Dict:
+    """Structured answers as read by the pipeline agents."""
+    builder = load_builder()
+    return {k: v for k, v in builder.items() if k in FIELD_LABELS and v}
+
+
+def get_summary() -> str:
+    answers = get_answers()
+    if not answers:
+        return "📋 No answers yet."
+    lines = [f"• {label}: {answers[key]}" for key, label in FIELD_LABELS.items() if key in answers]
+    return "📋 Your Business Summary:\n" + "\n".join(lines)
@@ -0,0 +1,133 @@
+"""
+Shared State - Cross-process key/value store for request state.
+
+Everything a later request may need (onboarding progress, builder context,
+pipeline job status, image jobs, queued extractions) lives here instead of in
+module globals. Any uvicorn worker can then serve any request. Values are JSON
+in a WAL-mode SQLite file, grouped by namespace, with an optional TTL.
+transaction() takes SQLite's write lock, so read-modify-write sequences are
+atomic across processes, not just threads.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+DB_PATH = Path(os.getenv("SHARED_STATE_DB", str(Path(__file__).parent / "state.db")))
+
+
+class _Txn:
+    """Reads and writes inside one transaction()."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM state WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False),
+             time.time() + ttl if ttl else None, time.time()))
+
+    def delete(self, namespace: str, key: str):
+        self._conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+
+class SharedState:
+    """Namespaced JSON values in SQLite, safe across threads and processes."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " expires_at REAL, updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))")
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Atomic read-modify-write across every worker process.
+
+        Nested calls on the same thread join the outer transaction.
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield _Txn(self._conn)
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield _Txn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return _Txn(self._conn).get(namespace, key, default)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            _Txn(self._conn).set(namespace, key, value, ttl)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            _Txn(self._conn).delete(namespace, key)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None,
+               ttl: Optional[float] = None) -> Any:
+        """Store fn(current value) atomically and return it."""
+        with self.transaction() as txn:
+            value = fn(txn.get(namespace, key, default))
+            txn.set(namespace, key, value, ttl)
+            return value
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, time.time())).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM state WHERE expires_at < ?", (time.time(),)).rowcount
+
+
+_state: Optional[SharedState] = None
+_state_pid: Optional[int] = None
+_state_lock = threading.Lock()
+
+
+def get_shared_state() -> SharedState:
+    """Per-process handle on the shared store (reopened after a fork)."""
+    global _state, _state_pid
+    with _state_lock:
+        if _state is None or _state_pid != os.getpid():
+            _state = SharedState()
+            _state_pid = os.getpid()
+        return _state
@@ -1,22 +1,142 @@
 """Growth Hub Server - Main FastAPI application."""
 import os
+import re
+import json
+import math
+import time
+import asyncio
+import mimetypes
+from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import uvicorn
+from starlette.concurrency import run_in_threadpool
 
 from agents.router_agent_handler import process_message_with_memory, process_message_stream, router_agent
 from agents.builder_agent_api import router as builder_router
 from agents.router_agent_api import router as router_api
+from tools.page_cache import page_cache
+from agents.image_processing import is_servable_image
 
 app = FastAPI(title="Growth Hub AI")
 app.include_router(builder_router)
 app.include_router(router_api)
 
+WORKER_PROCESSES = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+def _limit_override(name: str, limit: int, max_queue: int):
+    # e.g. ADMISSION_CHAT=8/16 -> 8 concurrent, 16 queued
+    value = os.getenv(f"ADMISSION_{name.upper()}", "")
+    if "/" in value:
+        limit, max_queue = (int(v) for v in value.split("/", 1))
+    return limit, max_queue
+
+class RouteLimit:
+    """
+    Admission control for one LLM-heavy route.
+    
+    At most `limit` requests run at once and `max_queue` more may wait (each
+    up to `queue_timeout` seconds). Anything beyond that is shed straight away
+    with 429. Retry-After is estimated from the queue ahead and a moving
+    average of how long admitted requests take.
+    
+    The counters live in one worker process, so the configured limits are
+    server-wide totals split evenly across the WEB_CONCURRENCY workers
+    (`main.py prod` exports it for the workers it starts).
+    """
+    
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, typical_seconds: float):
+        limit, max_queue = _limit_override(name, limit, max_queue)
+        self.name = name
+        self.limit = max(1, math.ceil(limit / WORKER_PROCESSES))
+        self.max_queue = max(0, math.ceil(max_queue / WORKER_PROCESSES))
+        self.queue_timeout = queue_timeout
+        self.avg_seconds = typical_seconds
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+        self._slots = asyncio.Semaphore(self.limit)
+    
+    def retry_after(self) -> int:
+        rounds = (self.active + self.waiting) / self.limit
+        return max(1, math.ceil(rounds * self.avg_seconds))
+    
+    async def acquire(self) -> bool:
+        if self.active + self.waiting >= self.limit + self.max_queue:
+            self.shed += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+    
+    def release(self, elapsed: float):
+        self.active -= 1
+        self._slots.release()
+        self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * elapsed
+    
+    def stats(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting, "limit": self.limit,
+                "max_queue": self.max_queue, "shed": self.shed, "avg_seconds": round(self.avg_seconds, 2)}
+
+# POST path -> (name, concurrent, queued, queue timeout s, typical duration s), server-wide.
+# /api/builder/generate isn't listed: it only starts a thread, and the pipeline
+# itself is already limited to one build at a time by its shared job claim.
+ROUTE_LIMITS = {
+    path: RouteLimit(*args) for path, args in {
+        "/chat": ("chat", 8, 16, 10.0, 3.0),
+        "/marketing/generate-post": ("generate_post", 4, 8, 20.0, 8.0),
+        "/marketing/post-now": ("post_now", 2, 4, 30.0, 15.0),
+        "/api/builder/regenerate": ("builder_regenerate", 2, 4, 30.0, 20.0),
+        # One calendar streams up to CALENDAR_MAX_POSTS posts on several LLM threads
+        "/marketing/generate-calendar": ("generate_calendar", 1, 2, 10.0, 90.0),
+    }.items()
+}
+
+# Registered before CORS, so CORS stays outermost and 429s carry its headers
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    limit = ROUTE_LIMITS.get(request.url.path) if request.method == "POST" else None
+    if limit is None:
+        return await call_next(request)
+    if not await limit.acquire():
+        retry_after = limit.retry_after()
+        print(f"[Admission] Shed {request.url.path} ({limit.active} active, {limit.waiting} queued)")
+        return JSONResponse({"status": "error", "message": f"Server busy, retry in {retry_after}s"},
+                            status_code=429, headers={"Retry-After": str(retry_after)})
+    started = time.monotonic()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        limit.release(time.monotonic() - started)
+        raise
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        limit.release(time.monotonic() - started)
+        return response
+
+    # call_next returns once headers are ready; a streamed route (the post
+    # calendar) is still working, so the slot is held until the body is sent
+    async def body_then_release():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            limit.release(time.monotonic() - started)
+
+    response.body_iterator = body_then_release()
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,30 +149,49 @@ static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 os.makedirs(static_dir, exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
+@app.on_event("startup")
+def start_background_workers():
+    # Expired image-job entries are only skipped on read; clear them out
+    from memory.shared_state import get_shared_state
+    purged = get_shared_state().purge_expired()
+    if purged:
+        print(f"[Startup] Purged {purged} expired shared-state entries")
+    # Drains scheduled posts; set OUTBOX_WORKER=0 to run it in a separate process instead
+    if os.getenv("OUTBOX_WORKER", "1") != "0":
+        from agents.post_outbox import start_worker
+        start_worker()
+
+BASE_DIR = Path(__file__).parent
+
+async def _page(request: Request, name: str):
+    # In-memory, pre-compressed, revalidated with ETag/Last-Modified. A reload
+    # reads and recompresses the file, so it runs off the event loop.
+    response = await run_in_threadpool(page_cache.response, request, BASE_DIR / name)
+    return response or JSONResponse({"error": "Not found"}, 404)
+
 @app.get("/")
-def serve_index():
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
-    return FileResponse(path) if os.path.exists(path) else JSONResponse({"error": "Not found"}, 404)
+async def serve_index(request: Request):
+    return await _page(request, "index.html")
 
 @app.get("/chatbot.html")
-def serve_chatbot():
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot.html")
-    return FileResponse(path) if os.path.exists(path) else JSONResponse({"error": "Not found"}, 404)
+async def serve_chatbot(request: Request):
+    return await _page(request, "chatbot.html")
 
 @app.get("/builder")
-def serve_builder():
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "builder.html")
-    return FileResponse(path) if os.path.exists(path) else JSONResponse({"error": "Not found"}, 404)
+async def serve_builder(request: Request):
+    return await _page(request, "builder.html")
 
 @app.get("/health")
 async def health():
+    from llm.scheduler import scheduler
     ready = getattr(router_agent, "llm", None) and getattr(router_agent.llm, "ready", False)
-    return {"status": "online", "llm_ready": ready}
+    return {"status": "online", "llm_ready": ready, "llm_queue": scheduler.stats(),
+            "admission": {limit.name: limit.stats() for limit in ROUTE_LIMITS.values()}}
 
 @app.post("/chat")
 async def chat(req: Request):
     data = await req.json()
-    reply = process_message_with_memory(data.get("message", ""))
+    reply = await run_in_threadpool(process_message_with_memory, data.get("message", ""))
     return {"response": reply}
 
 @app.post("/chat-stream")
@@ -68,11 +207,14 @@ async def generate_post(req: Request):
         from agents.marketing_agent import MarketingAgent
         agent = MarketingAgent()
         
-        post = agent.generate_post(
+        # Caption comes back first; the image is delivered via /marketing/image-job
+        post = await run_in_threadpool(
+            agent.generate_post,
             topic=data.get('topic', 'Business Growth'),
             audience=data.get('audience', 'Entrepreneurs'),
             tone=data.get('tone', 'Professional'),
-            brand_name=data.get('brand', 'GrowthHub')
+            brand_name=data.get('brand', 'GrowthHub'),
+            wait_for_image=data.get('wait_for_image', False)
         )
         
         return {
@@ -84,6 +226,33 @@ async def generate_post(req: Request):
         print(f"Marketing Error: {e}")
         return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
+@app.post("/marketing/generate-calendar")
+async def generate_calendar(req: Request):
+    """
+    Generate a batch of posts from a topic list and/or date range.
+    
+    Body: {topics?, start_date?, end_date?, count?, audience, tone, brand}
+    Streams newline-delimited JSON events (plan, post..., done).
+    """
+    from agents.marketing_agent import MarketingAgent, calendar_slots
+    data = await req.json()
+    try:
+        slots = calendar_slots(data.get('topics'), data.get('start_date'),
+                               data.get('end_date'), data.get('count'))
+    except (TypeError, ValueError) as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    
+    agent = MarketingAgent()
+    events = agent.generate_calendar(
+        slots,
+        audience=data.get('audience', 'Entrepreneurs'),
+        tone=data.get('tone', 'Professional'),
+        brand_name=data.get('brand', 'GrowthHub')
+    )
+    # Sync generator: Starlette iterates it in the threadpool
+    return StreamingResponse((json.dumps(e, ensure_ascii=False) + "\n" for e in events),
+                             media_type="application/x-ndjson")
+
 @app.post("/marketing/post-now")
 async def post_now(req: Request):
     """Post immediately to Instagram using FREE Graph API."""
@@ -94,7 +263,8 @@ async def post_now(req: Request):
         # Get post data
         if "post" not in data:
             from agents.marketing_agent import generate_instagram_post
-            post = generate_instagram_post(
+            post = await run_in_threadpool(
+                generate_instagram_post,
                 topic=data.get('topic', 'Business'),
                 audience=data.get('audience', 'Entrepreneurs'),
                 tone=data.get('tone', 'Professional'),
@@ -104,13 +274,110 @@ async def post_now(req: Request):
             post = data["post"]
         
         # Post to Instagram
-        result = post_to_instagram_now(post, data.get('instagram_account'))
+        result = await run_in_threadpool(post_to_instagram_now, post, data.get('instagram_account'))
         
         return {"status": "success", "result": result}
     except Exception as e:
         print(f"Post Error: {e}")
         return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
+@app.post("/marketing/schedule")
+async def schedule_post(req: Request):
+    """
+    Queue a post in the durable outbox (sent by the background worker).
+    
+    Body: {post | post_id, channel ("instagram" | "webhook"), account,
+           run_at (ISO) | preferred_posting_time + timezone, idempotency_key?}
+    The Idempotency-Key header works too; re-sending a key returns the original entry.
+    """
+    from agents.post_outbox import get_outbox, parse_run_at
+    from agents.post_store import get_post_store
+    data = await req.json()
+    post = data.get("post") or (get_post_store().get(data["post_id"]) if data.get("post_id") else None)
+    if not post:
+        return JSONResponse({"status": "error", "message": "Provide a post or a known post_id"}, status_code=400)
+    
+    channel = data.get("channel", "instagram")
+    account = data.get("account") or data.get("instagram_account") or os.getenv("INSTAGRAM_USERNAME") or "default"
+    try:
+        run_at = parse_run_at(data.get("run_at"), data.get("preferred_posting_time"), data.get("timezone"))
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    
+    if channel == "webhook":
+        payload = {
+            "post_id": post.get("post_id"),
+            "content": post.get("caption", ""),
+            "hashtags": post.get("hashtags"),
+            "media_urls": [str(req.base_url).rstrip("/") + post["image_url"]] if post.get("image_url") else [],
+            "preferred_posting_time": data.get("preferred_posting_time") or "now",
+            "timezone": data.get("timezone") or "UTC",
+            "brand_name": post.get("brand"),
+        }
+    else:
+        payload = {**post, "instagram_account": account}
+    
+    try:
+        entry = get_outbox().enqueue(channel, payload, run_at=run_at, account=account,
+                                     idempotency_key=data.get("idempotency_key") or req.headers.get("idempotency-key"))
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    if post.get("post_id") and not entry["duplicate"]:
+        get_post_store().update(post["post_id"], {"status": "scheduled", "scheduled_for": entry["run_at"]})
+    return {"status": "success", "result": entry}
+
+@app.get("/marketing/outbox")
+async def list_outbox(status: str = None, limit: int = 50):
+    """Scheduled sends in due order, plus counts per status."""
+    from agents.post_outbox import get_outbox
+    outbox = get_outbox()
+    return {"items": outbox.list(status, limit), "counts": outbox.counts()}
+
+@app.get("/marketing/outbox/{entry_id}")
+async def get_outbox_entry(entry_id: str):
+    from agents.post_outbox import get_outbox
+    entry = get_outbox().get(entry_id)
+    if not entry:
+        return JSONResponse({"error": "Unknown outbox entry"}, status_code=404)
+    return entry
+
+@app.post("/marketing/outbox/{entry_id}/cancel")
+async def cancel_outbox_entry(entry_id: str):
+    """Cancel a send that hasn't started yet."""
+    from agents.post_outbox import get_outbox
+    if not get_outbox().cancel(entry_id):
+        return JSONResponse({"error": "Entry not found or already sent"}, status_code=409)
+    return {"status": "cancelled"}
+
+@app.get("/marketing/image-job/{job_id}")
+async def image_job_status(job_id: str):
+    """Poll a post's image generation (status, draft_url, image_url)."""
+    from agents.marketing_agent import get_image_job
+    job = get_image_job(job_id)
+    if not job:
+        return JSONResponse({"error": "Unknown image job"}, status_code=404)
+    return job
+
+@app.get("/marketing/posts")
+async def list_posts(status: str = None, topic: str = None, brand: str = None,
+                     hashtag: str = None, limit: int = 20, cursor: str = None):
+    """Newest-first post history with filters; pass next_cursor back for the next page."""
+    from agents.post_store import get_post_store
+    try:
+        return await run_in_threadpool(get_post_store().list, status=status, topic=topic,
+                                       brand=brand, hashtag=hashtag, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.get("/marketing/posts/{post_id}")
+async def get_post(post_id: str):
+    """Fetch one stored post by id."""
+    from agents.post_store import get_post_store
+    post = await run_in_threadpool(get_post_store().get, post_id)
+    if not post:
+        return JSONResponse({"error": "Post not found"}, status_code=404)
+    return post
+
 @app.get("/marketing/setup")
 async def get_setup_instructions():
     """Get FREE Instagram API setup instructions."""
@@ -118,14 +385,79 @@ async def get_setup_instructions():
     poster = InstagramPoster()
     return poster.get_setup_instructions()
 
+MARKETING_DIR = Path(__file__).parent / "marketing_outputs"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+def _etag(path: Path) -> str:
+    # Content-addressed names (img_<sha256>...) already identify the bytes
+    if path.name.startswith("img_"):
+        return f'"{path.name}"'
+    stat = path.stat()
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+def _file_response(request: Request, path: Path, cache_control: str):
+    """Serve a file with ETag/If-None-Match revalidation and single byte ranges."""
+    etag = _etag(path)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    inm = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in inm.split(",")] or inm.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    
+    size = path.stat().st_size
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", request.headers.get("range", "").strip())
+    if_range = request.headers.get("if-range")
+    if match and (not if_range or if_range == etag):
+        start, end = match.groups()
+        if start:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        elif end:
+            start, end = max(0, size - int(end)), size - 1  # Suffix range: last N bytes
+        else:
+            start, end = size, -1
+        if start > end or start >= size:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        with open(path, "rb") as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(body, status_code=206, media_type=media_type, headers=headers)
+    
+    return FileResponse(path, media_type=media_type, headers=headers)
+
 @app.get("/marketing/image/{filename}")
-async def serve_marketing_image(filename: str):
-    """Serve generated marketing images."""
-    from pathlib import Path
-    image_path = Path(__file__).parent / "marketing_outputs" / filename
-    if image_path.exists():
-        return FileResponse(image_path)
-    return JSONResponse({"error": "Image not found"}, status_code=404)
+async def serve_marketing_image(filename: str, request: Request, w: int = None):
+    """
+    Serve generated marketing images.
+    
+    Content-hashed images are immutable and cached for a year; ?w=320 serves
+    a resized copy (cached on disk next to the original).
+    """
+    if w is not None and w <= 0:
+        return JSONResponse({"error": "w must be a positive width"}, status_code=400)
+    # Only images: the post, outbox and index databases share this directory
+    if not is_servable_image(filename):
+        return JSONResponse({"error": "Invalid image name"}, status_code=400)
+    image_path = MARKETING_DIR / filename
+    if image_path.resolve().parent != MARKETING_DIR.resolve() or not image_path.is_file():
+        return JSONResponse({"error": "Image not found"}, status_code=404)
+    
+    if w:
+        from agents.image_processing import resized_path
+        try:
+            resized = await run_in_threadpool(resized_path, image_path, w)
+            if resized != image_path:
+                from agents.marketing_agent import IMAGE_CACHE
+                await run_in_threadpool(IMAGE_CACHE.track_variants, image_path)
+            image_path = resized
+        except Exception as e:
+            print(f"Image resize error: {e}")
+    
+    cache_control = IMMUTABLE_CACHE if filename.startswith("img_") else "public, max-age=300"
+    return _file_response(request, image_path, cache_control)
 
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
+    import uvicorn
+    # WEB_CONCURRENCY > 1 runs that many workers (no auto-reload); see `python main.py prod`
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=workers == 1, workers=workers)
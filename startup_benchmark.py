@@ -0,0 +1,114 @@
+"""
+Startup benchmark - import-time profile and cold-start budget for server.py.
+
+Usage:
+    python startup_benchmark.py [--runs 5] [--top 15] [--budget-ms 1500]
+
+Each run imports `server` in a fresh interpreter (what uvicorn does on cold
+start and on every worker respawn). The first run is reported as the cold
+start, the median of the rest as the warm respawn. Exits non-zero when
+either exceeds the budget or a heavy SDK is loaded eagerly.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+DEFAULT_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+# SDKs that must only load on first use, never at startup
+LAZY_MODULES = ["google.generativeai", "crewai", "litellm", "instagrapi", "PIL", "serper"]
+
+
+class ImportFailed(RuntimeError):
+    """The module could not be imported in the child interpreter."""
+
+
+def _import_error(stderr: str) -> str:
+    """Last line of the child's traceback, e.g. "ModuleNotFoundError: No module named 'fastapi'"."""
+    lines = [line for line in stderr.splitlines() if line.strip() and not line.startswith("import time:")]
+    return lines[-1].strip() if lines else "unknown error"
+
+
+def time_import(module: str = "server") -> float:
+    """Wall-clock milliseconds to import a module in a fresh interpreter."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise ImportFailed(_import_error(proc.stderr))
+    return elapsed
+
+
+def import_profile(module: str = "server"):
+    """
+    Parse `python -X importtime` into (cumulative_us, self_us, name) rows.
+
+    Raises:
+        ImportFailed: when the import fails (importtime still prints rows for
+        everything loaded before the error, so rows alone don't tell)
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise ImportFailed(_import_error(proc.stderr))
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--module", default="server")
+    args = parser.parse_args()
+
+    try:
+        rows = import_profile(args.module)
+    except ImportFailed as e:
+        print(f"❌ Could not import {args.module}: {e}")
+        return 1
+
+    print(f"📦 Import profile for `{args.module}` (top {args.top} by cumulative time)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    loaded = {name.strip() for _, _, name in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+
+    try:
+        timings = [time_import(args.module) for _ in range(max(args.runs, 2))]
+    except ImportFailed as e:
+        print(f"❌ Could not import {args.module}: {e}")
+        return 1
+    cold, respawn = timings[0], statistics.median(timings[1:])
+    print(f"\n⏱️ Cold start:     {cold:.0f} ms")
+    print(f"⏱️ Worker respawn: {respawn:.0f} ms (median of {len(timings) - 1})")
+    print(f"🎯 Budget:         {args.budget_ms} ms")
+
+    ok = True
+    if eager:
+        print(f"❌ Heavy SDKs imported at startup: {', '.join(eager)}")
+        ok = False
+    if max(cold, respawn) > args.budget_ms:
+        print("❌ Startup over budget")
+        ok = False
+    if ok:
+        print("✅ Startup within budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
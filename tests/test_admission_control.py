@@ -0,0 +1,80 @@
+import asyncio
+import os
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import Request
+
+import main
+import server
+
+
+def _post(path):
+    return Request({"type": "http", "method": "POST", "path": path, "headers": [],
+                    "query_string": b"", "scheme": "http", "server": ("test", 80)})
+
+
+def test_excess_requests_are_shed_with_retry_after(monkeypatch):
+    limit = server.RouteLimit("test", 1, 1, 0.05, 2.0)
+    monkeypatch.setitem(server.ROUTE_LIMITS, "/chat", limit)
+    gate = asyncio.Event()
+
+    async def slow(request):
+        await gate.wait()
+        return JSONResponse({"status": "ok"})
+
+    async def scenario():
+        running = asyncio.create_task(server.admission_control(_post("/chat"), slow))
+        try:
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(server.admission_control(_post("/chat"), slow))
+            await asyncio.sleep(0.01)
+            assert (limit.active, limit.waiting) == (1, 1)
+
+            full = await server.admission_control(_post("/chat"), slow)
+            timed_out = await queued
+        finally:
+            gate.set()
+        return full, timed_out, await running
+
+    full, timed_out, admitted = asyncio.run(scenario())
+    assert full.status_code == 429
+    assert full.headers["Retry-After"] == "4"  # two requests ahead, ~2s each, one slot
+    assert timed_out.status_code == 429 and int(timed_out.headers["Retry-After"]) >= 1
+    assert admitted.status_code == 200
+    assert limit.shed == 2 and limit.active == 0
+
+
+def test_calendar_holds_its_own_slot_until_the_stream_ends():
+    limit = server.ROUTE_LIMITS["/marketing/generate-calendar"]
+    assert limit is not server.ROUTE_LIMITS["/marketing/generate-post"]
+    assert (limit.limit, limit.max_queue) == (1, 2)
+
+    async def calendar(request):
+        async def events():
+            yield b'{"type": "plan"}\n'
+            yield b'{"type": "done"}\n'
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    async def scenario():
+        response = await server.admission_control(_post("/marketing/generate-calendar"), calendar)
+        held = limit.active
+        body = [chunk async for chunk in response.body_iterator]
+        return held, body
+
+    held, body = asyncio.run(scenario())
+    assert held == 1 and len(body) == 2
+    assert limit.active == 0
+
+
+def test_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.setattr(server, "WORKER_PROCESSES", 4)
+    limit = server.RouteLimit("test", 8, 16, 1.0, 1.0)
+    assert (limit.limit, limit.max_queue) == (2, 4)
+
+
+def test_production_exports_worker_count(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")  # restored after main overwrites it
+    seen = {}
+    monkeypatch.setattr(main.uvicorn, "run", lambda app, **kw: seen.update(kw, env=os.environ["WEB_CONCURRENCY"]))
+    main.start_production(3)
+    assert seen["workers"] == 3 and seen["env"] == "3"
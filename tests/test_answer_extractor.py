@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import agents.answer_extractor as answer_extractor
+from agents.answer_extractor import AnswerExtractor
+from memory import memory_manager
+from memory.shared_state import SharedState
+
+
+class FakeLLM:
+    ready = True
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def call(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+class _NoThread:
+    """Stands in for the batch thread; the test runs its target once the answers are saved."""
+
+    def start(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    state = SharedState(tmp_path / "state.db")
+    monkeypatch.setattr(answer_extractor, "get_shared_state", lambda: state)
+    monkeypatch.setattr(memory_manager, "get_shared_state", lambda: state)
+    monkeypatch.setattr(memory_manager, "BUILDER_FILE", tmp_path / "memory.json")
+    return state
+
+
+LONG_PROBLEM = "Busy parents in our town cannot find healthy snacks for their kids, and the ones they do find are full of sugar"
+
+
+@pytest.mark.parametrize("field,answer,expected", [
+    ("brand_name", "Our brand name is MilletMunch!", "MilletMunch"),
+    ("brand_name", "It's called Dawn Bakery", "Dawn Bakery"),
+    ("pricing_model", "Um, a monthly subscription", "Subscription"),
+    ("target_audience", "Well, busy parents.", "busy parents"),
+])
+def test_obvious_answers_take_the_rule_fast_path(state, field, answer, expected):
+    llm = FakeLLM("{}")
+    assert AnswerExtractor(llm).extract(field, "Q?", answer) == {field: expected}
+    assert llm.prompts == []
+    assert state.get(answer_extractor.PENDING_NAMESPACE, "pending") is None
+
+
+def test_ambiguous_answers_are_extracted_in_one_batched_call(state, monkeypatch):
+    started = []
+    monkeypatch.setattr(answer_extractor.threading, "Thread",
+                        lambda target, args, daemon: started.append((target, args)) or _NoThread())
+    reply = {"1": {"problem": "Healthy kids' snacks", "industry": "Snacks", "brand_name": "ignored"},
+             "2": {"pricing_model": "Subscription and one-time"},
+             "3": {"services": "Snack boxes", "keywords": "snacks, kids, healthy"}}
+    llm = FakeLLM(json.dumps(reply))
+    updates = []
+    extractor = AnswerExtractor(llm, on_update=lambda: updates.append(1))
+
+    answers = [("problem", LONG_PROBLEM), ("pricing_model", "Monthly subscription or a one-time box"),
+               ("services", " ".join(["snack boxes"] * 10))]
+    for field, answer in answers:
+        stored = extractor.extract(field, "Q?", answer)
+        memory_manager.update_builder(stored)
+    assert len(started) == 1 and llm.prompts == []  # The chat turn never waits on the model
+
+    target, args = started[0]
+    target(*args)
+    assert len(llm.prompts) == 1 and "[3]" in llm.prompts[0]
+    builder = memory_manager.load_builder()
+    assert builder["problem"] == "Healthy kids' snacks" and builder["industry"] == "Snacks"
+    assert builder["brand_name"] == ""  # Not a field the problem question may fill
+    assert builder["pricing_model"] == "Subscription and one-time"
+    assert builder["keywords"] == "snacks, kids, healthy"
+    assert updates == [1]
+    assert state.get(answer_extractor.PENDING_NAMESPACE, "pending") == []
+
+
+def test_batch_does_not_clobber_a_changed_answer():
+    llm = FakeLLM(json.dumps({"1": {"problem": "Healthy kids' snacks", "industry": "Snacks"}}))
+    extractor = AnswerExtractor(llm)
+    memory_manager.update_builder(extractor.extract("problem", "Q?", LONG_PROBLEM))
+    memory_manager.update_builder({"problem": "Stale bread"})  # The user answered again meanwhile
+
+    extractor.flush(wait=True)
+    builder = memory_manager.load_builder()
+    assert builder["problem"] == "Stale bread" and builder["industry"] == ""
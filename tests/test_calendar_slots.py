@@ -0,0 +1,26 @@
+import pytest
+
+from agents.marketing_agent import CALENDAR_MAX_POSTS, calendar_slots
+
+
+def test_topics_cycle_over_count():
+    slots = calendar_slots(["a", "b"], count=3)
+    assert [s["topic"] for s in slots] == ["a", "b", "a"]
+    assert all(s["date"] is None for s in slots)
+
+
+def test_huge_count_is_clamped_before_allocating():
+    assert len(calendar_slots(["a"], count=10**9)) == CALENDAR_MAX_POSTS
+    assert len(calendar_slots(start_date="2026-01-01", count=10**9)) == CALENDAR_MAX_POSTS
+
+
+@pytest.mark.parametrize("count", [0, -3, 2.5, "7", True])
+def test_bad_count_is_rejected(count):
+    with pytest.raises(ValueError):
+        calendar_slots(["a"], count=count)
+
+
+@pytest.mark.parametrize("topics", ["launch, recipes", [1, 2], ["ok", None], {"a": 1}])
+def test_topics_must_be_a_list_of_strings(topics):
+    with pytest.raises(ValueError):
+        calendar_slots(topics, count=2)
@@ -0,0 +1,52 @@
+import json
+import threading
+
+from agents.competitor_cache import CompetitorCache, cache_key
+from agents.deep_research_agent import is_valid_report
+
+REPORT = "# Competitor Analysis Report\n\n## Top 1 Competitors\n\n### 1. Acme\n- **Key Features:**\n  - Fast"
+
+
+def test_llm_error_replies_are_not_reports():
+    assert is_valid_report(REPORT)
+    assert not is_valid_report("⚠️ AI is busy right now. Please try again in a moment.")
+    assert not is_valid_report("⚠️ AI error: " + "x" * 80)
+    assert not is_valid_report("A long enough answer without any competitor sections at all, sadly.")
+    assert not is_valid_report(None)
+
+
+def test_invalid_values_are_not_cached(tmp_path):
+    cache = CompetitorCache(tmp_path / "cache.db")
+    busy = "⚠️ AI is busy right now. Please try again in a moment."
+    assert cache.get_or_compute("research", "bakery", "", lambda: busy, validate=is_valid_report) == busy
+    assert cache.get_or_compute("research", "bakery", "", lambda: REPORT, validate=is_valid_report) == REPORT
+    assert cache.get_or_compute("research", "bakery", "", lambda: "unused", validate=is_valid_report) == REPORT
+
+
+def test_previously_cached_error_reply_is_recomputed(tmp_path):
+    cache = CompetitorCache(tmp_path / "cache.db")
+    with cache._lock:
+        cache._conn.execute(
+            "INSERT INTO competitor_cache (key, kind, label, value, created_at) VALUES (?, 'research', '', ?, ?)",
+            (cache_key("research", "bakery"), json.dumps("⚠️ AI error: quota" + "x" * 60), 9e9))
+    assert cache.get_or_compute("research", "bakery", "", lambda: REPORT, validate=is_valid_report) == REPORT
+
+
+def test_flights_are_pruned(tmp_path):
+    cache = CompetitorCache(tmp_path / "cache.db")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return REPORT
+
+    thread = threading.Thread(target=cache.get_or_compute, args=("research", "florist", "", slow, is_valid_report))
+    thread.start()
+    started.wait(5)
+    assert len(cache._flights) == 1
+    release.set()
+    thread.join(5)
+    for i in range(5):
+        cache.get_or_compute("research", f"niche{i}", "", lambda: REPORT, validate=is_valid_report)
+    assert cache._flights == {}
@@ -0,0 +1,55 @@
+import agents.pipeline_orchestrator as orchestrator
+from agents.competitor_index import CompetitorIndex, parse_report
+from agents.deep_research_agent import _assemble_report
+
+PROFILES = [
+    {"name": "Acme Bakes", "url": "https://acme.example", "tagline": "", "features": [],
+     "pricing": "Not publicly listed", "tone": "Unknown", "design": "Unknown"},
+    {"name": "Crumb Co", "url": "", "tagline": "Fresh daily", "features": ["gluten free", "delivery"],
+     "pricing": "Subscription", "tone": "friendly", "design": "bold"},
+]
+
+
+def test_placeholders_are_not_indexed(tmp_path):
+    index = CompetitorIndex(tmp_path / "index.db")
+    report = _assemble_report("Busy market", PROFILES, "- summary")
+    assert index.upsert(parse_report(report), "bakery") == 2
+
+    acme = next(c for c in index.search("bakery") if c["name"] == "Acme Bakes")
+    assert acme["features"] == [] and acme["pricing"] is None and acme["tone"] is None
+    assert index.search(features="n/a unknown") == []
+    assert "Crumb Co" in index.positioning_facts("bakery", "delivery")
+
+
+def test_industry_scopes_facts(tmp_path):
+    index = CompetitorIndex(tmp_path / "index.db")
+    index.upsert([{"name": "Crumb Co", "features": ["delivery"]}], "bakery")
+    index.upsert([{"name": "Zoom Couriers", "features": ["delivery"]}], "logistics")
+    facts = index.positioning_facts("bakery", "delivery")
+    assert "Crumb Co" in facts and "Zoom Couriers" not in facts
+
+
+def test_scanned_and_reported_urls_share_one_row(tmp_path):
+    index = CompetitorIndex(tmp_path / "index.db")
+    index.upsert([{"name": "Acme", "url": "https://m.Acme.example:443/pricing", "features": ["delivery"]}], "bakery")
+    index.upsert([{"name": "Acme Bakes", "url": "www.acme.example", "pricing": "Subscription"}], "bakery")
+    assert len(index.search("bakery")) == 1
+
+
+def test_research_starts_only_without_known_competitors(monkeypatch):
+    started = []
+    monkeypatch.setattr(orchestrator.threading, "Thread",
+                        lambda target, **kw: type("T", (), {"start": lambda self: started.append(target)})())
+    monkeypatch.setattr(orchestrator, "competitor_facts", lambda memory: "")
+    monkeypatch.setattr(orchestrator, "COMPETITOR_RESEARCH", False)
+    assert not orchestrator.research_competitors({"industry": "bakery"})  # opt-in
+
+    monkeypatch.setattr(orchestrator, "COMPETITOR_RESEARCH", True)
+    assert orchestrator.research_competitors({"industry": "bakery"})
+    assert not orchestrator.research_competitors({"industry": "Bakery"})  # already running
+    assert not orchestrator.research_competitors({"industry": ""})
+
+    orchestrator._researching.clear()
+    monkeypatch.setattr(orchestrator, "competitor_facts", lambda memory: "- Crumb Co")
+    assert not orchestrator.research_competitors({"industry": "bakery"})
+    assert len(started) == 1
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from agents.competitor_cache import CompetitorCache
+from agents.deep_research_agent import (DeepResearchAgent, _as_list, _assemble_report, _local_summary,
+                                        is_valid_report)
+
+CONTEXT = {"industry": "bakery", "problem": "stale bread"}
+LANDSCAPE = {"overview": "Crowded local market.",
+             "competitors": [{"name": "Crumb", "url": "https://crumb.example", "tagline": "Fresh daily"},
+                             {"name": "Loaf", "tagline": "Bread by subscription"}]}
+
+
+class FakeLLM:
+    ready = True
+
+    def __init__(self, landscape, profiles, summary="⚠️ AI is busy right now."):
+        self.landscape, self.profiles, self.summary = landscape, profiles, summary
+        self.prompts = []
+
+    def call(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if "List the TOP" in prompt:
+            return self.landscape
+        if "Profile this competitor" in prompt:
+            name = next((n for n in self.profiles if n in prompt), None)
+            return json.dumps(self.profiles[name]) if name else "⚠️ AI is busy right now."
+        if "Top 10 Competitors" in prompt:
+            return "# Competitor Analysis Report\n\n### 1. Single call\n- **Key Features:**\n  - Everything"
+        return self.summary
+
+
+def _profile(name, features, pricing="Subscription"):
+    return {"name": name, "url": "", "tagline": "", "features": features,
+            "pricing": pricing, "tone": "Friendly", "design": "Minimal"}
+
+
+def test_features_are_normalised_to_strings():
+    assert _as_list("fast delivery, organic; gluten free") == ["fast delivery", "organic", "gluten free"]
+    assert _as_list([{"name": "Delivery"}, {"detail": "Organic"}, 3, ""]) == ["Delivery", "Organic", "3"]
+    assert _as_list(None) == []
+
+
+def test_research_survives_odd_feature_shapes():
+    profiles = {"Crumb": {"features": [{"name": "Same-day delivery"}, {"name": "Organic flour"}]},
+                "Loaf": {"features": "subscriptions, same-day delivery", "pricing": "Monthly plan"}}
+    llm = FakeLLM(json.dumps(LANDSCAPE), profiles)
+    report = DeepResearchAgent(llm)._research(CONTEXT)
+
+    assert is_valid_report(report)
+    assert "  - Same-day delivery" in report and "  - subscriptions" in report
+    assert "s, u, b" not in report
+    assert "Common features: same-day delivery." in report  # the summary call failed, so it is local
+
+
+def test_assemble_report_layout():
+    report = _assemble_report("Overview text", [_profile("Crumb", ["a", "b", "c", "d", "e", "f"]),
+                                                _profile("Loaf", [])], "- summary")
+    assert report.startswith("# Competitor Analysis Report\n\n## Overview\nOverview text")
+    assert "## Top 2 Competitors" in report
+    assert "### 1. Crumb" in report and "  - e" in report and "  - f" not in report
+    assert "### 2. Loaf\n- **Tagline/Value Proposition:** N/A\n- **Key Features:**\n  - N/A" in report
+    assert report.rstrip().endswith("## Competitive Landscape Summary\n- summary")
+
+
+def test_local_summary_counts_shared_features():
+    summary = _local_summary([_profile("A", ["Delivery", "Organic"]), _profile("B", ["delivery"], "Free tier"),
+                              _profile("C", ["Catering"])])
+    assert "- 3 direct competitors profiled." in summary
+    assert "Common features: delivery." in summary
+    assert "Most common pricing: subscription." in summary
+
+
+def test_landscape_failure_falls_back_to_single_call():
+    llm = FakeLLM("⚠️ AI error: quota", {})
+    report = DeepResearchAgent(llm)._research(CONTEXT)
+    assert "### 1. Single call" in report
+    assert not any("Profile this competitor" in p for p in llm.prompts)
+
+
+def test_mostly_placeholder_profiles_fall_back_to_single_call():
+    llm = FakeLLM(json.dumps(LANDSCAPE), {"Crumb": {}})
+    report = DeepResearchAgent(llm)._research(CONTEXT)
+    assert "### 1. Single call" in report
+
+
+def test_placeholder_report_is_not_cached(tmp_path):
+    llm = FakeLLM(json.dumps(LANDSCAPE), {})
+    llm.call = lambda prompt, **kwargs: json.dumps(LANDSCAPE) if "List the TOP" in prompt else "⚠️ AI error: quota"
+    cache = CompetitorCache(tmp_path / "cache.db")
+    agent = DeepResearchAgent(llm)
+    with pytest.raises(ValueError):
+        cache.get_or_compute("research", "bakery", "", lambda: agent._research(CONTEXT), validate=is_valid_report)
+    assert cache.get_or_compute("research", "bakery", "", lambda: "fresh", validate=lambda v: True) == "fresh"
@@ -0,0 +1,49 @@
+from agents.image_cache import ImageCache
+
+
+def _store(cache, data, prompt=None):
+    tmp = cache.temp_path()
+    tmp.write_bytes(data)
+    return cache.store(tmp, prompt=prompt)
+
+
+def test_identical_bytes_stored_once(tmp_path):
+    cache = ImageCache(tmp_path)
+    a = _store(cache, b"same" * 100, "first prompt")
+    b = _store(cache, b"same" * 100, "second prompt")
+    assert a == b
+    assert cache.lookup("First prompt.") == a
+    assert cache.stats()["blobs"] == 1
+
+
+def test_variants_count_against_budget(tmp_path):
+    cache = ImageCache(tmp_path, max_bytes=3000)
+    blobs = []
+    for i in range(3):
+        blob = _store(cache, bytes([i]) * 500, f"prompt {i}")
+        blob.with_name(blob.stem + ".ig.jpg").write_bytes(b"v" * 600)
+        cache.track_variants(blob)
+        blobs.append(blob)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 3000
+    assert not blobs[0].exists()
+    assert not blobs[0].with_name(blobs[0].stem + ".ig.jpg").exists()
+    assert cache.lookup("prompt 0") is None
+    assert cache.lookup("prompt 2") == blobs[2]
+
+
+def test_restore_keeps_variant_size(tmp_path):
+    cache = ImageCache(tmp_path)
+    blob = _store(cache, b"x" * 100)
+    blob.with_name(blob.stem + ".webp").write_bytes(b"w" * 50)
+    cache.track_variants(blob)
+    _store(cache, b"x" * 100)
+    assert cache.stats()["bytes"] == 150
+
+
+def test_single_flight_entries_are_pruned(tmp_path):
+    cache = ImageCache(tmp_path)
+    with cache.single_flight("a prompt"):
+        assert len(cache._flights) == 1
+    assert cache._flights == {}
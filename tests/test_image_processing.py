@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import server
+from agents import image_processing
+from agents.image_processing import is_servable_image, resized_path
+
+
+@pytest.mark.parametrize("name", [
+    "img_0123abcd.png", "img_0123abcd.ig.jpg", "img_0123abcd.webp", "img_0123abcd.w320.jpg", "post.JPG",
+])
+def test_images_are_servable(name):
+    assert is_servable_image(name)
+
+
+@pytest.mark.parametrize("name", [
+    "posts.db", "posts.db-wal", "outbox.db", "outbox.db-shm", "image_index.db", "image_index.json.imported",
+    ".tmp_abc.png", "../server.py", "sub/img.png", "", "img.png.db",
+])
+def test_other_files_are_not(name):
+    assert not is_servable_image(name)
+
+
+def test_concurrent_variant_writers_use_their_own_temp_files(tmp_path, monkeypatch):
+    source = tmp_path / "img_0123abcd.png"
+    Image.new("RGB", (400, 300), "red").save(source)
+    saved = []
+    real_save = Image.Image.save
+
+    def recording_save(self, fp, *args, **kwargs):
+        saved.append(Path(fp).name)
+        return real_save(self, fp, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, "save", recording_save)
+    image_processing.make_variants(source)
+    for variant in image_processing.VARIANTS:
+        image_processing.variant_path(source, variant).unlink()
+    image_processing.make_variants(source)
+
+    assert len(saved) == len(set(saved)) == 2 * len(image_processing.VARIANTS)
+    assert all(name.startswith(".tmp_") for name in saved)
+    assert not list(tmp_path.glob(".tmp_*"))
+
+
+def test_concurrent_resizes_each_publish_a_complete_file(tmp_path):
+    source = tmp_path / "img_0123abcd.png"
+    Image.new("RGB", (1000, 500), "blue").save(source)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outs = list(pool.map(lambda _: resized_path(source, 300), range(16)))
+
+    assert {out.name for out in outs} == {"img_0123abcd.w320.jpg"}
+    with Image.open(outs[0]) as img:
+        assert img.size == (320, 160)
+    assert not list(tmp_path.glob(".tmp_*"))
+
+
+@pytest.mark.parametrize("width", [0, -320])
+def test_non_positive_width_is_rejected(tmp_path, monkeypatch, width):
+    monkeypatch.setattr(server, "MARKETING_DIR", tmp_path)
+    Image.new("RGB", (64, 64)).save(tmp_path / "img_0123abcd.png")
+    response = asyncio.run(server.serve_marketing_image("img_0123abcd.png", None, w=width))
+    assert response.status_code == 400
+    assert [p.name for p in tmp_path.iterdir()] == ["img_0123abcd.png"]
@@ -0,0 +1,48 @@
+import pytest
+
+import agents.image_renderer as image_renderer
+import agents.marketing_agent as marketing_agent
+from agents.image_cache import ImageCache
+from agents.image_renderer import DEFAULT_PALETTE, render_post_image
+
+OCEAN = {"primary": "#0e7490", "secondary": "#1e3a8a", "accent": "#f59e0b"}
+
+
+def _render(tmp_path, name, palette=OCEAN, brand_name="Acme"):
+    path = tmp_path / f"{name}.jpg"
+    render_post_image("Fresh bread every morning", path, palette=palette, brand_name=brand_name)
+    return path.read_bytes()
+
+
+def test_same_palette_and_brand_render_identical_bytes(tmp_path):
+    first = _render(tmp_path, "a")
+    assert _render(tmp_path, "b") == first
+    assert _render(tmp_path, "palette", palette=DEFAULT_PALETTE) != first
+    assert _render(tmp_path, "brand", brand_name="Crumb Co") != first
+
+
+@pytest.fixture
+def offline_agent(tmp_path, monkeypatch):
+    monkeypatch.setattr(marketing_agent, "IMAGE_BACKEND", "offline")
+    monkeypatch.setattr(marketing_agent, "IMAGE_CACHE", ImageCache(tmp_path / "images"))
+    palette = dict(OCEAN)
+    monkeypatch.setattr(image_renderer, "load_brand_palette", lambda: dict(palette))
+    renders = []
+    monkeypatch.setattr(image_renderer, "render_post_image",
+                        lambda *args, **kwargs: renders.append(kwargs) or render_post_image(*args, **kwargs))
+    return marketing_agent.MarketingAgent(), palette, renders
+
+
+def test_render_cache_key_covers_palette_and_brand(offline_agent):
+    agent, palette, renders = offline_agent
+    first = agent._generate_image("Fresh bread every morning", "Acme")
+    assert agent._generate_image("Fresh bread every morning", "Acme") == first
+    assert len(renders) == 1
+
+    rebranded = agent._generate_image("Fresh bread every morning", "Crumb Co")
+    palette.update(DEFAULT_PALETTE)
+    recolored = agent._generate_image("Fresh bread every morning", "Acme")
+
+    assert len({first, rebranded, recolored}) == 3
+    assert [r["brand_name"] for r in renders] == ["Acme", "Crumb Co", "Acme"]
+    assert renders[2]["palette"] == DEFAULT_PALETTE
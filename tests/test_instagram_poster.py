@@ -0,0 +1,83 @@
+import socket
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from agents.instagram_poster import ClientPool, InstagramPoster, _is_delivery_unknown
+from tools import instagram_standin
+from tools.instagram_standin import StandinClient
+
+
+@pytest.fixture
+def poster(tmp_path, monkeypatch):
+    instagram_standin.reset()
+    monkeypatch.setenv("INSTAGRAM_USERNAME", "demo")
+    monkeypatch.setenv("INSTAGRAM_PASSWORD", "secret")
+    monkeypatch.setattr(InstagramPoster, "_save_post_record", lambda self, *args, **kwargs: None)
+    image = tmp_path / "img.jpg"
+    image.write_bytes(b"\xff\xd8\xff")
+    pool = ClientPool(session_dir=tmp_path / "sessions", client_factory=StandinClient)
+    return InstagramPoster(pool=pool), pool, image
+
+
+def test_warm_client_and_saved_session_are_reused(poster, tmp_path):
+    instagram, pool, image = poster
+    assert instagram.post_to_instagram("one", str(image))["status"] == "success"
+    assert instagram.post_to_instagram("two", str(image))["status"] == "success"
+    assert instagram_standin.stats.logins == 1
+
+    # A new process (fresh pool) restores the saved session without a password login
+    restarted = InstagramPoster(pool=ClientPool(session_dir=tmp_path / "sessions", client_factory=StandinClient))
+    assert restarted.post_to_instagram("three", str(image))["status"] == "success"
+    assert instagram_standin.stats.logins == 1
+    assert len(instagram_standin.stats.uploads) == 3
+
+
+def test_expired_session_logs_in_again_once(poster):
+    instagram, pool, image = poster
+    instagram.post_to_instagram("one", str(image))
+    instagram_standin.expire_sessions()
+    result = instagram.post_to_instagram("two", str(image))
+    assert result["status"] == "success"
+    assert instagram_standin.stats.logins == 2
+
+
+def test_bad_password_discards_session(poster, monkeypatch):
+    instagram, pool, image = poster
+    monkeypatch.setenv("INSTAGRAM_PASSWORD", "wrong")
+    bad = InstagramPoster(pool=pool)
+    result = bad.post_to_instagram("one", str(image))
+    assert result["status"] == "error"
+    assert not pool._session_path("demo").exists()
+    assert not pool.account_lock("demo").locked()
+
+
+def test_pool_availability():
+    assert ClientPool(client_factory=StandinClient).available
+
+
+def test_upload_timeout_is_reported_as_unknown(poster):
+    instagram, pool, image = poster
+    instagram_standin.drop_next_response()
+    result = instagram.post_to_instagram("one", str(image))
+    assert result["status"] == "unknown"
+    assert len(instagram_standin.stats.uploads) == 1
+
+
+def test_failures_to_connect_are_ordinary_errors():
+    class ClientConnectionError(Exception):
+        pass
+
+    assert not _is_delivery_unknown(ClientConnectionError("ConnectTimeout HTTPSConnectionPool(...)"))
+    assert not _is_delivery_unknown(ConnectionRefusedError())
+    assert not _is_delivery_unknown(socket.gaierror(-2, "Name or service not known"))
+    assert not _is_delivery_unknown(requests.ConnectionError("HTTPSConnectionPool: Connection refused"))
+    refused = MaxRetryError(None, "https://i.instagram.com", NewConnectionError(None, "Failed to establish"))
+    assert not _is_delivery_unknown(requests.ConnectionError(refused))
+    assert not _is_delivery_unknown(ClientConnectionError(
+        "ConnectionError HTTPSConnectionPool(...) (Caused by NameResolutionError(...))"))
+
+    assert _is_delivery_unknown(ClientConnectionError("ConnectionError ('Connection aborted.')"))
+    assert _is_delivery_unknown(requests.ConnectionError(ProtocolError("Connection aborted.")))
+    assert _is_delivery_unknown(TimeoutError("timed out"))
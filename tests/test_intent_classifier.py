@@ -0,0 +1,85 @@
+import pytest
+
+from llm.intent_classifier import COMMAND_PHRASES, classify, command_intent, is_question
+
+# Real answers to the onboarding questions; none of them may be swallowed as a command
+ONBOARDING_ANSWERS = [
+    "I need a website",
+    "my website",
+    "website",
+    "generate",
+    "not sure",
+    "Busy parents who want healthy snacks",
+    "We build custom websites for small restaurants",
+    "Instagram and word of mouth",
+    "A simple site builder and Stripe",
+    "Subscription, $9 a month",
+    "MilletMunch",
+    "Launch the site by March",
+    "info",
+    "create",
+    "Create a site for my bakery so people can order online",
+]
+
+
+@pytest.mark.parametrize("answer", ONBOARDING_ANSWERS)
+def test_onboarding_answers_are_not_commands(answer):
+    assert not classify(answer).is_command
+    assert command_intent(answer) == ""
+
+
+@pytest.mark.parametrize("text,intent", [
+    ("build my site now", "build"),
+    ("please build the website", "build"),
+    ("can you generate my website", "build"),
+    ("build a website", "build"),
+    ("create a site for me", "build"),
+    ("make a new landing page", "build"),
+    ("reset", "reset"),
+    ("start over", "reset"),
+    ("help", "help"),
+    ("I'm stuck", "help"),
+    ("show me my summary", "summary"),
+    ("hey there", "greeting"),
+    ("thank you so much", "thanks"),
+])
+def test_explicit_commands(text, intent):
+    result = classify(text)
+    assert result.is_command
+    assert result.primary == intent
+
+
+def test_word_boundaries():
+    assert not classify("this is great").has("greeting")
+    assert classify("thanks").primary == "thanks"
+
+
+def test_topics_still_detected_in_answers():
+    result = classify("I need a website")
+    assert result.has("build")
+    assert result.primary == "build"
+    assert classify("not sure").has("help")
+
+
+def test_make_is_a_build_command_and_topic():
+    result = classify("make it")
+    assert result.is_command and result.primary == "build"
+    assert result.has("build")
+
+
+@pytest.mark.parametrize("phrase", [p for phrases in COMMAND_PHRASES.values() for p in phrases])
+def test_command_primary_is_also_a_topic(phrase):
+    result = classify(phrase)
+    assert result.is_command and result.has(result.primary)
+
+
+@pytest.mark.parametrize("text,question", [
+    ("what do you mean?", True),
+    ("Should I include prices", True),
+    ("how does pricing work", True),
+    ("Subscription ($9/mo? maybe $12) billed monthly", False),
+    ("What makes us unique is fresh bread daily", False),
+    ("Tired of stale bread? We bake at dawn.", False),
+])
+def test_only_interrogative_messages_are_questions(text, question):
+    assert is_question(text) is question
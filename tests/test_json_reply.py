@@ -0,0 +1,17 @@
+import pytest
+
+from llm.json_reply import parse_json
+
+
+def test_strips_json_fence():
+    assert parse_json('Here:\n```json\n{"a": 1}\n```\nthanks') == {"a": 1}
+
+
+def test_strips_plain_fence():
+    assert parse_json("```\n[1, 2]\n```") == [1, 2]
+
+
+def test_bare_json_and_errors():
+    assert parse_json('  {"ok": true} ') == {"ok": True}
+    with pytest.raises(ValueError):
+        parse_json(None)
@@ -0,0 +1,98 @@
+import copy
+import importlib
+import sys
+import types
+
+import pytest
+import yaml
+
+
+class _Recorded:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+class Crew(_Recorded):
+    built = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        Crew.built += 1
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.kwargs = {**self.kwargs, "tasks": [copy.copy(t) for t in self.kwargs["tasks"]],
+                        "agents": [copy.copy(a) for a in self.kwargs["agents"]]}
+        return clone
+
+
+def _mark(kind):
+    def decorator(method):
+        method.crew_kind = kind
+        return method
+    return decorator
+
+
+def CrewBase(cls):
+    """Collects @agent/@task methods in definition order, like crewai's CrewBase."""
+    def collect(self, kind):
+        return [getattr(self, name)() for name, member in vars(cls).items()
+                if getattr(member, "crew_kind", None) == kind]
+
+    cls.agents = property(lambda self: collect(self, "agent"))
+    cls.tasks = property(lambda self: collect(self, "task"))
+    return cls
+
+
+@pytest.fixture
+def marketing_crew(monkeypatch):
+    crewai = types.ModuleType("crewai")
+    crewai.LLM, crewai.Agent, crewai.Task, crewai.Crew = _Recorded, _Recorded, _Recorded, Crew
+    crewai.Process = types.SimpleNamespace(sequential="sequential")
+    project = types.ModuleType("crewai.project")
+    project.CrewBase, project.crew = CrewBase, lambda method: method
+    project.agent, project.task = _mark("agent"), _mark("task")
+    tools = types.ModuleType("crewai.tools")
+    tools.BaseTool = type("BaseTool", (), {})
+    for name, module in {"crewai": crewai, "crewai.project": project, "crewai.tools": tools}.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    for name in ("agents.marketing.marketing_crew", "tools.zapier_instagram_webhook"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    module = importlib.import_module("agents.marketing.marketing_crew")
+    Crew.built = 0
+    yield module
+    for name in ("agents.marketing.marketing_crew", "tools.zapier_instagram_webhook"):
+        sys.modules.pop(name, None)  # Built against the stub; never leave them for other tests
+
+
+def test_yaml_is_parsed_once_and_crew_compiled_once(marketing_crew, monkeypatch):
+    parsed = []
+    safe_load = yaml.safe_load
+    monkeypatch.setattr(marketing_crew.yaml, "safe_load", lambda f: parsed.append(f.name) or safe_load(f))
+
+    for _ in range(3):
+        marketing_crew.get_crew()
+    marketing_crew.SingleInstagramPostCreatorCrew()
+
+    assert len(parsed) == 2  # agents.yaml and tasks.yaml
+    assert Crew.built == 1
+
+
+def test_each_run_gets_its_own_copy(marketing_crew):
+    first, second = marketing_crew.get_crew(), marketing_crew.get_crew()
+    assert first is not second
+    assert not set(map(id, first.kwargs["tasks"])) & set(map(id, second.kwargs["tasks"]))
+    assert not set(map(id, first.kwargs["agents"])) & set(map(id, second.kwargs["agents"]))
+
+
+def test_image_and_post_prep_run_as_async_tasks(marketing_crew):
+    configs = marketing_crew._load_config("tasks")
+    tasks = {name: task for task in marketing_crew.get_crew().kwargs["tasks"]
+             for name, config in configs.items() if task.kwargs["config"] == config}
+
+    assert list(tasks) == list(configs)
+    assert tasks["create_single_instagram_image"].kwargs["async_execution"] is True
+    assert tasks["prepare_instagram_post"].kwargs["async_execution"] is True
+    assert not tasks["generate_single_post_content_idea"].kwargs.get("async_execution")
+    assert not tasks["send_content_to_zapier_webhook"].kwargs.get("async_execution")
@@ -0,0 +1,26 @@
+import gzip
+import os
+
+from tools.page_cache import PageCache, _accepted_encodings
+
+
+def test_page_is_compressed_and_reloaded_on_change(tmp_path):
+    page = tmp_path / "index.html"
+    page.write_text("<p>hello</p>" * 200)
+    cache = PageCache(check_interval=0)
+
+    first = cache.get(page)
+    assert gzip.decompress(first.bodies["gzip"]) == page.read_bytes()
+    assert cache.get(page) is first
+
+    page.write_text("<p>changed</p>" * 200)
+    os.utime(page, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    second = cache.get(page)
+    assert second.etag != first.etag
+
+    page.unlink()
+    assert cache.get(page) is None
+
+
+def test_accept_encoding_q_values():
+    assert _accepted_encodings("gzip;q=0, br") == {"gzip": 0.0, "br": 1.0}
@@ -0,0 +1,139 @@
+import sqlite3
+import time
+
+import agents.instagram_poster as instagram_poster
+import agents.marketing_agent as marketing_agent
+import agents.post_outbox as post_outbox
+import agents.post_store as post_store
+from agents.post_outbox import PostOutbox
+from tools import instagram_standin
+
+
+def _force_lease_expiry(outbox):
+    with outbox._lock:
+        outbox._conn.execute("UPDATE outbox SET lease_until = ? WHERE status = 'running'", (time.time() - 1,))
+        outbox._conn.execute("DELETE FROM account_limits")
+
+
+def test_claim_leases_entry_until_expiry(tmp_path):
+    outbox = PostOutbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("webhook", {"content": "hello"})
+
+    assert [e["id"] for e in outbox.claim(4)] == [entry["id"]]
+    assert outbox.claim(4) == []
+
+    _force_lease_expiry(outbox)
+    again = outbox.claim(4)
+    assert [e["id"] for e in again] == [entry["id"]]
+    assert again[0]["attempts"] == 2
+
+
+def test_renew_keeps_slow_send_leased(tmp_path):
+    outbox = PostOutbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("webhook", {"content": "slow"})
+    outbox.claim(1)
+
+    with outbox._lock:
+        outbox._conn.execute("UPDATE outbox SET lease_until = ?", (time.time() + 1,))
+        outbox._conn.execute("DELETE FROM account_limits")
+    assert outbox.renew([entry["id"]]) == 1
+    with outbox._lock:
+        lease = outbox._conn.execute("SELECT lease_until FROM outbox").fetchone()[0]
+    assert lease > time.time() + post_outbox.LEASE_SECONDS - 5
+
+
+def test_duplicate_enqueue_is_noop(tmp_path):
+    outbox = PostOutbox(tmp_path / "outbox.db")
+    first = outbox.enqueue("webhook", {"content": "same"})
+    second = outbox.enqueue("webhook", {"content": "same"})
+    assert second["duplicate"] and second["id"] == first["id"]
+
+
+def test_limits_are_per_channel(tmp_path):
+    outbox = PostOutbox(tmp_path / "outbox.db")
+    outbox.enqueue("webhook", {"content": "a"}, account="brand")
+    outbox.enqueue("instagram", {"content": "a"}, account="brand")
+
+    claimed = outbox.claim(4)
+    assert sorted(e["channel"] for e in claimed) == ["instagram", "webhook"]
+    for entry in claimed:
+        outbox.complete(entry["id"], {"status": "success"})
+
+    # The instagram spacing does not hold back the webhook for the same account
+    outbox.enqueue("webhook", {"content": "b"}, account="brand", run_at=time.time() - 1)
+    outbox.enqueue("instagram", {"content": "b"}, account="brand", run_at=time.time() - 1)
+    with outbox._lock:
+        outbox._conn.execute("UPDATE account_limits SET next_at = 0 WHERE channel = 'webhook'")
+    assert [e["channel"] for e in outbox.claim(4)] == ["webhook"]
+
+
+def test_old_account_limits_table_is_migrated(tmp_path):
+    path = tmp_path / "outbox.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE account_limits (account TEXT PRIMARY KEY, next_at REAL NOT NULL)")
+    conn.execute("INSERT INTO account_limits VALUES ('brand', 0)")
+    conn.commit()
+    conn.close()
+
+    outbox = PostOutbox(path)
+    outbox.enqueue("webhook", {"content": "x"}, account="brand")
+    assert len(outbox.claim(1)) == 1
+
+
+def test_webhook_completion_marks_post_posted(tmp_path, monkeypatch):
+    store = post_store.PostStore(tmp_path / "posts.db")
+    monkeypatch.setattr(post_store, "_store", store)
+    post_id = store.create({"caption": "hi"}, status="scheduled")
+
+    outbox = PostOutbox(tmp_path / "outbox.db")
+    outbox.enqueue("webhook", {"content": "hi", "post_id": post_id})
+    entry = outbox.claim(1)[0]
+    outbox.complete(entry["id"], {"status": "success"})
+
+    post = store.get(post_id)
+    assert post["status"] == "posted"
+    assert post["posted_via"] == "webhook"
+
+
+def _instagram_outbox(tmp_path, monkeypatch):
+    store = post_store.PostStore(tmp_path / "posts.db")
+    monkeypatch.setattr(post_store, "_store", store)
+    monkeypatch.setattr(instagram_poster, "client_pool", instagram_poster.ClientPool(
+        session_dir=tmp_path / "sessions", client_factory=instagram_standin.StandinClient))
+    monkeypatch.setattr(marketing_agent, "_make_variants", lambda path: None)
+    monkeypatch.setenv("INSTAGRAM_USERNAME", "demo")
+    monkeypatch.setenv("INSTAGRAM_PASSWORD", "secret")
+    instagram_standin.reset()
+    image = tmp_path / "img.jpg"
+    image.write_bytes(b"\xff\xd8\xff")
+    return store, PostOutbox(tmp_path / "outbox.db"), image
+
+
+def test_instagram_upload_timeout_is_not_retried(tmp_path, monkeypatch):
+    store, outbox, image = _instagram_outbox(tmp_path, monkeypatch)
+    instagram_standin.drop_next_response()
+    post_id = store.create({"caption": "hi"}, status="scheduled")
+    outbox.enqueue("instagram", {"caption": "hi", "image_path": str(image), "post_id": post_id})
+    worker = post_outbox.OutboxWorker(outbox, workers=1)
+    worker._send(outbox.claim(1)[0])
+    worker._pool.shutdown()
+
+    assert outbox.counts() == {"unknown": 1}
+    assert store.get(post_id)["status"] == "unknown"
+    assert len(instagram_standin.stats.uploads) == 1
+
+
+def test_refused_instagram_connection_is_retried(tmp_path, monkeypatch):
+    store, outbox, image = _instagram_outbox(tmp_path, monkeypatch)
+    instagram_standin.refuse_next_connection()
+    post_id = store.create({"caption": "hi"}, status="scheduled")
+    entry = outbox.enqueue("instagram", {"caption": "hi", "image_path": str(image), "post_id": post_id})
+    worker = post_outbox.OutboxWorker(outbox, workers=1)
+    worker._send(outbox.claim(1)[0])
+    worker._pool.shutdown()
+
+    queued = outbox.get(entry["id"])
+    assert queued["status"] == "queued" and queued["attempts"] == 1
+    assert "Connection refused" in queued["last_error"]
+    assert store.get(post_id)["status"] == "scheduled"
+    assert instagram_standin.stats.uploads == []
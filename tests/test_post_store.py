@@ -0,0 +1,47 @@
+import pytest
+
+from agents.post_store import PostStore
+
+
+def _pages(store, **filters):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = store.list(limit=2, cursor=cursor, **filters)
+        items += [p["post_id"] for p in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items, pages
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostStore(tmp_path / "posts.db")
+    # Every post shares one timestamp, so only the id breaks ties between pages
+    for i in range(9):
+        store.create({"topic": "bread" if i % 3 else "cake", "hashtags": ["bakery"] if i % 2 else []},
+                     status="posted" if i % 2 else "generated", post_id=f"p{i}", created_at=1000.0)
+    store.create({"topic": "bread"}, status="posted", post_id="newer", created_at=2000.0)
+    return store
+
+
+def test_pages_with_equal_timestamps_skip_and_repeat_nothing(store):
+    items, pages = _pages(store)
+    assert items == ["newer"] + [f"p{i}" for i in range(8, -1, -1)]
+    assert pages == 5
+
+
+def test_filters_apply_across_pages(store):
+    posted, _ = _pages(store, status="posted")
+    assert posted == ["newer", "p7", "p5", "p3", "p1"]
+
+    bread, _ = _pages(store, status="posted", topic="BREAD")
+    assert bread == ["newer", "p7", "p5", "p1"]
+
+    tagged, _ = _pages(store, hashtag="#Bakery", topic="bread")
+    assert tagged == ["p7", "p5", "p1"]
+
+
+def test_bad_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.list(cursor="not-a-cursor")
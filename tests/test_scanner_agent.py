@@ -0,0 +1,75 @@
+import json
+
+from agents.scanner_agent import MAX_QUERIES, ScannerAgent, build_queries, merge_results
+from tools.search_standin import StandinSearch
+
+
+def _hit(link, title="", snippet=""):
+    return {"link": link, "title": title, "snippet": snippet}
+
+
+class FakeLLM:
+    ready = True
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def call(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def test_one_query_per_keyword_plus_angles():
+    assert build_queries("bakery", "sourdough, gluten free", "stale bread") == [
+        "bakery sourdough", "bakery gluten free", "bakery stale bread", "best bakery brands"]
+    assert build_queries("bakery", "sourdough rye", "") == ["bakery sourdough", "bakery rye", "best bakery brands"]
+    assert build_queries("bakery", "Sourdough; sourdough", "") == ["bakery Sourdough", "best bakery brands"]
+    assert len(build_queries("x", "a, b, c, d, e, f, g, h", "p")) == MAX_QUERIES
+
+
+def test_hits_are_merged_by_domain_and_ranked_by_mentions():
+    merged = merge_results([
+        [_hit("https://crumb.example/a", "Crumb | Fresh bread", "one"), _hit("https://www.loaf.example")],
+        [_hit("https://loaf.example/pricing", "Loaf - Bread club"), _hit("http://m.crumb.example/b"),
+         _hit("https://www.youtube.com/watch?v=1")],
+        [_hit("https://LOAF.example:443/x"), _hit("https://loaf.example/y")],
+    ])
+    assert [c["domain"] for c in merged] == ["loaf.example", "crumb.example"]
+    assert merged[0]["mentions"] == 3  # the repeat hit within one query counts once
+    assert merged[1]["name"] == "Crumb" and merged[1]["snippets"] == ["one"]
+    assert "positions" not in merged[0]
+
+
+def test_equal_mentions_rank_by_average_position():
+    merged = merge_results([[_hit("https://a.example"), _hit("https://b.example")],
+                            [_hit("https://b.example"), _hit("https://a.example"), _hit("https://c.example")]],
+                           limit=2)
+    assert [c["domain"] for c in merged] == ["a.example", "b.example"]
+
+
+def test_analysis_is_mapped_back_by_id():
+    raw = merge_results([[_hit("https://crumb.example", "Crumb"), _hit("https://loaf.example", "Loaf"),
+                          _hit("https://rye.example", "Rye")]])
+    reply = json.dumps({"competitors": [
+        {"id": "2", "name": "Wrong name", "strength": "Subscriptions", "weakness": "Pricey"},
+        {"id": 1, "strength": "Fresh", "weakness": "Small range"},
+        "not a dict",
+    ]})
+    result = ScannerAgent(FakeLLM(reply), search=StandinSearch({}))._analyze("bakery", "stale bread", raw)
+    comps = result["competitors"]
+    assert [c["name"] for c in comps] == ["Crumb", "Loaf", "Rye"]
+    assert (comps[0]["strength"], comps[1]["strength"]) == ("Fresh", "Subscriptions")
+    assert comps[2]["weakness"] == "Unknown weaknesses"
+    assert result["top_competitor"] == {"name": "Crumb"}
+
+
+def test_scan_fans_out_over_the_standin_backend():
+    search = StandinSearch({"sourdough": [_hit("https://crumb.example", "Crumb")],
+                            "rye": [_hit("https://www.crumb.example/rye", "Crumb"), _hit("https://rye.example", "Rye")]})
+    llm = FakeLLM(json.dumps({"competitors": []}))
+    result = ScannerAgent(llm, search=search)._scan_market("bakery", "sourdough, rye", "")
+
+    assert sorted(search.queries) == ["bakery rye", "bakery sourdough", "best bakery brands"]
+    assert [c["name"] for c in result["competitors"]] == ["Crumb", "Rye"]
+    assert len(llm.prompts) == 1
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+import llm.gemini_llm as gemini_llm
+from llm.scheduler import BACKGROUND, INTERACTIVE, PIPELINE, LLMScheduler, SchedulerTimeout, per_worker
+
+
+def _queued(sched, count):
+    deadline = time.monotonic() + 5
+    while sum(sched.stats()["queued"].values()) < count:
+        assert time.monotonic() < deadline, "requests never queued"
+        time.sleep(0.005)
+
+
+def _grant_order(sched, requests):
+    """Queue (name, priority, tenant, timeout) requests behind a held slot; return the order they run in."""
+    order = []
+
+    def run(name, priority, tenant, timeout):
+        with sched.slot(priority, tenant, timeout=timeout):
+            order.append(name)
+
+    sched.acquire(INTERACTIVE)
+    threads = []
+    for request in requests:
+        threads.append(threading.Thread(target=run, args=request))
+        threads[-1].start()
+        _queued(sched, len(threads))
+    sched.release()
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_batch_load_cannot_take_the_reserved_interactive_slot():
+    sched = LLMScheduler(max_concurrency=2, reserved_interactive=1)
+    sched.acquire(PIPELINE)
+    dropped = []
+
+    def batch_call():
+        try:
+            sched.acquire(PIPELINE, "bulk", timeout=0.3)
+        except SchedulerTimeout as e:
+            dropped.append(e)
+
+    batch = [threading.Thread(target=batch_call) for _ in range(5)]
+    for thread in batch:
+        thread.start()
+    _queued(sched, 5)
+
+    sched.acquire(INTERACTIVE, "user", timeout=0.05)
+    assert sched.stats()["in_flight"] == 2
+
+    for thread in batch:
+        thread.join(5)
+    assert len(dropped) == sched.stats()["dropped"] == 5
+
+
+def test_higher_priority_classes_run_first():
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    order = _grant_order(sched, [("background", BACKGROUND, "t", None), ("pipeline", PIPELINE, "t", None),
+                                 ("interactive", INTERACTIVE, "t", None)])
+    assert order == ["interactive", "pipeline", "background"]
+
+
+def test_tenants_are_served_round_robin():
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    order = _grant_order(sched, [("a1", PIPELINE, "a", None), ("a2", PIPELINE, "a", None),
+                                 ("a3", PIPELINE, "a", None), ("b1", PIPELINE, "b", None),
+                                 ("b2", PIPELINE, "b", None)])
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_requests_near_their_deadline_jump_the_queue():
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    order = _grant_order(sched, [("a", PIPELINE, "a", None), ("b", PIPELINE, "b", 30.0),
+                                 ("c", PIPELINE, "c", 1.5), ("d", PIPELINE, "d", 1.0)])
+    assert order == ["d", "c", "a", "b"]
+
+
+def test_queued_request_times_out_and_leaves_the_queue():
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    sched.acquire(PIPELINE)
+    with pytest.raises(SchedulerTimeout):
+        sched.acquire(PIPELINE, timeout=0.05)
+    stats = sched.stats()
+    assert stats["dropped"] == 1 and stats["queued"]["pipeline"] == 0
+
+
+def test_cancel_withdraws_a_queued_request():
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    sched.acquire(PIPELINE)
+    cancel = threading.Event()
+    errors = []
+
+    def wait():
+        try:
+            sched.acquire(BACKGROUND, timeout=None, cancel=cancel)
+        except SchedulerTimeout as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    _queued(sched, 1)
+    cancel.set()
+    thread.join(5)
+    assert len(errors) == 1 and sched.stats()["queued"]["background"] == 0
+
+    sched.release()
+    sched.acquire(PIPELINE, timeout=0.05)
+
+
+def test_abandoned_stream_does_not_hold_a_slot(monkeypatch):
+    sched = LLMScheduler(max_concurrency=1, reserved_interactive=0)
+    monkeypatch.setattr(gemini_llm, "scheduler", sched)
+
+    class Chunk:
+        def __init__(self, text):
+            self.text = text
+
+    class Model:
+        def generate_content(self, prompt, stream=False):
+            return iter([Chunk("hello "), Chunk("world")])
+
+    llm = gemini_llm.GeminiLLM()
+    llm.ready, llm._model = True, Model()
+    chunks = llm.stream("hi")
+    assert next(chunks) == "hello "
+    assert sched.stats()["in_flight"] == 0
+
+
+def test_server_wide_cap_is_split_across_workers():
+    assert per_worker(4, 1) == 4
+    assert per_worker(4, 3) == 2
+    assert per_worker(2, 4) == 1
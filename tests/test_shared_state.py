@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+import memory.memory_manager as memory_manager
+import memory.shared_state as shared_state
+from memory.shared_state import SharedState
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+    state.set("ns", "k", 1)
+    with pytest.raises(RuntimeError):
+        with state.transaction() as txn:
+            txn.set("ns", "k", 2)
+            raise RuntimeError("boom")
+    assert state.get("ns", "k") == 1
+
+
+def test_nested_transaction_joins_outer(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+    with state.transaction() as outer:
+        outer.set("ns", "a", 1)
+        with state.transaction() as inner:
+            inner.set("ns", "b", inner.get("ns", "a") + 1)
+    assert state.items("ns") == {"a": 1, "b": 2}
+
+
+def test_read_modify_write_is_atomic_across_connections(tmp_path):
+    # Separate connections stand in for separate worker processes
+    path = tmp_path / "state.db"
+    stores = [SharedState(path) for _ in range(4)]
+
+    def bump(store):
+        for _ in range(25):
+            store.update("ns", "counter", lambda v: v + 1, default=0)
+
+    threads = [threading.Thread(target=bump, args=(s,)) for s in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert SharedState(path).get("ns", "counter") == 100
+
+
+def test_purge_expired(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+    state.set("jobs", "old", {"x": 1}, ttl=0.01)
+    state.set("jobs", "kept", {"x": 2})
+    time.sleep(0.02)
+    assert state.get("jobs", "old") is None
+    assert state.purge_expired() == 1
+    assert state.items("jobs") == {"kept": {"x": 2}}
+
+
+def test_load_builder_reads_without_write_lock(tmp_path, monkeypatch):
+    state = SharedState(tmp_path / "state.db")
+    monkeypatch.setattr(memory_manager, "get_shared_state", lambda: state)
+    monkeypatch.setattr(memory_manager, "BUILDER_FILE", tmp_path / "memory.json")
+    assert memory_manager.load_builder()["primary_cta"] == "Get Started"  # First run imports
+
+    transactions = []
+    original = state.transaction
+    monkeypatch.setattr(state, "transaction", lambda: transactions.append(1) or original())
+    memory_manager.update_builder({"industry": "bakery"})
+    assert memory_manager.load_builder()["industry"] == "bakery"
+    assert transactions == [1]  # Only the update took the lock
@@ -0,0 +1,58 @@
+import re
+
+from agents.site_css import compile_css, compile_page
+
+
+def _rules(classes, theme=None):
+    css, unknown = compile_css(classes.split(), theme)
+    return css.split("\n", 1)[1], unknown
+
+
+def test_spacing_colors_and_variants():
+    css, unknown = _rules("p-4 px-2 bg-indigo-600 text-white/80 md:flex hover:bg-primary", {"primary": "#112233"})
+    assert unknown == []
+    assert ".p-4{padding:1rem}" in css
+    assert css.index(".p-4{") < css.index(".px-2{")  # Longhand wins
+    assert "color:rgb(255 255 255 / 0.8)" in css
+    assert "@media (min-width:768px){\n.md\\:flex{display:flex}\n}" in css
+    assert ".hover\\:bg-primary:hover{--tw-bg-opacity:1;background-color:rgb(17 34 51 / var(--tw-bg-opacity))}" in css
+
+
+def test_bg_opacity_makes_translucent_overlay():
+    css, unknown = _rules("absolute inset-0 bg-black bg-opacity-50")
+    assert unknown == []
+    assert ".bg-black{--tw-bg-opacity:1;background-color:rgb(0 0 0 / var(--tw-bg-opacity))}" in css
+    assert ".bg-opacity-50{--tw-bg-opacity:0.5}" in css
+    assert css.index(".bg-black{") < css.index(".bg-opacity-50{")
+
+
+def test_text_and_border_opacity():
+    css, unknown = _rules("text-gray-900 text-opacity-75 border border-red-500 border-opacity-25")
+    assert unknown == []
+    assert ".text-opacity-75{--tw-text-opacity:0.75}" in css
+    assert ".border-opacity-25{--tw-border-opacity:0.25}" in css
+    assert "border-color:rgb(239 68 68 / var(--tw-border-opacity))" in css
+
+
+def test_shadow_divide_colors_and_line_clamp():
+    css, unknown = _rules("shadow-lg shadow-indigo-500/50 divide-y divide-gray-200 line-clamp-3 line-clamp-none")
+    assert unknown == []
+    assert "--tw-shadow-colored:0 10px 15px -3px var(--tw-shadow-color)" in css
+    assert ".shadow-indigo-500\\/50{--tw-shadow-color:rgb(99 102 241 / 0.5);--tw-shadow:var(--tw-shadow-colored)}" in css
+    assert css.index(".shadow-lg{") < css.index(".shadow-indigo-500")
+    assert ".divide-gray-200 > * + *{--tw-divide-opacity:1;border-color:rgb(229 231 235 / var(--tw-divide-opacity))}" in css
+    assert "-webkit-line-clamp:3" in css and "-webkit-line-clamp:none" in css
+
+
+def test_unknown_classes_are_reported():
+    _, unknown = _rules("flex dark:bg-black fancy-thing")
+    assert unknown == ["dark:bg-black", "fancy-thing"]
+
+
+def test_compile_page_replaces_cdn_and_logs_unknown(capsys):
+    html = ('<html><head><script src="https://cdn.tailwindcss.com"></script></head>'
+            '<body class="bg-black bg-opacity-50 mystery-class"></body></html>')
+    out = compile_page(html, {"primary": "#4F46E5"})
+    assert "cdn.tailwindcss.com" not in out
+    assert re.search(r'<style id="site-css">.*\.bg-opacity-50\{--tw-bg-opacity:0\.5\}.*</style>\s*</head>', out, re.S)
+    assert "Unknown classes: mystery-class" in capsys.readouterr().out
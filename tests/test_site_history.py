@@ -0,0 +1,88 @@
+import sqlite3
+import time
+
+from agents.site_history import SiteHistory
+
+
+def _write_site(out, headline):
+    (out / "index.html").write_text(f"<h1>{headline}</h1>")
+    (out / "content_copy.json").write_text('{"hero": {"h1": "%s"}}' % headline)
+
+
+def _history(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    return SiteHistory(tmp_path / "history", out), out
+
+
+def test_identical_output_is_one_version(tmp_path):
+    history, out = _history(tmp_path)
+    _write_site(out, "A")
+    first = history.snapshot()
+    second = history.snapshot("regenerate")
+    assert first["version_id"] == second["version_id"]
+    assert len(history.list()) == 1
+    assert first["headline"] == "A"
+
+
+def test_resnapshot_moves_version_to_top(tmp_path):
+    history, out = _history(tmp_path)
+    _write_site(out, "A")
+    a = history.snapshot()
+    time.sleep(0.01)
+    _write_site(out, "B")
+    history.snapshot()
+    time.sleep(0.01)
+    _write_site(out, "A")
+    again = history.snapshot()
+
+    versions = history.list()
+    assert [v["headline"] for v in versions] == ["A", "B"]
+    assert versions[0]["current"]
+    assert again["created_at"] == a["created_at"]
+    assert again["last_current_at"] > a["last_current_at"]
+
+
+def test_rollback_restores_files_and_diff(tmp_path):
+    history, out = _history(tmp_path)
+    _write_site(out, "A")
+    a = history.snapshot()
+    _write_site(out, "B")
+    b = history.snapshot()
+
+    diff = history.diff(a["version_id"], b["version_id"])
+    assert diff["files"]["index.html"]["changed"]
+    assert not diff["files"]["website_blueprint.json"]["changed"]
+
+    assert history.rollback(a["version_id"])["version_id"] == a["version_id"]
+    assert (out / "index.html").read_text() == "<h1>A</h1>"
+    assert history.current_id() == a["version_id"]
+    assert history.rollback("missing") is None
+
+
+def test_old_versions_table_gains_last_current_at(tmp_path):
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    conn = sqlite3.connect(str(history_dir / "versions.db"))
+    conn.execute("CREATE TABLE versions (id TEXT PRIMARY KEY, created_at REAL NOT NULL, source TEXT,"
+                 " brand TEXT, headline TEXT, files TEXT NOT NULL)")
+    conn.execute("INSERT INTO versions VALUES ('v1', 5.0, 'pipeline', NULL, 'Old', '{}')")
+    conn.commit()
+    conn.close()
+
+    history = SiteHistory(history_dir, tmp_path)
+    assert history.list()[0]["last_current_at"] == 5.0
+
+
+def test_rollback_removes_files_the_version_lacks(tmp_path):
+    history, out = _history(tmp_path)
+    _write_site(out, "A")
+    a = history.snapshot()
+    _write_site(out, "B")
+    (out / "website_blueprint.json").write_text('{"tone": "bold"}')
+    (out / "context.json").write_text("{}")  # Not a site file: left alone
+    history.snapshot()
+
+    history.rollback(a["version_id"])
+    assert sorted(p.name for p in out.iterdir()) == ["content_copy.json", "context.json", "index.html"]
+    assert (out / "index.html").read_text() == "<h1>A</h1>"
@@ -0,0 +1,106 @@
+import json
+import threading
+
+import pytest
+
+import agents.speculative_pipeline as speculative
+import agents.strategy_agent as strategy_agent
+from agents.speculative_pipeline import SpeculativePipeline, StageCancelled, StageFellBack
+from memory.shared_state import SharedState
+
+BLUEPRINT = {"site_structure": ["Hero"], "color_palette": {"primary": "#112233"},
+             "tone": "warm", "positioning": "Bread for busy people"}
+
+
+class FakeLLM:
+    ready = True
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def call(self, prompt, **kwargs):
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(speculative, "SPEC_DIR", tmp_path / "speculative")
+    monkeypatch.setattr(strategy_agent, "competitor_facts", lambda context: "")
+    return SpeculativePipeline()
+
+
+CONTEXT = {"problem": "stale bread", "target_audience": "parents", "services": "bakery", "unique_feature": "fresh"}
+
+
+def test_stage_output_is_renamed_into_place(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline, "_get_llm", lambda cancel=None: FakeLLM(json.dumps(BLUEPRINT)))
+    output = pipeline._run("strategy", "k1", CONTEXT, {}, threading.Event())
+
+    assert output == speculative.SPEC_DIR / "k1" / "website_blueprint.json"
+    assert json.loads(output.read_text()) == BLUEPRINT
+    assert [p.name for p in output.parent.iterdir()] == ["website_blueprint.json"]
+    assert speculative._on_disk("strategy", "k1") == output
+
+
+def test_fallback_output_is_not_persisted(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline, "_get_llm", lambda cancel=None: FakeLLM("⚠️ AI is busy right now."))
+    with pytest.raises(StageFellBack):
+        pipeline._run("strategy", "k2", CONTEXT, {}, threading.Event())
+    assert speculative._on_disk("strategy", "k2") is None
+    assert list((speculative.SPEC_DIR / "k2").iterdir()) == []
+
+
+def test_cancelled_stage_leaves_nothing(pipeline, monkeypatch):
+    cancel = threading.Event()
+
+    class CancellingLLM(FakeLLM):
+        def call(self, prompt, **kwargs):
+            cancel.set()
+            return json.dumps(BLUEPRINT)
+
+    monkeypatch.setattr(pipeline, "_get_llm", lambda cancel=None: CancellingLLM(None))
+    with pytest.raises(StageCancelled):
+        pipeline._run("strategy", "k3", CONTEXT, {}, cancel)
+    assert speculative._on_disk("strategy", "k3") is None
+
+
+def test_stage_claimed_by_another_worker_is_not_run_twice(pipeline, tmp_path, monkeypatch):
+    state = SharedState(tmp_path / "state.db")
+    monkeypatch.setattr(speculative, "get_shared_state", lambda: state)
+    monkeypatch.setattr(speculative, "POLL_SECONDS", 0.01)
+    llm = FakeLLM(json.dumps(BLUEPRINT))
+    monkeypatch.setattr(pipeline, "_get_llm", lambda cancel=None: llm)
+    runs = []
+    run = SpeculativePipeline._run
+
+    def counting_run(self, stage, *args):
+        runs.append(stage)
+        return run(self, stage, *args)
+
+    monkeypatch.setattr(SpeculativePipeline, "_run", counting_run)
+    key = speculative.stage_keys(CONTEXT)["strategy"]
+    assert speculative._claim("strategy", key, "worker-a")
+
+    pipeline.update(CONTEXT)
+    assert runs == []
+
+    worker_a = SpeculativePipeline()
+    monkeypatch.setattr(worker_a, "_get_llm", lambda cancel=None: llm)
+    worker_a._run("strategy", key, CONTEXT, {}, threading.Event())
+    speculative._release("strategy", key, "worker-a")
+    assert pipeline.take(CONTEXT)["strategy"] == speculative.SPEC_DIR / key / "website_blueprint.json"
+    assert runs == ["strategy"]
+
+
+def test_claim_is_released_when_the_stage_ends(pipeline, tmp_path, monkeypatch):
+    state = SharedState(tmp_path / "state.db")
+    monkeypatch.setattr(speculative, "get_shared_state", lambda: state)
+    monkeypatch.setattr(pipeline, "_get_llm", lambda cancel=None: FakeLLM("⚠️ AI is busy right now."))
+    key = speculative.stage_keys(CONTEXT)["strategy"]
+
+    pipeline.update(CONTEXT)
+    assert pipeline.take(CONTEXT) == {}
+    pipeline._executor.shutdown(wait=True)
+    assert state.get(speculative.CLAIMS_NAMESPACE, f"strategy:{key}") is None
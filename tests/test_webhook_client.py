@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+import agents.post_outbox as post_outbox
+import tools.webhook_client as webhook_client
+
+
+class FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(status_code=outcome, text="body", headers={})
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(*outcomes):
+        fake = FakeSession(*outcomes)
+        monkeypatch.setattr(webhook_client, "_session", fake)
+        return fake
+    monkeypatch.setattr(webhook_client, "_retry_delay", lambda attempt, retry_after: 0)
+    return install
+
+
+def test_retries_5xx_then_succeeds(session):
+    fake = session(503, 429, 200)
+    result = webhook_client.send({"a": 1}, url="http://hook")
+    assert result.ok and result.attempts == 3 and fake.calls == 3
+
+
+def test_client_error_is_not_retried(session):
+    fake = session(400)
+    result = webhook_client.send({"a": 1}, url="http://hook")
+    assert not result.ok and result.status_code == 400 and fake.calls == 1
+
+
+def test_failures_to_connect_are_retried(session):
+    refused = MaxRetryError(None, "http://hook", NewConnectionError(None, "Connection refused"))
+    fake = session(requests.ConnectionError(refused), requests.ConnectTimeout("slow connect"), 200)
+    assert webhook_client.send({"a": 1}, url="http://hook").ok
+    assert fake.calls == 3
+
+
+def test_dropped_connection_is_unknown_and_not_resent(session):
+    aborted = ProtocolError("Connection aborted.", ConnectionResetError("reset by peer"))
+    fake = session(requests.ConnectionError(aborted), 200)
+    result = webhook_client.send({"a": 1}, url="http://hook")
+    assert not result.ok and result.unknown
+    assert fake.calls == 1
+
+
+def test_read_timeout_is_unknown_and_not_resent(session):
+    fake = session(requests.ReadTimeout("no response"), 200)
+    result = webhook_client.send({"a": 1}, url="http://hook")
+    assert not result.ok and result.unknown
+    assert fake.calls == 1
+
+
+def test_other_request_errors_are_not_retried(session):
+    fake = session(requests.exceptions.InvalidURL("bad"), 200)
+    result = webhook_client.send({"a": 1}, url="http://hook")
+    assert not result.ok and not result.unknown and fake.calls == 1
+
+
+def test_outbox_does_not_retry_unknown_delivery(tmp_path):
+    outbox = post_outbox.PostOutbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("webhook", {"content": "hi"})
+    worker = post_outbox.OutboxWorker(outbox, workers=1, sender=lambda e: {"status": "unknown", "message": "timeout"})
+    worker._send(outbox.claim(1)[0])
+
+    assert outbox.get(entry["id"])["status"] == "unknown"
+    with outbox._lock:
+        outbox._conn.execute("DELETE FROM account_limits")
+    assert outbox.claim(1) == []
+    worker.stop()
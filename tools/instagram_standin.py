@@ -0,0 +1,122 @@
+"""
+Instagram Stand-in - Local fake of an instagrapi Client for trying the poster.
+
+    INSTAGRAM_CLIENT=standin INSTAGRAM_USERNAME=demo INSTAGRAM_PASSWORD=demo python server.py
+
+The client implements the calls ClientPool and InstagramPoster make (settings
+load/dump, login, photo_upload) with no network. A password of "wrong" fails
+with BadPassword, and `expire_sessions()` makes uploads fail with LoginRequired
+until the next password login, so relogin paths can be exercised.
+`drop_next_response()` publishes the next upload but raises ReadTimeout, the
+case where the caller can't tell whether the post went out, and
+`refuse_next_connection()` fails the next upload before anything is sent.
+"""
+import json
+import threading
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+
+class BadPassword(Exception):
+    """Same name instagrapi uses, so the poster's error handling matches."""
+
+
+class LoginRequired(Exception):
+    """Same name instagrapi uses for a dead session."""
+
+
+class ClientConnectionError(Exception):
+    """Same name instagrapi uses when requests raised a ConnectionError."""
+
+
+class ReadTimeout(Exception):
+    """Same name requests uses when the response never arrives."""
+
+
+class StandinStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.logins = 0
+        self.uploads = []
+        self.sessions_expired = False
+        self.drop_response = False
+        self.refuse_connection = False
+
+
+stats = StandinStats()
+
+
+def reset():
+    global stats
+    stats = StandinStats()
+
+
+def drop_next_response():
+    """Publish the next upload but time out before answering."""
+    with stats.lock:
+        stats.drop_response = True
+
+
+def refuse_next_connection():
+    """Fail the next upload the way instagrapi reports a refused connection."""
+    with stats.lock:
+        stats.refuse_connection = True
+
+
+def expire_sessions():
+    """Make uploads fail with LoginRequired until the next password login."""
+    with stats.lock:
+        stats.sessions_expired = True
+
+
+class StandinClient:
+    """Drop-in for instagrapi.Client (the subset this app uses)."""
+
+    def __init__(self):
+        self.delay_range = [0, 0]
+        self.settings = {"uuids": {"uuid": uuid.uuid4().hex}}
+        self.user = None
+
+    def load_settings(self, path):
+        self.settings = json.loads(Path(path).read_text())
+        return self.settings
+
+    def dump_settings(self, path):
+        Path(path).write_text(json.dumps(self.settings))
+
+    def get_settings(self):
+        return dict(self.settings)
+
+    def set_uuids(self, uuids):
+        self.settings["uuids"] = dict(uuids or {})
+
+    def login(self, username, password):
+        if password == "wrong":
+            raise BadPassword("bad_password")
+        if self.settings.get("authorization") == username:
+            self.user = username  # Restored session: no round-trip
+            return True
+        with stats.lock:
+            stats.logins += 1
+            stats.sessions_expired = False
+        self.settings["authorization"] = username
+        self.user = username
+        return True
+
+    def photo_upload(self, path, caption):
+        with stats.lock:
+            if stats.sessions_expired:
+                raise LoginRequired("login_required")
+            if stats.refuse_connection:
+                stats.refuse_connection = False
+                raise ClientConnectionError(
+                    "ConnectionError HTTPSConnectionPool(host='i.instagram.com', port=443): Max retries exceeded"
+                    " (Caused by NewConnectionError('Failed to establish a new connection:"
+                    " [Errno 111] Connection refused'))")
+            stats.uploads.append({"user": self.user, "path": str(path), "caption": caption})
+            n = len(stats.uploads)
+            if stats.drop_response:
+                stats.drop_response = False
+                raise ReadTimeout("Read timed out. (read timeout=30)")
+        return SimpleNamespace(pk=f"{n:08d}", code=f"standin{n}")
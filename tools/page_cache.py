@@ -0,0 +1,132 @@
+"""
+Page Cache - In-memory, pre-compressed HTML pages with HTTP validators.
+
+The UI pages and the site preview are read once, compressed once (gzip, plus
+brotli when the package is installed) and kept in memory. A page is
+re-stat'ed at most every CHECK_INTERVAL seconds and reloaded when its mtime or
+size changes, so a regenerated preview shows up without a restart. Responses
+carry ETag and Last-Modified, and matching conditional requests get an empty
+304. A reload does blocking file I/O and maximum-level compression, so async
+routes should call response() through run_in_threadpool.
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+CHECK_INTERVAL = float(os.getenv("PAGE_CACHE_CHECK_SECONDS", "1"))
+MIN_COMPRESS_BYTES = 1024
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+
+class CachedPage(NamedTuple):
+    mtime_ns: int
+    size: int
+    etag: str  # Unquoted; each encoding gets its own tag ("<etag>-gzip")
+    last_modified: str
+    bodies: Dict[str, bytes]  # content-encoding ("identity", "gzip", "br") -> bytes
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+class PageCache:
+    """Path -> CachedPage, invalidated by mtime/size."""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._pages: Dict[Path, CachedPage] = {}
+        self._checked: Dict[Path, float] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, path: Path, stat: os.stat_result) -> CachedPage:
+        raw = path.read_bytes()
+        bodies = {"identity": raw}
+        if len(raw) >= MIN_COMPRESS_BYTES:
+            bodies["gzip"] = gzip.compress(raw, compresslevel=9, mtime=0)
+            if brotli is not None:
+                bodies["br"] = brotli.compress(raw, quality=11)
+        etag = hashlib.sha256(raw).hexdigest()[:20]
+        print(f"[PageCache] Loaded {path.name} ({len(raw)} bytes, gzip {len(bodies.get('gzip', raw))})")
+        return CachedPage(stat.st_mtime_ns, stat.st_size, etag, formatdate(stat.st_mtime, usegmt=True), bodies)
+
+    def get(self, path: Path) -> Optional[CachedPage]:
+        """Cached page, reloaded if the file changed; None if it doesn't exist."""
+        path = Path(path)
+        now = time.monotonic()
+        with self._lock:
+            page = self._pages.get(path)
+            if page and now - self._checked.get(path, 0) < self.check_interval:
+                return page
+        try:
+            stat = path.stat()
+        except OSError:
+            with self._lock:
+                self._pages.pop(path, None)
+            return None
+        if not page or (page.mtime_ns, page.size) != (stat.st_mtime_ns, stat.st_size):
+            page = self._load(path, stat)
+        with self._lock:
+            self._pages[path] = page
+            self._checked[path] = now
+        return page
+
+    def response(self, request, path: Path, media_type: str = "text/html; charset=utf-8",
+                 cache_control: str = "no-cache"):
+        """
+        Starlette response for a cached page, or None if the file is missing.
+
+        Picks the best encoding the client accepts and answers If-None-Match /
+        If-Modified-Since with 304.
+        """
+        from starlette.responses import Response
+
+        page = self.get(path)
+        if page is None:
+            return None
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in page.bodies and accepted.get(e, 0) > 0), "identity")
+        etag = page.etag if encoding == "identity" else f"{page.etag}-{encoding}"
+        headers = {"ETag": f'"{etag}"', "Last-Modified": page.last_modified,
+                   "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        inm = request.headers.get("if-none-match")
+        if inm is not None:
+            # Any encoding of the same bytes still validates
+            tags = [tag.strip().removeprefix("W/").strip('"').split("-")[0] for tag in inm.split(",")]
+            if page.etag in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+        elif request.headers.get("if-modified-since"):
+            try:
+                since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+                if page.mtime_ns // 1_000_000_000 <= since:
+                    return Response(status_code=304, headers=headers)
+            except (TypeError, ValueError):
+                pass
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(page.bodies[encoding], media_type=media_type, headers=headers)
+
+
+page_cache = PageCache()
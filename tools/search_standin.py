@@ -0,0 +1,31 @@
+"""
+Search Stand-in - Local fake of a web search backend for trying ScannerAgent.
+
+    ScannerAgent(llm, search=StandinSearch({"bakery": [{"title": ..., "link": ..., "snippet": ...}]}))
+
+`corpus` maps a lowercase term to organic hits ({title, link, snippet}); a
+query returns the hits of every term it contains, in corpus order. Queries
+are recorded and can be slowed down with `latency` to exercise the fan-out.
+"""
+import threading
+import time
+from typing import Dict, List
+
+
+class StandinSearch:
+    """Drop-in for the scanner's search backend (query -> organic hits)."""
+
+    def __init__(self, corpus: Dict[str, List[Dict]], latency: float = 0.0, results_per_query: int = 10):
+        self.corpus = {k.lower(): v for k, v in corpus.items()}
+        self.latency = latency
+        self.results_per_query = results_per_query
+        self.queries: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str) -> List[Dict]:
+        with self._lock:
+            self.queries.append(query)
+        if self.latency:
+            time.sleep(self.latency)
+        q = query.lower()
+        return [hit for term, hits in self.corpus.items() if term in q for hit in hits][:self.results_per_query]
@@ -0,0 +1,223 @@
+"""
+Webhook Client - Pooled, retrying and optionally batched JSON webhook sender.
+
+Used by ZapierInstagramWebhookTool and the post outbox. One keep-alive
+requests.Session is shared by the whole process. Any 2xx counts as success.
+429 and 5xx responses, and failures to connect at all, are retried with
+full-jitter backoff, honouring Retry-After. Once the request may have been
+sent (a read timeout, or the connection dropping mid-request or mid-response)
+it is not retried: the hook may already have run, so the result is reported
+as an unknown delivery instead of risking a duplicate post.
+
+Sends can run in the background (send_async). With WEBHOOK_BATCH_SIZE > 1,
+payloads queued within a short window go out as one JSON array; Zapier catch
+hooks run the Zap once per array item.
+
+Point ZAPIER_WEBHOOK_URL at `python -m tools.webhook_standin` to try it
+locally with injected latency and errors.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+DEFAULT_WEBHOOK_URL = "https://hooks.zapier.com/hooks/catch/25461153/uzfgb5n/"
+
+POOL_SIZE = int(os.getenv("WEBHOOK_POOL_SIZE", "8"))
+MAX_RETRIES = int(os.getenv("WEBHOOK_MAX_RETRIES", "4"))
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "15"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "1"))
+BATCH_WINDOW = float(os.getenv("WEBHOOK_BATCH_WINDOW", "0.25"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def webhook_url() -> str:
+    return os.getenv("ZAPIER_WEBHOOK_URL") or DEFAULT_WEBHOOK_URL
+
+
+def instagram_payload(content: str, preferred_posting_time: str, timezone: str,
+                      media_urls: Optional[List[str]] = None, hashtags: Optional[List[str]] = None,
+                      brand_name: Optional[str] = None) -> Dict:
+    """Zapier payload for an Instagram feed post (hashtags appended to the content)."""
+    full_content = content
+    if hashtags:
+        full_content += " " + " ".join(f"#{tag.lstrip('#')}" for tag in hashtags)
+    return {
+        "content": full_content,
+        "media_urls": media_urls or [],
+        "preferred_posting_time": preferred_posting_time,
+        "timezone": timezone,
+        "account": os.getenv("ZAPIER_INSTAGRAM_ACCOUNT", "@kskk.2031"),
+        "post_type": "feed",
+        "brand_name": brand_name
+    }
+
+
+class WebhookResult(NamedTuple):
+    ok: bool
+    status_code: Optional[int]
+    attempts: int
+    body: str = ""
+    error: str = ""
+    unknown: bool = False  # Sent, but no response arrived; it may have been delivered
+
+
+_session = None
+_session_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="webhook")
+
+
+def get_session():
+    """Process-wide keep-alive session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Content-Type": "application/json",
+                                    "User-Agent": "CrewAI-InstagramWebhookTool/1.0"})
+            _session = session
+        return _session
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after and retry_after.strip().isdigit():
+        return min(BACKOFF_MAX, float(retry_after))
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _never_sent(error) -> bool:
+    """True for connection errors raised before the request went out (refused, DNS, connect timeout, TLS)."""
+    import requests
+    from urllib3.exceptions import NewConnectionError
+    if isinstance(error, (requests.ConnectTimeout, requests.exceptions.SSLError)):
+        return True
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)  # MaxRetryError wraps the cause
+    return isinstance(reason, NewConnectionError)
+
+
+def send(payload, url: str = None, max_retries: int = MAX_RETRIES) -> WebhookResult:
+    """
+    POST a JSON payload (object or array), retrying 429/5xx and failures to connect.
+
+    A read timeout or a connection dropped after the request may have been
+    sent returns at once with unknown=True rather than resending.
+    """
+    import requests
+    url = url or webhook_url()
+    session = get_session()
+    error, status = "", None
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        try:
+            response = session.post(url, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            status = response.status_code
+            if 200 <= status < 300:
+                return WebhookResult(True, status, attempt + 1, response.text[:500])
+            error = f"HTTP {status}: {response.text[:200]}"
+            if status not in RETRY_STATUSES:
+                return WebhookResult(False, status, attempt + 1, response.text[:500], error)
+            retry_after = response.headers.get("Retry-After")
+        except requests.ConnectionError as e:
+            if not _never_sent(e):
+                return WebhookResult(False, None, attempt + 1, "", f"Delivery unknown, connection lost: {e}",
+                                     unknown=True)
+            error = f"{type(e).__name__}: {e}"
+        except (requests.ReadTimeout, requests.exceptions.ChunkedEncodingError) as e:
+            return WebhookResult(False, None, attempt + 1, "", f"Delivery unknown, no response: {e}", unknown=True)
+        except requests.RequestException as e:
+            return WebhookResult(False, None, attempt + 1, "", f"{type(e).__name__}: {e}")
+        if attempt < max_retries:
+            time.sleep(_retry_delay(attempt, retry_after))
+    return WebhookResult(False, status, max_retries + 1, "", error)
+
+
+def send_async(payload, url: str = None) -> Future:
+    """Send in the background; the Future resolves to a WebhookResult."""
+    return _executor.submit(send, payload, url)
+
+
+class WebhookBatcher:
+    """
+    Coalesces payloads into array requests of up to `batch_size` items.
+
+    A batch is sent when it fills up or `window` seconds after its first
+    payload, whichever comes first. Every payload's Future resolves to the
+    result of the request that carried it.
+    """
+
+    def __init__(self, url: str = None, batch_size: int = BATCH_SIZE, window: float = BATCH_WINDOW):
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, payload: Dict) -> Future:
+        future = Future()
+        with self._lock:
+            self._pending.append((payload, future))
+            if len(self._pending) >= self.batch_size:
+                batch = self._take()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            _executor.submit(self._send_batch, batch)
+        return future
+
+    def _take(self) -> List[tuple]:
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._send_batch(batch)
+
+    def _send_batch(self, batch: List[tuple]):
+        try:
+            payloads = [p for p, _ in batch]
+            result = send(payloads if len(payloads) > 1 else payloads[0], self.url)
+        except Exception as e:
+            result = WebhookResult(False, None, 0, "", str(e))
+        for _, future in batch:
+            future.set_result(result)
+
+
+_batcher: Optional[WebhookBatcher] = None
+
+
+def dispatch(payload: Dict) -> Future:
+    """
+    Send a payload in the background, batched when WEBHOOK_BATCH_SIZE > 1.
+
+    Returns:
+        Future resolving to a WebhookResult
+    """
+    global _batcher
+    if BATCH_SIZE <= 1:
+        return send_async(payload)
+    with _session_lock:
+        if _batcher is None:
+            _batcher = WebhookBatcher()
+    return _batcher.submit(payload)
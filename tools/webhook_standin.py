@@ -0,0 +1,91 @@
+"""
+Webhook Stand-in - Local fake of a Zapier catch hook for trying the webhook client.
+
+    python -m tools.webhook_standin --port 8765 --latency 0.2 --error-rate 0.3
+    ZAPIER_WEBHOOK_URL=http://127.0.0.1:8765/hook python server.py
+
+Every POST sleeps `latency` seconds (plus jitter). A share of requests given by
+`error-rate` then fail with 429 (with Retry-After) or 503. GET /stats reports
+request and payload counts.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandinState:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "accepted": 0, "payloads": 0, "injected_errors": 0}
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+        def _reply(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with state.lock:
+                self._reply(200, dict(state.stats))
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with state.lock:
+                state.stats["requests"] += 1
+            time.sleep(state.latency * random.uniform(0.5, 1.5))
+            if random.random() < state.error_rate:
+                with state.lock:
+                    state.stats["injected_errors"] += 1
+                if random.random() < 0.5:
+                    return self._reply(429, {"status": "throttled"}, {"Retry-After": "1"})
+                return self._reply(503, {"status": "unavailable"})
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                return self._reply(400, {"status": "invalid json"})
+            with state.lock:
+                state.stats["accepted"] += 1
+                state.stats["payloads"] += len(payload) if isinstance(payload, list) else 1
+            self._reply(200, {"status": "success", "attempt": "standin"})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int = 8765, latency: float = 0.0, error_rate: float = 0.0, host: str = "127.0.0.1"):
+    """Start the stand-in in a background thread; returns (server, state)."""
+    state = StandinState(latency, error_rate)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 429/503")
+    args = parser.parse_args()
+    server, _ = serve(args.port, args.latency, args.error_rate)
+    print(f"Webhook stand-in on http://127.0.0.1:{args.port}/hook (latency {args.latency}s, errors {args.error_rate:.0%})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,9 +1,8 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type, List, Optional
-import requests
-import json
 from datetime import datetime
+from tools.webhook_client import dispatch, instagram_payload
 
 class ZapierInstagramWebhookInput(BaseModel):
     """Input schema for Zapier Instagram Webhook Tool."""
@@ -33,55 +32,26 @@ class ZapierInstagramWebhookTool(BaseTool):
         Send Instagram post data to Zapier webhook.
         """
         
-        webhook_url = "https://hooks.zapier.com/hooks/catch/25461153/uzfgb5n/"
         timestamp = datetime.now().isoformat()
+        payload = instagram_payload(content, preferred_posting_time, timezone,
+                                    media_urls, hashtags, brand_name)
         
         try:
-            # Format hashtags if provided
-            formatted_hashtags = []
-            if hashtags:
-                formatted_hashtags = [f"#{tag.lstrip('#')}" for tag in hashtags]
-            
-            # Combine content with hashtags
-            full_content = content
-            if formatted_hashtags:
-                full_content += " " + " ".join(formatted_hashtags)
-            
-            # Prepare JSON payload
-            payload = {
-                "content": full_content,
-                "media_urls": media_urls or [],
-                "preferred_posting_time": preferred_posting_time,
-                "timezone": timezone,
-                "account": "@kskk.2031",
-                "post_type": "feed",
-                "brand_name": brand_name
-            }
-            
-            # Set headers
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "CrewAI-InstagramWebhookTool/1.0"
-            }
-            
-            # Send POST request to webhook
-            response = requests.post(
-                webhook_url,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
-            
-            # Handle different response codes
-            if response.status_code == 200:
-                return (
-                    f"✅ SUCCESS: Instagram post data sent to Zapier webhook successfully!\n"
-                    f"📅 Timestamp: {timestamp}\n"
-                    f"⏰ Preferred posting time: {preferred_posting_time} {timezone}\n"
-                    f"📝 Content: {full_content[:50]}...\n"
-                )
-            else:
-                return f"❌ FAILURE: Zapier webhook returned status {response.status_code}"
-                
+            # Pooled keep-alive session with retries on 429/5xx (batched if configured)
+            result = dispatch(payload).result()
         except Exception as e:
             return f"❌ FAILURE: Error sending to webhook: {str(e)}"
+        
+        if result.ok:
+            return (
+                f"✅ SUCCESS: Instagram post data sent to Zapier webhook successfully!\n"
+                f"📅 Timestamp: {timestamp}\n"
+                f"⏰ Preferred posting time: {preferred_posting_time} {timezone}\n"
+                f"📝 Content: {payload['content'][:50]}...\n"
+                f"🔁 Attempts: {result.attempts}\n"
+            )
+        if result.unknown:
+            return "⚠️ UNKNOWN: Zapier webhook did not respond; the post may have been sent, so it was not retried"
+        if result.status_code:
+            return f"❌ FAILURE: Zapier webhook returned status {result.status_code} after {result.attempts} attempt(s)"
+        return f"❌ FAILURE: Error sending to webhook: {result.error}"